@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup scan of installed skills: discover every SKILL.md under
+the skills roots and extract its frontmatter, the way the agent runtime does
+before the first turn.
+
+Two readers are timed over the same skills:
+  - full       read the whole SKILL.md and split every line (the old reader)
+  - streaming  quick_validate.read_frontmatter, which stops at the closing fence
+
+With --pad-kb the skills are first copied to a temp dir and each SKILL.md body
+is padded, to model reference-heavy skills.
+
+Usage:
+    python bench_frontmatter.py
+    python bench_frontmatter.py --roots ~/.openclaw/workspace/available-skills --repeat 20
+    python bench_frontmatter.py --pad-kb 512 --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from quick_validate import discover_skills, read_frontmatter
+
+BENCH_VERSION = 1
+# scripts/ -> skill-creator/ -> builtin/ -> available-skills/
+DEFAULT_ROOT = SCRIPT_DIR.parents[2]
+PAD_LINE = "Reference material that only matters once the skill is triggered.\n"
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the frontmatter scan over installed skills.")
+    p.add_argument("--roots", nargs="+", default=[str(DEFAULT_ROOT)], help=f"Skills roots (default: {DEFAULT_ROOT})")
+    p.add_argument("--repeat", type=int, default=10, help="Timed runs per reader (default: 10)")
+    p.add_argument("--pad-kb", type=int, default=0, help="Pad each SKILL.md body to at least N KiB in a temp copy")
+    p.add_argument("--output", default=None, help="Write JSON results here instead of stdout")
+    return p.parse_args()
+
+
+def full_frontmatter(skill_md: Path) -> Optional[str]:
+    """The reader quick_validate used before streaming: whole file, every line."""
+    lines = skill_md.read_text(encoding="utf-8").splitlines()
+    if not lines or lines[0].strip() != "---":
+        return None
+    for i in range(1, len(lines)):
+        if lines[i].strip() == "---":
+            return "\n".join(lines[1:i])
+    return None
+
+
+def pad_skills(roots: List[str], target: Path, pad_kb: int) -> List[str]:
+    """Copy each root under target and pad every SKILL.md to pad_kb KiB."""
+    copies = []
+    for i, root in enumerate(roots):
+        copy = target / str(i)
+        shutil.copytree(root, copy, ignore=shutil.ignore_patterns("node_modules", ".git"), symlinks=True)
+        copies.append(str(copy))
+    for skill_dir in discover_skills(copies):
+        skill_md = skill_dir / "SKILL.md"
+        missing = pad_kb * 1024 - skill_md.stat().st_size
+        if missing > 0:
+            with open(skill_md, "a", encoding="utf-8") as fh:
+                fh.write(PAD_LINE * (missing // len(PAD_LINE) + 1))
+    return copies
+
+
+def scan(roots: List[str], reader: Callable[[Path], Optional[str]]) -> int:
+    found = 0
+    for skill_dir in discover_skills(roots):
+        try:
+            if reader(skill_dir / "SKILL.md") is not None:
+                found += 1
+        except (OSError, UnicodeDecodeError):
+            continue
+    return found
+
+
+def measure(fn: Callable[[], int], repeat: int) -> dict:
+    runs = []
+    result = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - started)
+    return {
+        "runs": repeat,
+        "min_s": round(min(runs), 6),
+        "median_s": round(statistics.median(runs), 6),
+        "max_s": round(max(runs), 6),
+        "items": result,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    repeat = max(1, args.repeat)
+
+    cleanup = None
+    roots = args.roots
+    if args.pad_kb > 0:
+        cleanup = Path(tempfile.mkdtemp(prefix="bench_frontmatter_"))
+        roots = pad_skills(roots, cleanup, args.pad_kb)
+
+    try:
+        skill_dirs = discover_skills(roots)
+        skills = len(skill_dirs)
+        bytes_total = sum((d / "SKILL.md").stat().st_size for d in skill_dirs)
+        # Warm the page cache so both readers see the same I/O conditions.
+        scan(roots, full_frontmatter)
+        results = {
+            "full": measure(lambda: scan(roots, full_frontmatter), repeat),
+            "streaming": measure(lambda: scan(roots, read_frontmatter), repeat),
+        }
+    finally:
+        if cleanup is not None:
+            shutil.rmtree(cleanup, ignore_errors=True)
+
+    streaming = results["streaming"]["median_s"]
+    payload = {
+        "benchmark": "skill-frontmatter-scan",
+        "version": BENCH_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "corpus": {"roots": args.roots, "skills": skills, "skill_md_bytes": bytes_total, "pad_kb": args.pad_kb},
+        "results": results,
+        "speedup": round(results["full"]["median_s"] / streaming, 2) if streaming else None,
+    }
+
+    for name, timing in results.items():
+        print(f"{name:10} median {timing['median_s']:.4f}s  min {timing['min_s']:.4f}s", file=sys.stderr)
+    print(f"speedup    x{payload['speedup']}", file=sys.stderr)
+
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
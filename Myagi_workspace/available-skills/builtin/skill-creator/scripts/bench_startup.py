@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cold start of the skill-creator scripts.
+
+Every sample is a fresh interpreter, so nothing is shared between runs:
+  - python                  bare `python -c pass`, the floor
+  - <module>                `import <module>` with dependencies loaded lazily
+  - <module>_eager          the same import with PyYAML and the process pool
+                            machinery pre-imported, as the scripts used to;
+                            skipped (savings reported as null) when PyYAML
+                            is not installed
+  - validate_cli            `quick_validate.py <skill> --no-cache` end to end
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --repeat 30 --output startup.json
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BENCH_VERSION = 1
+MODULES = ("quick_validate", "package_skill")
+EAGER_IMPORTS = "import yaml, concurrent.futures.process; "
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark skill-creator script start-up time.")
+    p.add_argument("--repeat", type=int, default=15, help="Fresh interpreters per case (default: 15)")
+    p.add_argument("--skill", default=str(SCRIPT_DIR.parent), help="Skill validated by validate_cli (default: skill-creator)")
+    p.add_argument("--output", default=None, help="Write JSON results here instead of stdout")
+    return p.parse_args()
+
+
+def yaml_installed() -> bool:
+    return importlib.util.find_spec("yaml") is not None
+
+
+def cases(skill: str) -> Dict[str, List[str]]:
+    python = [sys.executable, "-c"]
+    commands = {"python": python + ["pass"]}
+    # Without PyYAML the eager variant cannot start; that is also the setup
+    # where the lazy path matters most, so the lazy cases still run.
+    eager = yaml_installed()
+    for module in MODULES:
+        commands[module] = python + [f"import {module}"]
+        if eager:
+            commands[f"{module}_eager"] = python + [f"{EAGER_IMPORTS}import {module}"]
+    commands["validate_cli"] = [sys.executable, str(SCRIPT_DIR / "quick_validate.py"), skill, "--no-cache"]
+    return commands
+
+
+def measure(command: List[str], repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=SCRIPT_DIR, stdout=subprocess.DEVNULL, check=True)
+        runs.append(time.perf_counter() - started)
+    return {
+        "runs": repeat,
+        "min_s": round(min(runs), 6),
+        "median_s": round(statistics.median(runs), 6),
+        "max_s": round(max(runs), 6),
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    repeat = max(1, args.repeat)
+    results = {name: measure(command, repeat) for name, command in cases(args.skill).items()}
+    savings: Dict[str, Optional[float]] = {
+        module: round(results[f"{module}_eager"]["median_s"] - results[module]["median_s"], 6)
+        if f"{module}_eager" in results else None
+        for module in MODULES
+    }
+
+    payload = {
+        "benchmark": "skill-creator-startup",
+        "version": BENCH_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+        "lazy_import_savings_s": savings,
+    }
+
+    for name, timing in results.items():
+        print(f"{name:22} median {timing['median_s']:.4f}s  min {timing['min_s']:.4f}s", file=sys.stderr)
+    for module, saved in savings.items():
+        if saved is None:
+            print(f"{module} eager case skipped: PyYAML is not installed", file=sys.stderr)
+        else:
+            print(f"{module} saves {saved * 1000:.1f} ms per start", file=sys.stderr)
+
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,19 +3,120 @@
 Skill Packager - Creates a distributable .skill file of a skill folder
 
 Usage:
-    python utils/package_skill.py <path/to/skill-folder> [output-directory]
+    python utils/package_skill.py <path/to/skill-folder> [output-directory] [--force] [--reproducible]
+    python utils/package_skill.py --all <skills-root> <dist> [--jobs N] [--force] [--reproducible]
 
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+
+A manifest of every packaged file (path, size, mtime, mode, SHA-256) is
+written next to the archive as `<name>.skill.manifest.json`. Repackaging is a
+no-op when the manifest still matches the skill folder; otherwise the archive
+is rebuilt, copying entries whose content and mode are unchanged from the old
+archive without recompressing them.
+
+--all packages every skill directly under <skills-root> concurrently: one
+thread per skill validates it and owns its ZipFile, while deflated files of
+256 KiB up to 8 MiB are compressed in a shared worker pool and handed back to
+that single writer in entry order, so the archives are identical to serial
+packaging. Smaller files are not worth the handoff. Files of 8 MiB and more
+are streamed and compressed on the writer thread: a pooled file comes back
+as one in-memory buffer, and keeping the largest ones out of the pool keeps
+memory flat.
+
+--reproducible makes the archive bytes a function of file contents only:
+entries are sorted, stamped with a fixed time ($SOURCE_DATE_EPOCH, else
+1980-01-01) and given 0644/0755 permissions.
+Every archive gets a `<name>.skill.sha256` digest file (sha256sum format).
+
+Compression policy: already-compressed formats (images, fonts, archives,
+media) are stored; everything else is deflated at a level chosen by size,
+and large files are streamed in chunks. Packaging fails if a file exceeds
+--max-file-size or the skill exceeds --max-total-size.
+
+Files are found with an os.scandir walk that never enters EXCLUDED_DIRS or
+symlinks. A `.skillignore` file at the skill root lists further paths to
+leave out, using gitignore-style patterns (`*`, `**`, `?`, `[...]`, leading
+`/` to anchor, trailing `/` for directories, `!` to re-include).
 """
 
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
+import struct
 import sys
+import tempfile
+import time
 import zipfile
+import zlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
 
 from quick_validate import validate_skill
 
+EXCLUDED_DIRS = {".git", ".svn", ".hg", "__pycache__", "node_modules"}
+IGNORE_FILENAME = ".skillignore"
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 2
+DIGEST_SUFFIX = ".sha256"
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+HASH_CHUNK_SIZE = 1 << 20
+# Under --all, deflated files from this size up to LARGE_FILE_SIZE are
+# compressed in the pool; larger ones are streamed by the writer.
+POOL_COMPRESS_THRESHOLD = 256 * 1024
+# At most this many pooled results wait for the writer, per archive.
+MAX_PENDING_COMPRESS = 4
+
+# Bump when the policy below changes, so manifests force a rebuild.
+COMPRESSION_POLICY_VERSION = 1
+STORED_SUFFIXES = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".heic", ".ico",
+    ".woff", ".woff2",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar", ".skill", ".jar", ".whl",
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".epub",
+    ".mp3", ".m4a", ".ogg", ".opus", ".flac", ".mp4", ".m4v", ".mov", ".webm", ".mkv",
+})
+SMALL_FILE_SIZE = 64 * 1024  # below this, maximum compression costs next to nothing
+LARGE_FILE_SIZE = 8 * 1024 * 1024  # at or above this, favour speed and stream from disk
+MAX_FILE_SIZE = 50 * 1024 * 1024
+MAX_TOTAL_SIZE = 200 * 1024 * 1024
+
+Log = Callable[[str], None]
+
+
+@dataclass
+class PackageResult:
+    skill: str
+    status: str  # "packaged", "up-to-date" or "failed"
+    archive: Optional[str]
+    message: str
+
+
+class SkillFile(NamedTuple):
+    path: Path
+    arcname: str
+    stat: os.stat_result
+
+
+class IgnoreRule(NamedTuple):
+    regex: Pattern
+    negate: bool
+    dir_only: bool
+
+
+@dataclass
+class _Outcome:
+    archive_path: Optional[Path]
+    status: str
+    message: str
+
 
 def _is_within(path: Path, root: Path) -> bool:
     try:
@@ -25,42 +126,526 @@ def _is_within(path: Path, root: Path) -> bool:
         return False
 
 
-def package_skill(skill_path, output_dir=None):
+def manifest_path_for(skill_filename: Path) -> Path:
+    return skill_filename.with_name(skill_filename.name + MANIFEST_SUFFIX)
+
+
+def digest_path_for(skill_filename: Path) -> Path:
+    return skill_filename.with_name(skill_filename.name + DIGEST_SUFFIX)
+
+
+def reproducible_date_time() -> Tuple[int, int, int, int, int, int]:
+    """Entry timestamp for reproducible archives: $SOURCE_DATE_EPOCH clamped to the ZIP range."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH", "").strip()
+    if not epoch:
+        return ZIP_EPOCH
+    try:
+        stamp = time.gmtime(int(epoch))[:6]
+    except (ValueError, OverflowError, OSError):
+        return ZIP_EPOCH
+    return max(stamp, ZIP_EPOCH)
+
+
+def archive_options(reproducible: bool = False) -> dict:
+    """Settings that shape archive bytes; recorded in the manifest so a change forces a rebuild."""
+    if not reproducible:
+        return {"reproducible": False, "policy": COMPRESSION_POLICY_VERSION}
+    return {
+        "reproducible": True,
+        "policy": COMPRESSION_POLICY_VERSION,
+        "date_time": list(reproducible_date_time()),
+    }
+
+
+def compression_for(arcname: str, size: int) -> Tuple[int, Optional[int]]:
+    """(compress_type, level) for an entry; depends only on its name and size."""
+    if Path(arcname).suffix.lower() in STORED_SUFFIXES:
+        return zipfile.ZIP_STORED, None
+    if size < SMALL_FILE_SIZE:
+        return zipfile.ZIP_DEFLATED, 9
+    if size < LARGE_FILE_SIZE:
+        return zipfile.ZIP_DEFLATED, 6
+    return zipfile.ZIP_DEFLATED, 1
+
+
+def parse_size(text: str) -> int:
+    """Byte count with an optional K/M/G suffix (powers of 1024), e.g. `50M`."""
+    m = re.fullmatch(r"\s*(\d+)\s*([kKmMgG]?)[bB]?\s*", text)
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+    return int(m.group(1)) * 1024 ** " KMG".index(m.group(2).upper() or " ")
+
+
+def _atomic_write_text(target: Path, text: str) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _glob_to_regex(pattern: str) -> str:
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_skillignore(text: str) -> List[IgnoreRule]:
+    """Compile gitignore-style lines; paths are matched relative to the skill root."""
+    rules = []
+    for line in text.splitlines():
+        if line.endswith("\\ "):
+            line = line[:-2] + " "
+        else:
+            line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith(("\\#", "\\!")):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to the root.
+        anchored = "/" in line
+        body = _glob_to_regex(line.lstrip("/"))
+        prefix = "^" if anchored else "^(?:.*/)?"
+        rules.append(IgnoreRule(re.compile(prefix + body + "$", re.DOTALL), negate, dir_only))
+    return rules
+
+
+def is_ignored(rules: List[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+    """gitignore semantics: the last matching rule wins."""
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.regex.match(rel_path):
+            ignored = not rule.negate
+    return ignored
+
+
+def _load_skillignore(skill_path: Path) -> List[IgnoreRule]:
+    try:
+        return parse_skillignore((skill_path / IGNORE_FILENAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+
+
+def _collect_files(
+    skill_path: Path, skill_name: str, skip: List[Path], log: Log = print
+) -> Optional[List[SkillFile]]:
+    """
+    Files to package, sorted by arcname, or None if a file escapes the skill root.
+
+    Walks with os.scandir and one lstat per entry: symlinks are never
+    followed or packaged, EXCLUDED_DIRS and `.skillignore`d directories are
+    pruned before descending, and paths in `skip` (the output archive and
+    its manifest/digest) are left out.
+    """
+    skip_resolved = {p.resolve() for p in skip}
+    rules = _load_skillignore(skill_path)
+    files = []
+    stack = [(skill_path, "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.name in EXCLUDED_DIRS:
+                    continue
+                rel = rel_dir + entry.name
+                st = entry.stat(follow_symlinks=False)
+                # Security: never follow or package symlinks.
+                if stat.S_ISLNK(st.st_mode):
+                    log(f"[WARN] Skipping symlink: {entry.path}")
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    if not is_ignored(rules, rel, True):
+                        stack.append((Path(entry.path), rel + "/"))
+                    continue
+                if not stat.S_ISREG(st.st_mode) or rel == IGNORE_FILENAME or is_ignored(rules, rel, False):
+                    continue
+
+                file_path = Path(entry.path)
+                # No component is a symlink, so the lexical path is the real
+                # one; this stays as a guard against walker mistakes.
+                if not _is_within(file_path, skill_path):
+                    log(f"[ERROR] File escapes skill root: {file_path}")
+                    return None
+                # If output lives under skill_path, avoid writing archive into itself.
+                if file_path in skip_resolved:
+                    log(f"[WARN] Skipping output archive: {file_path}")
+                    continue
+
+                files.append(SkillFile(file_path, f"{skill_name}/{rel}", st))
+    # Filesystem order varies between machines; entry order must not.
+    files.sort(key=lambda f: f.arcname)
+    return files
+
+
+def _load_manifest(skill_filename: Path, options: dict) -> Optional[dict]:
+    """The previous manifest, if it exists, used the same options and still describes the archive on disk."""
+    try:
+        manifest = json.loads(manifest_path_for(skill_filename).read_text(encoding="utf-8"))
+        st = skill_filename.stat()
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    if manifest.get("options", {"reproducible": False}) != options:
+        return None
+    archive = manifest.get("archive") or {}
+    if archive.get("size") != st.st_size or archive.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    return manifest
+
+
+def _entry_mode(st: os.stat_result, options: dict) -> int:
+    """Permission bits the archive entry records for a file with this stat."""
+    if options["reproducible"]:
+        return 0o755 if st.st_mode & 0o111 else 0o644
+    return stat.S_IMODE(st.st_mode)
+
+
+def _same_entry(old: Optional[dict], new: dict) -> bool:
+    """Whether an archive entry built from `old` is byte-for-byte what `new` would produce."""
+    return bool(old) and old.get("sha256") == new["sha256"] and old.get("mode") == new["mode"]
+
+
+def _current_manifest(files: List[SkillFile], previous: Optional[dict], options: dict) -> Dict[str, dict]:
+    """Describe `files`, reusing previous hashes for files whose size and mtime are unchanged."""
+    old_files = (previous or {}).get("files", {})
+    entries = {}
+    for file_path, arcname, st in files:
+        old = old_files.get(arcname)
+        if old and old.get("size") == st.st_size and old.get("mtime_ns") == st.st_mtime_ns:
+            digest = old["sha256"]
+        else:
+            digest = _file_sha256(file_path)
+        entries[arcname] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "mode": _entry_mode(st, options),
+            "sha256": digest,
+        }
+    return entries
+
+
+def _write_manifest(skill_filename: Path, files: Dict[str, dict], options: dict) -> None:
+    st = skill_filename.stat()
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "options": options,
+        "archive": {"size": st.st_size, "mtime_ns": st.st_mtime_ns},
+        "files": files,
+    }
+    text = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+    _atomic_write_text(manifest_path_for(skill_filename), text)
+
+
+def _write_digest(skill_filename: Path) -> None:
+    """`<archive>.sha256` in sha256sum format, so `sha256sum -c` can check it."""
+    text = f"{_file_sha256(skill_filename)}  {skill_filename.name}\n"
+    _atomic_write_text(digest_path_for(skill_filename), text)
+
+
+def _iter_raw_entry(fp, info: zipfile.ZipInfo) -> Iterable[bytes]:
+    """The still-compressed bytes of an entry, streamed straight from the archive file."""
+    fp.seek(info.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    if fields[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    offset = info.header_offset + zipfile.sizeFileHeader
+    offset += fields[zipfile._FH_FILENAME_LENGTH] + fields[zipfile._FH_EXTRA_FIELD_LENGTH]
+    remaining = info.compress_size
+    while remaining:
+        # The writer shares no state with this file, but re-seek in case
+        # anything else moved the position between chunks.
+        fp.seek(offset)
+        chunk = fp.read(min(HASH_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated entry {info.filename}")
+        offset += len(chunk)
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _copy_info(old: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    zinfo = zipfile.ZipInfo(old.filename, date_time=old.date_time)
+    zinfo.compress_type = old.compress_type
+    zinfo.external_attr = old.external_attr
+    zinfo.create_system = old.create_system
+    zinfo.flag_bits = old.flag_bits & ~zipfile._MASK_USE_DATA_DESCRIPTOR
+    zinfo.CRC = old.CRC
+    zinfo.compress_size = old.compress_size
+    zinfo.file_size = old.file_size
+    return zinfo
+
+
+def _entry_info(file_path: Path, arcname: str, options: dict) -> zipfile.ZipInfo:
+    if not options["reproducible"]:
+        zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+    else:
+        st = file_path.stat()
+        zinfo = zipfile.ZipInfo(arcname, date_time=tuple(options["date_time"]))
+        zinfo.create_system = 3  # Unix, so external_attr carries the mode everywhere
+        zinfo.external_attr = (stat.S_IFREG | _entry_mode(st, options)) << 16
+        zinfo.file_size = st.st_size
+    zinfo.compress_type, zinfo._compresslevel = compression_for(arcname, zinfo.file_size)
+    return zinfo
+
+
+def _stream_entry(zipf: zipfile.ZipFile, file_path: Path, arcname: str, options: dict) -> None:
+    """Write one file through ZipFile.open() in fixed-size chunks, so memory stays flat."""
+    zinfo = _entry_info(file_path, arcname, options)
+    with file_path.open("rb") as src, zipf.open(zinfo, "w") as dst:
+        shutil.copyfileobj(src, dst, HASH_CHUNK_SIZE)
+
+
+def _deflate_file(file_path: Path, arcname: str, options: dict) -> Tuple[zipfile.ZipInfo, bytes]:
+    """
+    Compress a file the way _stream_entry() would, returning its entry and raw data.
+
+    Runs in the compression pool; zlib releases the GIL, so threads compress
+    in parallel while the writer keeps ownership of the ZipFile. Only
+    mid-sized deflated files come here, which bounds the buffered output.
+    """
+    zinfo = _entry_info(file_path, arcname, options)
+    compressor = zlib.compressobj(zinfo._compresslevel, zlib.DEFLATED, -15)
+    crc = size = 0
+    chunks = []
+    with file_path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            chunks.append(compressor.compress(chunk))
+    chunks.append(compressor.flush())
+    raw = b"".join(chunks)
+    # The file may have changed since it was stat()ed; the entry must
+    # describe the bytes actually compressed, as ZipFile.open() does.
+    zinfo.file_size = size
+    zinfo.CRC = crc
+    zinfo.compress_size = len(raw)
+    return zinfo, raw
+
+
+def _write_raw_entry(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, chunks: Iterable[bytes]) -> None:
+    """
+    Append an already-compressed entry without recompressing it.
+
+    zipfile has no public raw-write API; this mirrors ZipFile.mkdir(), which
+    writes a header directly and then registers the entry.
+    """
+    zinfo.header_offset = zipf.fp.tell()
+    zipf._writecheck(zinfo)
+    zipf._didModify = True
+    zipf.fp.write(zinfo.FileHeader(None))
+    for chunk in chunks:
+        zipf.fp.write(chunk)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
+
+
+def _build_archive(
+    skill_filename: Path,
+    files: List[SkillFile],
+    entries: Dict[str, dict],
+    previous: Optional[dict],
+    options: dict,
+    compress_pool: Optional[Executor] = None,
+    log: Log = print,
+) -> None:
+    """
+    Write the archive to a temp file and swap it in, reusing unchanged compressed entries.
+
+    With a compress_pool, mid-sized new files are deflated there a few
+    entries ahead of the writer; this thread still writes every entry, in
+    order. Large and stored files are always streamed from disk.
+    """
+    old_files = (previous or {}).get("files", {})
+    reusable = {arcname for arcname, entry in entries.items() if _same_entry(old_files.get(arcname), entry)}
+    old_zip = None
+    if reusable:
+        try:
+            old_zip = zipfile.ZipFile(skill_filename, "r")
+        except (OSError, zipfile.BadZipFile):
+            reusable = set()
+
+    pooled: List[Tuple[Path, str]] = []
+    if compress_pool is not None:
+        for file_path, arcname, _ in files:
+            size = entries[arcname]["size"]
+            if (
+                arcname not in reusable
+                and POOL_COMPRESS_THRESHOLD <= size < LARGE_FILE_SIZE
+                and compression_for(arcname, size)[0] == zipfile.ZIP_DEFLATED
+            ):
+                pooled.append((file_path, arcname))
+    pooled.reverse()
+    pending: Dict[str, Future] = {}
+
+    def top_up() -> None:
+        # Pooled files are consumed in the order they were queued, so a
+        # small window ahead of the writer keeps every worker busy.
+        while pooled and len(pending) < MAX_PENDING_COMPRESS:
+            file_path, arcname = pooled.pop()
+            pending[arcname] = compress_pool.submit(_deflate_file, file_path, arcname, options)
+
+    top_up()
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{skill_filename.name}.", suffix=".tmp", dir=skill_filename.parent)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp_name, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for file_path, arcname, _ in files:
+                old_info = old_zip.NameToInfo.get(arcname) if old_zip and arcname in reusable else None
+                if old_info is not None:
+                    _write_raw_entry(zipf, _copy_info(old_info), _iter_raw_entry(old_zip.fp, old_info))
+                    log(f"  Reused: {arcname}")
+                    continue
+                if arcname in pending:
+                    zinfo, raw = pending.pop(arcname).result()
+                    _write_raw_entry(zipf, zinfo, [raw])
+                    top_up()
+                else:
+                    _stream_entry(zipf, file_path, arcname, options)
+                log(f"  Added: {arcname}")
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, skill_filename)
+    except BaseException:
+        for future in pending.values():
+            future.cancel()
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    finally:
+        if old_zip is not None:
+            old_zip.close()
+
+
+def package_skill(
+    skill_path,
+    output_dir=None,
+    force=False,
+    reproducible=False,
+    max_file_size=MAX_FILE_SIZE,
+    max_total_size=MAX_TOTAL_SIZE,
+):
     """
     Package a skill folder into a .skill file.
 
     Args:
         skill_path: Path to the skill folder
         output_dir: Optional output directory for the .skill file (defaults to current directory)
+        force: Rebuild even if the manifest says the archive is up to date
+        reproducible: Make the archive bytes depend only on file contents
+        max_file_size: Fail if any single file is larger than this many bytes
+        max_total_size: Fail if the files add up to more than this many bytes
 
     Returns:
         Path to the created .skill file, or None if error
     """
+    limits = (max_file_size, max_total_size)
+    return _package(skill_path, output_dir, force, reproducible, limits).archive_path
+
+
+def _check_limits(files: List[SkillFile], limits: Tuple[int, int]) -> Optional[str]:
+    max_file_size, max_total_size = limits
+    total = 0
+    for _, arcname, st in files:
+        size = st.st_size
+        if size > max_file_size:
+            return f"File too large: {arcname} ({size} bytes > limit {max_file_size})"
+        total += size
+    if total > max_total_size:
+        return f"Skill too large: {total} bytes > limit {max_total_size}"
+    return None
+
+
+def _package(
+    skill_path,
+    output_dir=None,
+    force=False,
+    reproducible=False,
+    limits: Tuple[int, int] = (MAX_FILE_SIZE, MAX_TOTAL_SIZE),
+    compress_pool: Optional[Executor] = None,
+    log: Log = print,
+) -> _Outcome:
+    """package_skill() with progress sent to `log` and a status for --all."""
     skill_path = Path(skill_path).resolve()
 
     # Validate skill folder exists
     if not skill_path.exists():
-        print(f"[ERROR] Skill folder not found: {skill_path}")
-        return None
+        return _fail(log, f"Skill folder not found: {skill_path}")
 
     if not skill_path.is_dir():
-        print(f"[ERROR] Path is not a directory: {skill_path}")
-        return None
+        return _fail(log, f"Path is not a directory: {skill_path}")
 
     # Validate SKILL.md exists
     skill_md = skill_path / "SKILL.md"
     if not skill_md.exists():
-        print(f"[ERROR] SKILL.md not found in {skill_path}")
-        return None
+        return _fail(log, f"SKILL.md not found in {skill_path}")
 
     # Run validation before packaging
-    print("Validating skill...")
+    log("Validating skill...")
     valid, message = validate_skill(skill_path)
     if not valid:
-        print(f"[ERROR] Validation failed: {message}")
-        print("   Please fix the validation errors before packaging.")
-        return None
-    print(f"[OK] {message}\n")
+        outcome = _fail(log, f"Validation failed: {message}")
+        log("   Please fix the validation errors before packaging.")
+        return outcome
+    log(f"[OK] {message}\n")
 
     # Determine output location
     skill_name = skill_path.name
@@ -72,62 +657,168 @@ def package_skill(skill_path, output_dir=None):
 
     skill_filename = output_path / f"{skill_name}.skill"
 
-    EXCLUDED_DIRS = {".git", ".svn", ".hg", "__pycache__", "node_modules"}
-
     # Create the .skill file (zip format)
     try:
-        with zipfile.ZipFile(skill_filename, "w", zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob("*"):
-                # Security: never follow or package symlinks.
-                if file_path.is_symlink():
-                    print(f"[WARN] Skipping symlink: {file_path}")
-                    continue
-
-                rel_parts = file_path.relative_to(skill_path).parts
-                if any(part in EXCLUDED_DIRS for part in rel_parts):
-                    continue
+        skip = [skill_filename, manifest_path_for(skill_filename), digest_path_for(skill_filename)]
+        files = _collect_files(skill_path, skill_name, skip, log)
+        if files is None:
+            return _Outcome(None, "failed", "File escapes skill root")
+        # Checked from stat sizes, before anything is hashed or compressed.
+        too_large = _check_limits(files, limits)
+        if too_large:
+            return _fail(log, too_large)
 
-                if file_path.is_file():
-                    resolved_file = file_path.resolve()
-                    if not _is_within(resolved_file, skill_path):
-                        print(f"[ERROR] File escapes skill root: {file_path}")
-                        return None
-                    # If output lives under skill_path, avoid writing archive into itself.
-                    if resolved_file == skill_filename.resolve():
-                        print(f"[WARN] Skipping output archive: {file_path}")
-                        continue
+        options = archive_options(reproducible)
+        previous = None if force else _load_manifest(skill_filename, options)
+        entries = _current_manifest(files, previous, options)
+        if (
+            previous is not None
+            and previous["files"].keys() == entries.keys()
+            and all(_same_entry(previous["files"][k], v) for k, v in entries.items())
+        ):
+            if previous["files"] != entries:
+                # Same content and modes, new mtimes: refresh so the next run skips hashing.
+                _write_manifest(skill_filename, entries, options)
+            if not digest_path_for(skill_filename).exists():
+                _write_digest(skill_filename)
+            log(f"[OK] Up to date: {skill_filename}")
+            return _Outcome(skill_filename, "up-to-date", "Up to date")
 
-                    # Calculate the relative path within the zip.
-                    arcname = Path(skill_name) / file_path.relative_to(skill_path)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
+        _build_archive(skill_filename, files, entries, previous, options, compress_pool, log)
+        _write_manifest(skill_filename, entries, options)
+        _write_digest(skill_filename)
 
-        print(f"\n[OK] Successfully packaged skill to: {skill_filename}")
-        return skill_filename
+        log(f"\n[OK] Successfully packaged skill to: {skill_filename}")
+        return _Outcome(skill_filename, "packaged", f"{len(files)} file(s)")
 
     except Exception as e:
-        print(f"[ERROR] Error creating .skill file: {e}")
-        return None
+        return _fail(log, f"Error creating .skill file: {e}")
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory]")
-        print("\nExample:")
-        print("  python utils/package_skill.py skills/public/my-skill")
-        print("  python utils/package_skill.py skills/public/my-skill ./dist")
-        sys.exit(1)
+def _fail(log: Log, message: str) -> _Outcome:
+    log(f"[ERROR] {message}")
+    return _Outcome(None, "failed", message)
 
-    skill_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
 
-    print(f"Packaging skill: {skill_path}")
-    if output_dir:
-        print(f"   Output directory: {output_dir}")
+def discover_skill_dirs(skills_root) -> List[Path]:
+    """Immediate subdirectories of skills_root that contain a SKILL.md, sorted."""
+    root = Path(skills_root)
+    return sorted(p for p in root.iterdir() if p.is_dir() and not p.is_symlink() and (p / "SKILL.md").is_file())
+
+
+def package_all(
+    skills_root,
+    dist,
+    force=False,
+    jobs=None,
+    reproducible=False,
+    max_file_size=MAX_FILE_SIZE,
+    max_total_size=MAX_TOTAL_SIZE,
+) -> List[PackageResult]:
+    """
+    Validate and package every skill under skills_root into dist, concurrently.
+
+    Each skill is handled by one thread, which is the only writer of its
+    ZipFile. Deflated files from POOL_COMPRESS_THRESHOLD up to
+    LARGE_FILE_SIZE are compressed in a shared pool; files of LARGE_FILE_SIZE
+    and more are streamed by the skill's thread, since a pooled result is
+    held in memory until written. Results are returned in skill-name order
+    whatever order they finish in.
+    """
+    skill_dirs = discover_skill_dirs(skills_root)
+    jobs = jobs or os.cpu_count() or 1
+    dist = Path(dist)
+    dist.mkdir(parents=True, exist_ok=True)
+
+    def run(skill_dir: Path) -> PackageResult:
+        # Per-file progress from concurrent skills would interleave; only the
+        # per-skill outcome is reported.
+        limits = (max_file_size, max_total_size)
+        outcome = _package(skill_dir, dist, force, reproducible, limits, compress_pool, log=lambda _line: None)
+        return PackageResult(
+            skill=skill_dir.name,
+            status=outcome.status,
+            archive=str(outcome.archive_path) if outcome.archive_path else None,
+            message=outcome.message,
+        )
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="compress") as compress_pool:
+        with ThreadPoolExecutor(max_workers=min(jobs, max(1, len(skill_dirs))), thread_name_prefix="skill") as skill_pool:
+            return list(skill_pool.map(run, skill_dirs))
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Package a skill folder into a .skill file.",
+        epilog="Example: python utils/package_skill.py skills/public/my-skill ./dist",
+    )
+    p.add_argument("skill_path", nargs="?", help="Path to the skill folder")
+    p.add_argument("output_dir", nargs="?", default=None, help="Output directory (default: current directory)")
+    p.add_argument("--all", nargs=2, metavar=("SKILLS_ROOT", "DIST"), help="Package every skill directly under SKILLS_ROOT into DIST")
+    p.add_argument("--jobs", type=int, default=0, help="With --all, skills packaged at once and compression threads (0 = one per CPU; default: 0)")
+    p.add_argument("--force", action="store_true", help="Rebuild the archive even if its manifest is up to date")
+    p.add_argument("--reproducible", action="store_true", help="Sorted entries, fixed timestamps ($SOURCE_DATE_EPOCH or 1980-01-01), normalized permissions")
+    p.add_argument("--max-file-size", type=parse_size, default=MAX_FILE_SIZE, help="Fail if any file is larger than this, e.g. 20M (default: 50M)")
+    p.add_argument("--max-total-size", type=parse_size, default=MAX_TOTAL_SIZE, help="Fail if a skill's files add up to more than this (default: 200M)")
+    args = p.parse_args()
+    if args.all and args.skill_path:
+        p.error("--all takes SKILLS_ROOT and DIST; do not also pass a skill folder")
+    if not args.all and not args.skill_path:
+        p.error("a skill folder (or --all SKILLS_ROOT DIST) is required")
+    return args
+
+
+def main_all(args: argparse.Namespace) -> int:
+    skills_root, dist = args.all
+    if not Path(skills_root).is_dir():
+        print(f"[ERROR] Skills root not found: {skills_root}")
+        return 1
+    print(f"Packaging all skills in: {skills_root}")
+    print(f"   Output directory: {dist}")
+    print()
+
+    results = package_all(
+        skills_root,
+        dist,
+        force=args.force,
+        jobs=args.jobs or None,
+        reproducible=args.reproducible,
+        max_file_size=args.max_file_size,
+        max_total_size=args.max_total_size,
+    )
+    if not results:
+        print(f"[ERROR] No skills (directories with SKILL.md) found in {skills_root}")
+        return 1
+    labels = {"packaged": "OK", "up-to-date": "SKIP", "failed": "FAIL"}
+    for r in results:
+        detail = r.archive if r.status != "failed" else r.message
+        print(f"[{labels[r.status]}] {r.skill}: {r.status} - {detail}")
+    counts = {status: sum(1 for r in results if r.status == status) for status in labels}
+    print(
+        f"\n{len(results)} skill(s): {counts['packaged']} packaged, "
+        f"{counts['up-to-date']} up to date, {counts['failed']} failed"
+    )
+    return 1 if counts["failed"] else 0
+
+
+def main():
+    args = parse_args()
+    if args.all:
+        sys.exit(main_all(args))
+
+    print(f"Packaging skill: {args.skill_path}")
+    if args.output_dir:
+        print(f"   Output directory: {args.output_dir}")
     print()
 
-    result = package_skill(skill_path, output_dir)
+    result = package_skill(
+        args.skill_path,
+        args.output_dir,
+        force=args.force,
+        reproducible=args.reproducible,
+        max_file_size=args.max_file_size,
+        max_total_size=args.max_total_size,
+    )
 
     if result:
         sys.exit(0)
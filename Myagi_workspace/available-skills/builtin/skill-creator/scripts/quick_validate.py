@@ -1,31 +1,162 @@
 #!/usr/bin/env python3
 """
 Quick validation script for skills - minimal version
+
+Usage:
+    python quick_validate.py <skill_directory>
+    python quick_validate.py --batch <skills_root> [<skills_root> ...] [--jobs N] [--json]
+
+Only the frontmatter is read: SKILL.md is streamed line by line up to the
+closing `---` fence, and never past FRONTMATTER_READ_LIMIT bytes, so a
+long skill body costs nothing. Frontmatter made of one-line `key: value`
+pairs is parsed without PyYAML; it is imported only for anything richer.
+
+Results are cached on disk, keyed by the frontmatter hash, the validator
+version, the frontmatter parser and the allowed-properties set, so an
+unchanged skill is not parsed again. The cache lives in
+$SKILL_VALIDATE_CACHE_DIR (set it to an empty string to disable), else
+$XDG_CACHE_HOME/skill-creator/validate or ~/.cache/skill-creator/validate.
+
+When a workspace indexing daemon (workspace_indexd.py) is listening on
+<workspace>/.workspace-indexd.sock or $WORKSPACE_INDEXD_SOCKET, results come
+from it instead; --no-daemon, or an empty $WORKSPACE_INDEXD_SOCKET, always
+validates directly.
 """
 
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
 import re
 import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from itertools import repeat
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-try:
-    import yaml
-except ModuleNotFoundError:
-    yaml = None
+# PyYAML is imported on first use by _yaml_module(): plain `key: value`
+# frontmatter never needs it. None means it is not installed.
+_NOT_LOADED = object()
+yaml = _NOT_LOADED
 
 MAX_SKILL_NAME_LENGTH = 64
+ALLOWED_PROPERTIES = frozenset({"name", "description", "license", "allowed-tools", "metadata"})
+# Bump whenever a rule in _validate_frontmatter changes so cached results expire.
+VALIDATOR_VERSION = "1"
+CACHE_DIR_ENV = "SKILL_VALIDATE_CACHE_DIR"
+CACHE_MAX_ENTRIES = 1024
+# Frontmatter is a few hundred bytes; anything past this is a missing fence.
+FRONTMATTER_READ_LIMIT = 64 * 1024
+DISCOVERY_EXCLUDED_DIRS = {".git", ".svn", ".hg", "__pycache__", "node_modules"}
+# Workspace indexing daemon (memory-retrieval/scripts/workspace_indexd.py).
+# While one is listening, it answers from results it keeps warm.
+INDEXD_SOCKET_NAME = ".workspace-indexd.sock"
+INDEXD_SOCKET_ENV = "WORKSPACE_INDEXD_SOCKET"
+INDEXD_TIMEOUT = 30.0
 
+PLAIN_LINE_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_-]*):[ ]+(\S.*?)[ ]*$")
+# Plain scalars YAML would resolve to something other than a string (bools,
+# nulls, numbers, dates, merge keys), or that open with an indicator.
+YAML_NON_STRING_RE = re.compile(
+    r"^(?:y|Y|yes|Yes|YES|n|N|no|No|NO|true|True|TRUE|false|False|FALSE"
+    r"|on|On|ON|off|Off|OFF|null|Null|NULL|~|=|<<)$|^[-+.0-9]|^[-?:,\[\]{}#&*!|>'\"%@`]"
+)
 
-def _extract_frontmatter(content: str) -> Optional[str]:
-    lines = content.splitlines()
-    if not lines or lines[0].strip() != "---":
-        return None
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            return "\n".join(lines[1:i])
+
+@dataclass
+class ValidationResult:
+    path: str
+    valid: bool
+    message: str
+
+
+def read_frontmatter(skill_md, limit: int = FRONTMATTER_READ_LIMIT) -> Optional[str]:
+    """
+    Frontmatter text of a SKILL.md, read without loading the body.
+
+    Lines are read until the closing `---` fence (LF, CRLF or CR endings)
+    and only they are decoded. Returns None when the file does not open with
+    a fence or no closing fence appears within `limit` bytes.
+    """
+    with open(skill_md, "rb") as fh:
+        remaining = limit
+        opened = False
+        lines: List[str] = []
+        while remaining > 0:
+            raw = fh.readline(remaining)
+            if not raw:
+                break
+            remaining -= len(raw)
+            # splitlines() also breaks on lone CRs, which readline() does not.
+            parts = raw.splitlines()
+            truncated = remaining <= 0 and not raw.endswith((b"\n", b"\r"))
+            if truncated:
+                parts.pop()
+            for part in parts:
+                line = part.decode("utf-8")
+                if not opened:
+                    if line.strip() != "---":
+                        return None
+                    opened = True
+                elif line.strip() == "---":
+                    return "\n".join(lines)
+                else:
+                    lines.append(line)
+            if truncated:
+                break
     return None
 
 
+def _yaml_module():
+    global yaml
+    if yaml is _NOT_LOADED:
+        try:
+            import yaml as module
+        except ModuleNotFoundError:
+            module = None
+        yaml = module
+    return yaml
+
+
+def _yaml_available() -> bool:
+    if yaml is _NOT_LOADED:
+        return importlib.util.find_spec("yaml") is not None
+    return yaml is not None
+
+
+def _parse_plain_frontmatter(frontmatter_text: str) -> Optional[dict[str, str]]:
+    """
+    Fast path for frontmatter made only of one-line `key: value` pairs.
+
+    Returns None unless every value is a string YAML would read exactly the
+    same way, so callers fall back to a real YAML parse for anything else.
+    """
+    parsed: dict[str, str] = {}
+    for line in frontmatter_text.split("\n"):
+        if not line.strip() or line.startswith("#"):
+            continue
+        match = PLAIN_LINE_RE.match(line)
+        if match is None or "\t" in line or not line.isprintable():
+            return None
+        key, value = match.groups()
+        if YAML_NON_STRING_RE.match(key):
+            return None
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+            if '"' in value or "\\" in value:
+                return None
+        elif len(value) >= 2 and value[0] == value[-1] == "'":
+            value = value[1:-1]
+            if "'" in value:
+                return None
+        elif YAML_NON_STRING_RE.match(value) or ": " in value or " #" in value or value.endswith(":"):
+            return None
+        parsed[key] = value
+    return parsed or None
+
+
 def _parse_simple_frontmatter(frontmatter_text: str) -> Optional[dict[str, str]]:
     """
     Minimal fallback parser used when PyYAML is unavailable.
@@ -64,42 +195,154 @@ def _parse_simple_frontmatter(frontmatter_text: str) -> Optional[dict[str, str]]
     return parsed
 
 
-def validate_skill(skill_path):
-    """Basic validation of a skill"""
-    skill_path = Path(skill_path)
+class ValidationCache:
+    """
+    Validation results on disk, one small JSON file per key.
+
+    Entries are written to a temp file and renamed into place, so concurrent
+    runs sharing the directory only ever see whole entries; a missing or
+    unreadable entry is simply a miss. Once the directory holds more than
+    max_entries, the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory, max_entries: int = CACHE_MAX_ENTRIES):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(content: bytes) -> str:
+        h = hashlib.sha256()
+        h.update(f"v{VALIDATOR_VERSION}\0".encode())
+        h.update(("pyyaml" if _yaml_available() else "simple").encode() + b"\0")
+        h.update(",".join(sorted(ALLOWED_PROPERTIES)).encode() + b"\0")
+        h.update(content)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bool, str]]:
+        entry = self.directory / f"{key}.json"
+        try:
+            data = json.loads(entry.read_text(encoding="utf-8"))
+            result = bool(data["valid"]), str(data["message"])
+            os.utime(entry)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return result
+
+    def put(self, key: str, valid: bool, message: str) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{key}.", suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump({"valid": valid, "message": message}, fh, ensure_ascii=False)
+                os.replace(tmp_name, self.directory / f"{key}.json")
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+            self._evict()
+        except OSError:
+            # The cache is an optimization; never fail validation over it.
+            pass
+
+    def _evict(self) -> None:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        # Trim to 90% so a full cache is not rescanned on every store.
+        for _, path in entries[: len(entries) - self.max_entries * 9 // 10]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def default_cache() -> Optional[ValidationCache]:
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured is not None:
+        return ValidationCache(configured) if configured else None
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return ValidationCache(Path(base) / "skill-creator" / "validate")
+
+
+_DEFAULT_CACHE = object()
 
-    skill_md = skill_path / "SKILL.md"
-    if not skill_md.exists():
-        return False, "SKILL.md not found"
+
+def validate_skill(skill_path, cache=_DEFAULT_CACHE):
+    """
+    Basic validation of a skill.
+
+    `cache` is a ValidationCache, None to skip caching, or omitted to use
+    default_cache().
+    """
+    skill_path = Path(skill_path)
 
     try:
-        content = skill_md.read_text(encoding="utf-8")
-    except OSError as e:
+        frontmatter_text = read_frontmatter(skill_path / "SKILL.md")
+    except FileNotFoundError:
+        return False, "SKILL.md not found"
+    except (OSError, UnicodeDecodeError) as e:
         return False, f"Could not read SKILL.md: {e}"
-
-    frontmatter_text = _extract_frontmatter(content)
     if frontmatter_text is None:
         return False, "Invalid frontmatter format"
-    if yaml is not None:
+
+    if cache is _DEFAULT_CACHE:
+        cache = default_cache()
+    if cache is None:
+        return _validate_frontmatter(frontmatter_text)
+
+    key = cache.key(frontmatter_text.encode("utf-8"))
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    valid, message = _validate_frontmatter(frontmatter_text)
+    cache.put(key, valid, message)
+    return valid, message
+
+
+def _validate_frontmatter(frontmatter_text: str) -> Tuple[bool, str]:
+    frontmatter, error = parse_frontmatter(frontmatter_text)
+    if frontmatter is None:
+        return False, error
+    return check_frontmatter(frontmatter)
+
+
+def parse_frontmatter(frontmatter_text: str) -> Tuple[Optional[dict], str]:
+    """The frontmatter mapping, or None and the reason it could not be parsed."""
+    frontmatter = _parse_plain_frontmatter(frontmatter_text)
+    if frontmatter is not None:
+        return frontmatter, ""
+    yaml_module = _yaml_module()
+    if yaml_module is not None:
         try:
-            frontmatter = yaml.safe_load(frontmatter_text)
+            frontmatter = yaml_module.safe_load(frontmatter_text)
             if not isinstance(frontmatter, dict):
-                return False, "Frontmatter must be a YAML dictionary"
-        except yaml.YAMLError as e:
-            return False, f"Invalid YAML in frontmatter: {e}"
+                return None, "Frontmatter must be a YAML dictionary"
+        except yaml_module.YAMLError as e:
+            return None, f"Invalid YAML in frontmatter: {e}"
     else:
         frontmatter = _parse_simple_frontmatter(frontmatter_text)
         if frontmatter is None:
-            return (
-                False,
-                "Invalid YAML in frontmatter: unsupported syntax without PyYAML installed",
-            )
+            return None, "Invalid YAML in frontmatter: unsupported syntax without PyYAML installed"
+    return frontmatter, ""
 
-    allowed_properties = {"name", "description", "license", "allowed-tools", "metadata"}
 
-    unexpected_keys = set(frontmatter.keys()) - allowed_properties
+def check_frontmatter(frontmatter: dict) -> Tuple[bool, str]:
+    """Apply the SKILL.md frontmatter rules to an already parsed mapping."""
+    unexpected_keys = set(frontmatter.keys()) - ALLOWED_PROPERTIES
     if unexpected_keys:
-        allowed = ", ".join(sorted(allowed_properties))
+        allowed = ", ".join(sorted(ALLOWED_PROPERTIES))
         unexpected = ", ".join(sorted(unexpected_keys))
         return (
             False,
@@ -149,11 +392,138 @@ def validate_skill(skill_path):
     return True, "Skill is valid!"
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python quick_validate.py <skill_directory>")
-        sys.exit(1)
+def discover_skills(roots: Iterable) -> List[Path]:
+    """
+    Every directory containing a SKILL.md under the given roots, sorted.
+
+    A skill's own subdirectories (scripts/, references/, ...) are not searched
+    for further skills, and VCS/cache/dependency directories are skipped.
+    """
+    found = set()
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            if "SKILL.md" in filenames:
+                found.add(Path(dirpath))
+                dirnames[:] = []
+                continue
+            dirnames[:] = [d for d in dirnames if d not in DISCOVERY_EXCLUDED_DIRS]
+    return sorted(found)
+
+
+def _validate_one(skill_path: Path, cache=_DEFAULT_CACHE) -> ValidationResult:
+    valid, message = validate_skill(skill_path, cache)
+    return ValidationResult(path=str(skill_path), valid=valid, message=message)
+
+
+def validate_many(skill_paths: List[Path], jobs: int = 1, cache=_DEFAULT_CACHE) -> Iterator[ValidationResult]:
+    """Validate skills in one process, or fanned out to `jobs` workers; results keep input order."""
+    if cache is _DEFAULT_CACHE:
+        cache = default_cache()
+    if jobs <= 1 or len(skill_paths) <= 1:
+        for path in skill_paths:
+            yield _validate_one(path, cache)
+        return
 
-    valid, message = validate_skill(sys.argv[1])
-    print(message)
-    sys.exit(0 if valid else 1)
+    # Imported here: loading the process pool machinery is slow and only
+    # batch runs with workers need it.
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(skill_paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(skill_paths))) as pool:
+        yield from pool.map(_validate_one, skill_paths, repeat(cache), chunksize=chunksize)
+
+
+def indexd_socket(start: Path) -> Optional[Path]:
+    """$WORKSPACE_INDEXD_SOCKET (empty disables), else the nearest daemon socket at or above start."""
+    configured = os.environ.get(INDEXD_SOCKET_ENV)
+    if configured is not None:
+        return Path(configured) if configured else None
+    for directory in (start, *start.parents):
+        candidate = directory / INDEXD_SOCKET_NAME
+        if candidate.is_socket():
+            return candidate
+    return None
+
+
+def indexd_validate(socket_path: Path, skill_paths: List[Path]) -> Optional[List[Tuple[bool, str]]]:
+    """(valid, message) per skill from the indexing daemon, or None when it does not answer."""
+    # Imported here: without a daemon running this is never needed.
+    import socket
+
+    request = {"op": "skills.validate", "paths": [str(Path(p).resolve()) for p in skill_paths]}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(INDEXD_TIMEOUT)
+            conn.connect(str(socket_path))
+            conn.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            with conn.makefile("rb") as reader:
+                reply = json.loads(reader.readline())
+        if not reply.get("ok"):
+            return None
+        return [(bool(valid), str(message)) for valid, message in reply["result"]["results"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Validate skill folders.")
+    p.add_argument("paths", nargs="+", help="Skill directory, or skills roots with --batch")
+    p.add_argument("--batch", action="store_true", help="Validate every directory containing SKILL.md under the given roots")
+    p.add_argument("--jobs", type=int, default=1, help="Validate in N worker processes (0 = one per CPU; default: 1)")
+    p.add_argument("--json", action="store_true", help="Emit per-skill results and totals as JSON")
+    cache_mode = p.add_mutually_exclusive_group()
+    cache_mode.add_argument("--cache-dir", default=None, help=f"Validation cache directory (default: ${CACHE_DIR_ENV} or the user cache dir)")
+    cache_mode.add_argument("--no-cache", action="store_true", help="Neither read nor write the validation cache")
+    p.add_argument("--no-daemon", action="store_true", help="Validate directly even when the workspace indexing daemon is running")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.no_cache:
+        cache = None
+    elif args.cache_dir:
+        cache = ValidationCache(args.cache_dir)
+    else:
+        cache = default_cache()
+
+    daemon = None if args.no_daemon else indexd_socket(Path(args.paths[0]).resolve())
+
+    if not args.batch and len(args.paths) == 1 and not args.json:
+        answered = indexd_validate(daemon, args.paths) if daemon is not None else None
+        valid, message = answered[0] if answered else validate_skill(args.paths[0], cache)
+        print(message)
+        return 0 if valid else 1
+
+    skill_paths = discover_skills(args.paths) if args.batch else [Path(p) for p in args.paths]
+    answered = indexd_validate(daemon, skill_paths) if daemon is not None and skill_paths else None
+    if answered is not None:
+        results = [ValidationResult(path=str(p), valid=v, message=m) for p, (v, m) in zip(skill_paths, answered)]
+    else:
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        results = list(validate_many(skill_paths, jobs, cache))
+    invalid = sum(1 for r in results if not r.valid)
+    # An empty batch is a failure: it almost always means a wrong root.
+    code = 1 if invalid or not results else 0
+
+    if args.json:
+        payload = {
+            "skills": [asdict(r) for r in results],
+            "total": len(results),
+            "valid": len(results) - invalid,
+            "invalid": invalid,
+        }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return code
+
+    if not results:
+        print("No skills found (no SKILL.md under the given paths)")
+        return code
+    for r in results:
+        print(f"[{'OK' if r.valid else 'FAIL'}] {r.path}: {r.message}")
+    print(f"\nValidated {len(results)} skill(s): {len(results) - invalid} valid, {invalid} invalid")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
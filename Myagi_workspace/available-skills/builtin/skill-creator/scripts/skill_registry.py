@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Compile every installed skill into one registry file.
+
+The registry holds, per skill: its path and name, the validation result, the
+parsed frontmatter (description, allowed-tools, ...), the SKILL.md sha256 and, with --dist, the
+sha256 of its packaged .skill archive. It is a single compact JSON document,
+so agent startup and skill routing read one file instead of walking and
+parsing every SKILL.md.
+
+Refreshes are incremental: a skill is re-read only when its SKILL.md size or
+mtime changed, skills that disappeared are dropped, and the file is rewritten
+only when something changed. A change to the validation rules rebuilds every
+entry.
+
+Usage:
+    python skill_registry.py available-skills skills --output skills-registry.json
+    python skill_registry.py available-skills skills --output skills-registry.json --dist dist
+    python skill_registry.py available-skills skills --output skills-registry.json --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from quick_validate import ValidationCache, check_frontmatter, discover_skills, parse_frontmatter, read_frontmatter
+
+REGISTRY_VERSION = 1
+# package_skill.py names archives <skill dir>.skill and digests <archive>.sha256.
+ARCHIVE_SUFFIX = ".skill"
+DIGEST_SUFFIX = ".sha256"
+
+
+@dataclass
+class RefreshStats:
+    skills: int = 0
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    written: bool = False
+
+
+def validator_fingerprint() -> str:
+    """Changes whenever cached validation results would: rules, version or parser."""
+    return ValidationCache.key(b"")
+
+
+def load_registry(registry_path) -> Optional[dict]:
+    """The registry as written by refresh_registry, or None if missing or unreadable."""
+    try:
+        registry = json.loads(Path(registry_path).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(registry, dict) or registry.get("version") != REGISTRY_VERSION:
+        return None
+    return registry
+
+
+def _archive_digest(dist: Optional[Path], skill_dir: Path) -> Optional[str]:
+    if dist is None:
+        return None
+    digest_file = dist / f"{skill_dir.name}{ARCHIVE_SUFFIX}{DIGEST_SUFFIX}"
+    try:
+        fields = digest_file.read_text(encoding="utf-8").split()
+    except (OSError, UnicodeDecodeError):
+        return None
+    return fields[0] if fields else None
+
+
+def _skill_entry(skill_dir: Path, st: os.stat_result) -> dict:
+    skill_md = skill_dir / "SKILL.md"
+    entry = {
+        "path": str(skill_dir),
+        "name": skill_dir.name,
+        "valid": False,
+        "message": "",
+        "frontmatter": None,
+        "sha256": None,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+    try:
+        entry["sha256"] = hashlib.sha256(skill_md.read_bytes()).hexdigest()
+        frontmatter_text = read_frontmatter(skill_md)
+    except (OSError, UnicodeDecodeError) as e:
+        entry["message"] = f"Could not read SKILL.md: {e}"
+        return entry
+    if frontmatter_text is None:
+        entry["message"] = "Invalid frontmatter format"
+        return entry
+
+    frontmatter, error = parse_frontmatter(frontmatter_text)
+    if frontmatter is None:
+        entry["message"] = error
+        return entry
+    entry["valid"], entry["message"] = check_frontmatter(frontmatter)
+    # YAML may produce dates and other non-JSON scalars; keep them as text.
+    entry["frontmatter"] = json.loads(json.dumps(frontmatter, default=str))
+    name = frontmatter.get("name")
+    if isinstance(name, str) and name.strip():
+        entry["name"] = name.strip()
+    return entry
+
+
+def _write_json(target: Path, payload: dict) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, separators=(",", ":"))
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def refresh_registry(
+    registry_path,
+    roots: List,
+    dist=None,
+    force: bool = False,
+) -> Tuple[dict, RefreshStats]:
+    """Bring the registry at registry_path up to date with the skills under roots."""
+    registry_path = Path(registry_path)
+    dist = Path(dist) if dist is not None else None
+    roots = [str(root) for root in roots]
+    fingerprint = validator_fingerprint()
+
+    previous = None if force else load_registry(registry_path)
+    if previous is not None and previous.get("validator") != fingerprint:
+        previous = None
+    old_entries: Dict[str, dict] = {e["path"]: e for e in previous["skills"]} if previous else {}
+
+    stats = RefreshStats()
+    entries = []
+    for skill_dir in discover_skills(roots):
+        try:
+            st = (skill_dir / "SKILL.md").stat()
+        except OSError:
+            continue
+        old = old_entries.pop(str(skill_dir), None)
+        archive = _archive_digest(dist, skill_dir)
+        if old is not None and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+            entry = dict(old)
+            if old.get("archive_sha256") == archive:
+                stats.unchanged += 1
+            else:
+                stats.updated += 1
+        else:
+            entry = _skill_entry(skill_dir, st)
+            if old is None:
+                stats.added += 1
+            else:
+                stats.updated += 1
+        entry["archive_sha256"] = archive
+        entries.append(entry)
+    stats.removed = len(old_entries)
+    stats.skills = len(entries)
+
+    registry = {
+        "version": REGISTRY_VERSION,
+        "validator": fingerprint,
+        "roots": roots,
+        "dist": str(dist) if dist is not None else None,
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "skills": entries,
+    }
+    changed = (
+        previous is None
+        or stats.added
+        or stats.updated
+        or stats.removed
+        or previous.get("roots") != registry["roots"]
+        or previous.get("dist") != registry["dist"]
+    )
+    if not changed:
+        return previous, stats
+    _write_json(registry_path, registry)
+    stats.written = True
+    return registry, stats
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Compile installed skills into one registry file.")
+    p.add_argument("roots", nargs="+", help="Skills roots to scan (e.g. available-skills skills)")
+    p.add_argument("--output", "-o", required=True, help="Registry file to create or refresh")
+    p.add_argument("--dist", default=None, help="Directory with packaged <skill>.skill archives and their .sha256 digests")
+    p.add_argument("--force", action="store_true", help="Re-read every skill instead of reusing unchanged entries")
+    p.add_argument("--json", action="store_true", help="Print the refresh statistics as JSON")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    registry, stats = refresh_registry(args.output, args.roots, args.dist, args.force)
+    invalid = sum(1 for e in registry["skills"] if not e["valid"])
+
+    if args.json:
+        print(json.dumps({**asdict(stats), "invalid": invalid, "registry": args.output}, indent=2))
+    else:
+        for entry in registry["skills"]:
+            if not entry["valid"]:
+                print(f"[WARN] {entry['path']}: {entry['message']}", file=sys.stderr)
+        action = "Wrote" if stats.written else "Up to date:"
+        print(
+            f"{action} {args.output}: {stats.skills} skill(s) "
+            f"({stats.added} added, {stats.updated} updated, {stats.removed} removed, "
+            f"{stats.unchanged} unchanged, {invalid} invalid)"
+        )
+    return 0 if registry["skills"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
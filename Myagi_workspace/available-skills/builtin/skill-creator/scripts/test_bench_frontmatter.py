@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the frontmatter scan benchmark.
+"""
+
+import io
+import json
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import bench_frontmatter
+from quick_validate import discover_skills, read_frontmatter
+
+
+class TestBenchFrontmatter(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_bench_frontmatter_"))
+        self.root = self.temp_dir / "skills"
+        for name in ("alpha", "beta"):
+            (self.root / name).mkdir(parents=True)
+            (self.root / name / "SKILL.md").write_text(f"---\nname: {name}\ndescription: ok\n---\n# {name}\n", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_padding_keeps_frontmatter_and_both_readers_agree(self):
+        copies = bench_frontmatter.pad_skills([str(self.root)], self.temp_dir / "padded", 8)
+
+        for skill_dir in discover_skills(copies):
+            skill_md = skill_dir / "SKILL.md"
+            self.assertGreaterEqual(skill_md.stat().st_size, 8 * 1024)
+            self.assertEqual(read_frontmatter(skill_md), bench_frontmatter.full_frontmatter(skill_md))
+            self.assertEqual(read_frontmatter(skill_md), f"name: {skill_dir.name}\ndescription: ok")
+
+    def test_results_are_machine_readable(self):
+        argv = ["bench_frontmatter.py", "--roots", str(self.root), "--repeat", "1", "--pad-kb", "4"]
+        out = io.StringIO()
+        with patch.object(sys, "argv", argv), redirect_stdout(out), redirect_stderr(io.StringIO()):
+            code = bench_frontmatter.main()
+        payload = json.loads(out.getvalue())
+
+        self.assertEqual(code, 0)
+        self.assertEqual(payload["corpus"]["skills"], 2)
+        self.assertEqual({name: r["items"] for name, r in payload["results"].items()}, {"full": 2, "streaming": 2})
+
+
+if __name__ == "__main__":
+    main()
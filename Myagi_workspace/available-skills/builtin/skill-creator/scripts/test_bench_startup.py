@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the start-up benchmark.
+"""
+
+import io
+import json
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import bench_startup
+
+
+class TestBenchStartup(TestCase):
+    def test_every_module_has_lazy_and_eager_cases(self):
+        names = set(bench_startup.cases("skill"))
+
+        self.assertEqual(
+            names,
+            {"python", "validate_cli"} | set(bench_startup.MODULES) | {f"{m}_eager" for m in bench_startup.MODULES},
+        )
+
+    def test_results_are_machine_readable(self):
+        out = io.StringIO()
+        with patch.object(sys, "argv", ["bench_startup.py", "--repeat", "1"]), redirect_stdout(out), redirect_stderr(io.StringIO()):
+            code = bench_startup.main()
+        payload = json.loads(out.getvalue())
+
+        self.assertEqual(code, 0)
+        self.assertEqual(set(payload["lazy_import_savings_s"]), set(bench_startup.MODULES))
+        self.assertEqual(payload["results"]["validate_cli"]["runs"], 1)
+
+    def test_eager_cases_are_skipped_without_pyyaml(self):
+        out = io.StringIO()
+        with patch.object(bench_startup, "yaml_installed", return_value=False):
+            with patch.object(sys, "argv", ["bench_startup.py", "--repeat", "1"]), redirect_stdout(out), redirect_stderr(io.StringIO()):
+                code = bench_startup.main()
+        payload = json.loads(out.getvalue())
+
+        self.assertEqual(code, 0)
+        self.assertEqual(set(payload["results"]), {"python", "validate_cli", *bench_startup.MODULES})
+        self.assertEqual(payload["lazy_import_savings_s"], {m: None for m in bench_startup.MODULES})
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,12 @@
 Regression tests for skill packaging security behavior.
 """
 
+import hashlib
+import json
+import os
 import sys
 import tempfile
+import tracemalloc
 import types
 import zipfile
 from pathlib import Path
@@ -156,5 +160,375 @@ class TestPackageSkillSecurity(TestCase):
         self.assertNotIn("self-output-skill/self-output-skill.skill", names)
 
 
+
+class TestIncrementalPackaging(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_skill_incremental_"))
+        self.skill_dir = self.temp_dir / "inc-skill"
+        self.skill_dir.mkdir()
+        (self.skill_dir / "SKILL.md").write_text("---\nname: inc-skill\ndescription: test\n---\n")
+        (self.skill_dir / "big.txt").write_text("lorem ipsum dolor\n" * 5000)
+        (self.skill_dir / "small.py").write_text("print('v1')\n")
+        self.out_dir = self.temp_dir / "out"
+        self.archive = self.out_dir / "inc-skill.skill"
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def package(self, **kwargs):
+        with patch.object(package_skill_module, "_stream_entry", wraps=package_skill_module._stream_entry) as write:
+            result = package_skill(str(self.skill_dir), str(self.out_dir), **kwargs)
+        self.assertEqual(result, self.archive)
+        return [Path(call.args[2]).name for call in write.call_args_list]
+
+    def test_writes_manifest_next_to_archive(self):
+        self.package()
+
+        manifest = json.loads(package_skill_module.manifest_path_for(self.archive).read_text())
+        self.assertEqual(set(manifest["files"]), {"inc-skill/SKILL.md", "inc-skill/big.txt", "inc-skill/small.py"})
+        self.assertEqual(manifest["files"]["inc-skill/small.py"]["size"], len("print('v1')\n"))
+
+    def test_unchanged_skill_is_a_no_op(self):
+        self.package()
+        before = self.archive.stat().st_mtime_ns
+
+        self.assertEqual(self.package(), [])
+        self.assertEqual(self.archive.stat().st_mtime_ns, before)
+
+    def test_touched_files_with_same_content_do_not_rebuild(self):
+        self.package()
+        os.utime(self.skill_dir / "big.txt", ns=(1, 1))
+
+        self.assertEqual(self.package(), [])
+        manifest = json.loads(package_skill_module.manifest_path_for(self.archive).read_text())
+        self.assertEqual(manifest["files"]["inc-skill/big.txt"]["mtime_ns"], 1)
+
+    def test_rebuild_recompresses_only_changed_files(self):
+        self.package()
+        (self.skill_dir / "small.py").write_text("print('v2')\n")
+
+        self.assertEqual(self.package(), ["small.py"])
+        with zipfile.ZipFile(self.archive) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.read("inc-skill/small.py"), b"print('v2')\n")
+            self.assertEqual(archive.read("inc-skill/big.txt"), b"lorem ipsum dolor\n" * 5000)
+
+    def test_removed_file_leaves_archive(self):
+        self.package()
+        (self.skill_dir / "small.py").unlink()
+
+        self.package()
+        with zipfile.ZipFile(self.archive) as archive:
+            self.assertNotIn("inc-skill/small.py", archive.namelist())
+
+    def test_chmod_rebuilds_the_entry(self):
+        self.package()
+        os.chmod(self.skill_dir / "small.py", 0o755)
+
+        self.assertEqual(self.package(), ["small.py"])
+        with zipfile.ZipFile(self.archive) as archive:
+            self.assertEqual(archive.getinfo("inc-skill/small.py").external_attr >> 16 & 0o777, 0o755)
+        self.assertEqual(self.package(), [])
+
+    def test_replaced_archive_or_force_rebuilds(self):
+        self.package()
+        self.assertEqual(len(self.package(force=True)), 3)
+
+        self.archive.write_bytes(b"not a zip")
+        self.assertEqual(len(self.package()), 3)
+
+
+
+class TestPackageAll(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_skill_all_"))
+        self.root = self.temp_dir / "skills"
+        for name in ("beta-skill", "alpha-skill", "gamma-skill"):
+            skill_dir = self.root / name
+            (skill_dir / "assets").mkdir(parents=True)
+            (skill_dir / "SKILL.md").write_text(f"---\nname: {name}\ndescription: test\n---\n")
+            (skill_dir / "assets" / "data.txt").write_text(f"{name} payload\n" * 20000)
+        (self.root / "dist").mkdir()
+        (self.root / "notes").mkdir()
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_packages_every_skill_in_name_order(self):
+        results = package_skill_module.package_all(self.root, self.root / "dist", jobs=3)
+
+        self.assertEqual([r.skill for r in results], ["alpha-skill", "beta-skill", "gamma-skill"])
+        self.assertEqual({r.status for r in results}, {"packaged"})
+        again = package_skill_module.package_all(self.root, self.root / "dist", jobs=3)
+        self.assertEqual({r.status for r in again}, {"up-to-date"})
+
+    def test_pool_compression_matches_serial_packaging(self):
+        with patch.object(package_skill_module, "POOL_COMPRESS_THRESHOLD", 0):
+            package_skill_module.package_all(self.root, self.temp_dir / "pooled", jobs=4)
+        for name in ("alpha-skill", "beta-skill", "gamma-skill"):
+            package_skill(str(self.root / name), str(self.temp_dir / "serial"))
+
+            pooled = (self.temp_dir / "pooled" / f"{name}.skill").read_bytes()
+            serial = (self.temp_dir / "serial" / f"{name}.skill").read_bytes()
+            self.assertEqual(pooled, serial, name)
+
+    def test_pooled_entry_matches_bytes_read_after_stat(self):
+        data = self.root / "alpha-skill" / "assets" / "data.txt"
+        entry_info = package_skill_module._entry_info
+
+        def grow_after_stat(*args):
+            zinfo = entry_info(*args)
+            with data.open("a") as fh:
+                fh.write("appended after stat\n")
+            return zinfo
+
+        with patch.object(package_skill_module, "_entry_info", side_effect=grow_after_stat):
+            zinfo, raw = package_skill_module._deflate_file(data, "alpha-skill/assets/data.txt", {"reproducible": False})
+        with zipfile.ZipFile(self.temp_dir / "grown.zip", "w") as archive:
+            package_skill_module._write_raw_entry(archive, zinfo, [raw])
+
+        with zipfile.ZipFile(self.temp_dir / "grown.zip") as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.read("alpha-skill/assets/data.txt"), data.read_bytes())
+
+    def test_reports_failures_per_skill(self):
+        def fake_validate(path):
+            return (False, "broken") if Path(path).name == "beta-skill" else (True, "Skill is valid!")
+
+        with patch.object(package_skill_module, "validate_skill", fake_validate):
+            results = package_skill_module.package_all(self.root, self.root / "dist", jobs=2)
+
+        by_skill = {r.skill: r for r in results}
+        self.assertEqual(by_skill["beta-skill"].status, "failed")
+        self.assertIn("broken", by_skill["beta-skill"].message)
+        self.assertIsNone(by_skill["beta-skill"].archive)
+        self.assertEqual(by_skill["alpha-skill"].status, "packaged")
+        self.assertFalse((self.root / "dist" / "beta-skill.skill").exists())
+
+
+
+class TestReproduciblePackaging(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_skill_repro_"))
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def create_copy(self, where, mtime, file_order):
+        skill_dir = self.temp_dir / where / "repro-skill"
+        (skill_dir / "scripts").mkdir(parents=True)
+        contents = {
+            "SKILL.md": "---\nname: repro-skill\ndescription: test\n---\n",
+            "scripts/run.sh": "#!/bin/sh\necho ok\n",
+            "notes.txt": "notes\n" * 100,
+        }
+        for rel in file_order:
+            (skill_dir / rel).write_text(contents[rel])
+            os.utime(skill_dir / rel, (mtime, mtime))
+        os.chmod(skill_dir / "scripts" / "run.sh", 0o775)
+        os.chmod(skill_dir / "notes.txt", 0o600)
+        return skill_dir
+
+    def test_identical_content_gives_identical_bytes(self):
+        first = self.create_copy("a", 1_700_000_000, ["SKILL.md", "scripts/run.sh", "notes.txt"])
+        second = self.create_copy("b", 1_600_000_000, ["notes.txt", "scripts/run.sh", "SKILL.md"])
+
+        one = package_skill(str(first), str(self.temp_dir / "out-a"), reproducible=True)
+        two = package_skill(str(second), str(self.temp_dir / "out-b"), reproducible=True)
+
+        self.assertEqual(one.read_bytes(), two.read_bytes())
+        digest = package_skill_module.digest_path_for(one).read_text()
+        self.assertEqual(digest, f"{hashlib.sha256(one.read_bytes()).hexdigest()}  repro-skill.skill\n")
+
+    def test_entries_are_normalized(self):
+        skill_dir = self.create_copy("a", 1_700_000_000, ["SKILL.md", "scripts/run.sh", "notes.txt"])
+
+        archive_path = package_skill(str(skill_dir), str(self.temp_dir / "out"), reproducible=True)
+
+        with zipfile.ZipFile(archive_path) as archive:
+            infos = archive.infolist()
+        self.assertEqual([i.filename for i in infos], sorted(i.filename for i in infos))
+        self.assertEqual({i.date_time for i in infos}, {(1980, 1, 1, 0, 0, 0)})
+        modes = {i.filename: (i.external_attr >> 16) & 0o777 for i in infos}
+        self.assertEqual(modes["repro-skill/scripts/run.sh"], 0o755)
+        self.assertEqual(modes["repro-skill/notes.txt"], 0o644)
+
+    def test_source_date_epoch_and_mode_switch_rebuild(self):
+        skill_dir = self.create_copy("a", 1_700_000_000, ["SKILL.md", "scripts/run.sh", "notes.txt"])
+        out = self.temp_dir / "out"
+
+        package_skill(str(skill_dir), str(out))
+        with patch.dict(os.environ, {"SOURCE_DATE_EPOCH": "1700000000"}):
+            archive_path = package_skill(str(skill_dir), str(out), reproducible=True)
+
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual({i.date_time for i in archive.infolist()}, {(2023, 11, 14, 22, 13, 20)})
+
+    def test_chmod_repackages_like_a_clean_build(self):
+        skill_dir = self.create_copy("a", 1_700_000_000, ["SKILL.md", "scripts/run.sh", "notes.txt"])
+        incremental = package_skill(str(skill_dir), str(self.temp_dir / "out"), reproducible=True)
+        os.chmod(skill_dir / "notes.txt", 0o700)
+
+        with patch.object(package_skill_module, "_stream_entry", wraps=package_skill_module._stream_entry) as write:
+            package_skill(str(skill_dir), str(self.temp_dir / "out"), reproducible=True)
+        clean = package_skill(str(skill_dir), str(self.temp_dir / "clean"), reproducible=True)
+
+        self.assertEqual([Path(call.args[2]).name for call in write.call_args_list], ["notes.txt"])
+        self.assertEqual(incremental.read_bytes(), clean.read_bytes())
+        with zipfile.ZipFile(incremental) as archive:
+            self.assertEqual(archive.getinfo("repro-skill/notes.txt").external_attr >> 16, 0o100755)
+
+    def test_digest_is_written_for_regular_archives(self):
+        skill_dir = self.create_copy("a", 1_700_000_000, ["SKILL.md", "scripts/run.sh", "notes.txt"])
+
+        archive_path = package_skill(str(skill_dir), str(skill_dir))
+
+        self.assertTrue(package_skill_module.digest_path_for(archive_path).exists())
+        package_skill(str(skill_dir), str(skill_dir), force=True)
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertFalse(any(name.endswith((".sha256", ".manifest.json")) for name in archive.namelist()))
+
+
+
+class TestCompressionPolicy(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_skill_policy_"))
+        self.skill_dir = self.temp_dir / "policy-skill"
+        (self.skill_dir / "assets").mkdir(parents=True)
+        (self.skill_dir / "SKILL.md").write_text("---\nname: policy-skill\ndescription: test\n---\n")
+        (self.skill_dir / "assets" / "photo.JPG").write_bytes(os.urandom(4096))
+        (self.skill_dir / "assets" / "table.csv").write_text("a,b,c\n" * 1000)
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_compressed_formats_are_stored(self):
+        archive_path = package_skill(str(self.skill_dir), str(self.temp_dir / "out"))
+
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual(archive.getinfo("policy-skill/assets/photo.JPG").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(archive.getinfo("policy-skill/assets/table.csv").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertIsNone(archive.testzip())
+
+    def test_level_depends_on_size(self):
+        levels = [
+            package_skill_module.compression_for("a.md", size)
+            for size in (1, package_skill_module.SMALL_FILE_SIZE, package_skill_module.LARGE_FILE_SIZE)
+        ]
+
+        self.assertEqual([level for _, level in levels], [9, 6, 1])
+
+    def test_size_limits_fail_before_writing(self):
+        out = self.temp_dir / "out"
+
+        self.assertIsNone(package_skill(str(self.skill_dir), str(out), max_file_size=5000))
+        self.assertIsNone(package_skill(str(self.skill_dir), str(out), max_total_size=8000))
+        self.assertFalse((out / "policy-skill.skill").exists())
+
+    def test_large_files_stream_with_bounded_memory(self):
+        big = self.skill_dir / "assets" / "big.log"
+        with big.open("w") as fh:
+            for i in range(400_000):
+                fh.write(f"{i:08d} synthetic log line for streaming\n")
+        self.assertGreater(big.stat().st_size, 16 * 1024 * 1024)
+
+        tracemalloc.start()
+        try:
+            with patch.object(package_skill_module, "LARGE_FILE_SIZE", 1024 * 1024):
+                results = package_skill_module.package_all(self.temp_dir, self.temp_dir / "out", jobs=2)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(results[0].status, "packaged")
+        self.assertLess(peak, 8 * 1024 * 1024)
+        with zipfile.ZipFile(results[0].archive) as archive:
+            self.assertEqual(archive.getinfo("policy-skill/assets/big.log").file_size, big.stat().st_size)
+            self.assertIsNone(archive.testzip())
+
+
+
+class TestSkillWalk(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_skill_walk_"))
+        self.skill_dir = self.temp_dir / "walk-skill"
+        for rel in (
+            "SKILL.md",
+            "scripts/run.py",
+            "scripts/node_modules/xlsx/index.js",
+            "scripts/debug.log",
+            "scripts/keep.log",
+            "drafts/todo.md",
+            "references/build/out.txt",
+            "build/out.txt",
+        ):
+            path = self.skill_dir / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x\n")
+        (self.skill_dir / ".skillignore").write_text("# local only\n*.log\n!keep.log\ndrafts/\n/build/\n")
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def collect(self):
+        files = package_skill_module._collect_files(self.skill_dir.resolve(), "walk-skill", [], log=lambda _m: None)
+        return [f.arcname for f in files]
+
+    def test_skillignore_patterns(self):
+        self.assertEqual(
+            self.collect(),
+            [
+                "walk-skill/SKILL.md",
+                "walk-skill/references/build/out.txt",
+                "walk-skill/scripts/keep.log",
+                "walk-skill/scripts/run.py",
+            ],
+        )
+
+    def test_excluded_and_ignored_dirs_are_never_opened(self):
+        opened = []
+        real_scandir = os.scandir
+
+        def spy(path):
+            opened.append(Path(path).name)
+            return real_scandir(path)
+
+        with patch.object(package_skill_module.os, "scandir", spy):
+            self.collect()
+
+        self.assertNotIn("node_modules", opened)
+        self.assertNotIn("drafts", opened)
+        self.assertIn("scripts", opened)
+
+    def test_gitignore_pattern_semantics(self):
+        rules = package_skill_module.parse_skillignore("docs/**/draft-*.md\n**/tmp\n[!a]x.txt\n\\#literal\n")
+
+        def ignored(path, is_dir=False):
+            return package_skill_module.is_ignored(rules, path, is_dir)
+
+        self.assertTrue(ignored("docs/draft-1.md"))
+        self.assertTrue(ignored("docs/a/b/draft-2.md"))
+        self.assertFalse(ignored("other/docs/draft-3.md"))
+        self.assertTrue(ignored("deep/tmp", is_dir=True))
+        self.assertTrue(ignored("bx.txt"))
+        self.assertFalse(ignored("ax.txt"))
+        self.assertTrue(ignored("#literal"))
+
+
 if __name__ == "__main__":
     main()
@@ -3,12 +3,34 @@
 Regression tests for quick skill validation.
 """
 
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
 import tempfile
+from contextlib import redirect_stdout
 from pathlib import Path
 from unittest import TestCase, main
+from unittest.mock import patch
 
 import quick_validate
 
+_cache_env = None
+
+
+def setUpModule():
+    # Keep the default validation cache out of the user's home directory.
+    global _cache_env
+    _cache_env = patch.dict(os.environ, {quick_validate.CACHE_DIR_ENV: tempfile.mkdtemp(prefix="test_validate_cache_")})
+    _cache_env.start()
+
+
+def tearDownModule():
+    shutil.rmtree(os.environ[quick_validate.CACHE_DIR_ENV], ignore_errors=True)
+    _cache_env.stop()
+
 
 class TestQuickValidate(TestCase):
     def setUp(self):
@@ -67,6 +89,217 @@ metadata: |
 
         self.assertTrue(valid, message)
 
+    def test_frontmatter_read_stops_at_closing_fence(self):
+        skill_md = self.temp_dir / "SKILL.md"
+        # The body is not valid UTF-8; it must never be decoded.
+        skill_md.write_bytes(b"---\rname: x\rdescription: y\r---\r" + b"\xff" * 1_000_000)
+
+        self.assertEqual(quick_validate.read_frontmatter(skill_md), "name: x\ndescription: y")
+
+    def test_frontmatter_read_is_bounded(self):
+        skill_md = self.temp_dir / "SKILL.md"
+        skill_md.write_text("---\nname: x\ndescription: " + "y" * 200 + "\n---\n", encoding="utf-8")
+
+        self.assertIsNone(quick_validate.read_frontmatter(skill_md, limit=100))
+        self.assertIsNotNone(quick_validate.read_frontmatter(skill_md, limit=1000))
+
+    def test_body_edits_reuse_cached_result(self):
+        skill_dir = self.temp_dir / "body-skill"
+        skill_dir.mkdir()
+        cache = quick_validate.ValidationCache(self.temp_dir / "cache")
+        header = "---\nname: body-skill\ndescription: ok\n---\n"
+        (skill_dir / "SKILL.md").write_text(header + "# v1\n", encoding="utf-8")
+        quick_validate.validate_skill(skill_dir, cache)
+        (skill_dir / "SKILL.md").write_text(header + "# v2, much longer\n" * 100, encoding="utf-8")
+
+        with patch.object(quick_validate, "_validate_frontmatter") as parse:
+            self.assertEqual(quick_validate.validate_skill(skill_dir, cache), (True, "Skill is valid!"))
+        parse.assert_not_called()
+
+
+class TestLazyYaml(TestCase):
+    def test_plain_frontmatter_does_not_import_yaml(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="test_quick_validate_lazy_"))
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        (temp_dir / "SKILL.md").write_text("---\nname: lazy\ndescription: 'Plain: quoted'\n---\n", encoding="utf-8")
+        script = (
+            "import sys, quick_validate; "
+            f"print(quick_validate.validate_skill({str(temp_dir)!r}, None)[0], 'yaml' in sys.modules)"
+        )
+
+        out = subprocess.run(
+            [sys.executable, "-c", script], cwd=Path(quick_validate.__file__).parent,
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+        self.assertEqual(out.split(), ["True", "False"])
+
+    def test_plain_parser_matches_yaml_or_defers(self):
+        cases = [
+            "name: x\ndescription: Use when: asked",
+            "name: x\ndescription: yes",
+            "name: x\ndescription: 2026-01-01",
+            "name: x\ndescription: C# and F#",
+            "name: x\ndescription: keep # comment",
+            "name: x\ndescription: \"quoted\"\n# a comment\nlicense: MIT",
+            "name: x\ndescription: [a, b]",
+            "name: x\nallowed-tools:\n  - gh",
+            "on: x",
+            "",
+        ]
+        yaml = quick_validate._yaml_module()
+        if yaml is None:
+            self.skipTest("PyYAML is not installed")
+        for text in cases:
+            with self.subTest(text=text):
+                parsed = quick_validate._parse_plain_frontmatter(text)
+                if parsed is not None:
+                    self.assertEqual(parsed, yaml.safe_load(text))
+
+        self.assertEqual(
+            quick_validate._parse_plain_frontmatter("name: x\ndescription: C# and F#"),
+            {"name": "x", "description": "C# and F#"},
+        )
+        self.assertIsNone(quick_validate._parse_plain_frontmatter("name: x\nallowed-tools:\n  - gh"))
+
+    def test_complex_frontmatter_still_uses_yaml(self):
+        if quick_validate._yaml_module() is None:
+            self.skipTest("PyYAML is not installed")
+        frontmatter, _ = quick_validate.parse_frontmatter("name: x\ndescription: y\nallowed-tools:\n  - gh")
+
+        self.assertEqual(frontmatter["allowed-tools"], ["gh"])
+
+
+class TestBatchValidate(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_quick_validate_batch_"))
+        self.write_skill("builtin/good-one", "---\nname: good-one\ndescription: ok\n---\n")
+        self.write_skill("global/bad-one", "---\nname: bad-one\nversion: 2\ndescription: ok\n---\n")
+        self.write_skill("workspace/good-two", "---\nname: good-two\ndescription: ok\n---\n")
+        # Neither nested resources nor dependency trees are treated as skills.
+        self.write_skill("workspace/good-two/references/inner", "not a skill")
+        self.write_skill("workspace/node_modules/pkg", "not a skill")
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def write_skill(self, rel, content):
+        skill_dir = self.temp_dir / rel
+        skill_dir.mkdir(parents=True, exist_ok=True)
+        (skill_dir / "SKILL.md").write_text(content, encoding="utf-8")
+
+    def run_main(self, *argv):
+        out = io.StringIO()
+        with patch.object(sys, "argv", ["quick_validate.py", *argv]), redirect_stdout(out):
+            code = quick_validate.main()
+        return code, out.getvalue()
+
+    def test_discovers_skill_directories(self):
+        found = quick_validate.discover_skills([self.temp_dir / "builtin", self.temp_dir / "global", self.temp_dir / "workspace"])
+
+        self.assertEqual(
+            [p.relative_to(self.temp_dir).as_posix() for p in found],
+            ["builtin/good-one", "global/bad-one", "workspace/good-two"],
+        )
+
+    def test_json_report_and_exit_code(self):
+        code, out = self.run_main("--batch", str(self.temp_dir), "--json")
+        payload = json.loads(out)
+
+        self.assertEqual(code, 1)
+        self.assertEqual((payload["total"], payload["valid"], payload["invalid"]), (3, 2, 1))
+        failed = [r for r in payload["skills"] if not r["valid"]]
+        self.assertTrue(failed[0]["path"].endswith("bad-one"))
+        self.assertIn("version", failed[0]["message"])
+
+    def test_worker_pool_matches_serial(self):
+        paths = quick_validate.discover_skills([self.temp_dir])
+
+        self.assertEqual(list(quick_validate.validate_many(paths, jobs=2)), list(quick_validate.validate_many(paths)))
+
+    def test_single_directory_keeps_plain_output(self):
+        code, out = self.run_main(str(self.temp_dir / "builtin" / "good-one"))
+
+        self.assertEqual((code, out), (0, "Skill is valid!\n"))
+
+    def test_empty_batch_fails(self):
+        code, out = self.run_main("--batch", str(self.temp_dir / "missing"))
+
+        self.assertEqual(code, 1)
+        self.assertIn("No skills found", out)
+
+
+class TestValidationCache(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_quick_validate_cache_"))
+        self.cache = quick_validate.ValidationCache(self.temp_dir / "cache")
+        self.skill_dir = self.temp_dir / "cached-skill"
+        self.skill_dir.mkdir()
+        self.write("---\nname: cached-skill\ndescription: ok\n---\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, content):
+        (self.skill_dir / "SKILL.md").write_text(content, encoding="utf-8")
+
+    def validate(self):
+        with patch.object(quick_validate, "_validate_frontmatter", wraps=quick_validate._validate_frontmatter) as spy:
+            result = quick_validate.validate_skill(self.skill_dir, self.cache)
+        return result, spy.call_count
+
+    def test_unchanged_skill_skips_parsing(self):
+        self.assertEqual(self.validate(), ((True, "Skill is valid!"), 1))
+        self.assertEqual(self.validate(), ((True, "Skill is valid!"), 0))
+
+    def test_content_change_misses(self):
+        self.validate()
+        self.write("---\nname: cached-skill\ndescription: <bad>\n---\n")
+
+        (valid, _), parsed = self.validate()
+
+        self.assertFalse(valid)
+        self.assertEqual(parsed, 1)
+
+    def test_rule_set_and_parser_are_part_of_the_key(self):
+        content = b"---\nname: x\ndescription: y\n---\n"
+        key = self.cache.key(content)
+
+        with patch.object(quick_validate, "ALLOWED_PROPERTIES", quick_validate.ALLOWED_PROPERTIES | {"version"}):
+            self.assertNotEqual(self.cache.key(content), key)
+        with patch.object(quick_validate, "VALIDATOR_VERSION", "test"):
+            self.assertNotEqual(self.cache.key(content), key)
+        with patch.object(quick_validate, "yaml", None if quick_validate.yaml else object()):
+            self.assertNotEqual(self.cache.key(content), key)
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.validate()
+        for entry in self.cache.directory.glob("*.json"):
+            entry.write_text("{not json", encoding="utf-8")
+
+        self.assertEqual(self.validate(), ((True, "Skill is valid!"), 1))
+
+    def test_eviction_drops_least_recently_used(self):
+        cache = quick_validate.ValidationCache(self.temp_dir / "small", max_entries=10)
+        for i in range(10):
+            key = cache.key(str(i).encode())
+            cache.put(key, True, "ok")
+            os.utime(cache.directory / f"{key}.json", (1000 + i, 1000 + i))
+
+        cache.put(cache.key(b"fresh"), True, "ok")
+
+        self.assertEqual(len(list(cache.directory.glob("*.json"))), 9)
+        self.assertIsNone(cache.get(cache.key(b"0")))
+        self.assertIsNone(cache.get(cache.key(b"1")))
+        self.assertEqual(cache.get(cache.key(b"fresh")), (True, "ok"))
+
+    def test_disabled_by_empty_env(self):
+        with patch.dict(os.environ, {quick_validate.CACHE_DIR_ENV: ""}):
+            self.assertIsNone(quick_validate.default_cache())
+
 
 if __name__ == "__main__":
     main()
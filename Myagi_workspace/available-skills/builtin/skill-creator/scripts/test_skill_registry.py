@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the compiled skill registry.
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import quick_validate
+import skill_registry
+
+
+class TestSkillRegistry(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_skill_registry_"))
+        self.root = self.temp_dir / "available-skills"
+        self.registry_path = self.temp_dir / "registry.json"
+        self.write_skill("builtin/alpha", "---\nname: alpha\ndescription: First skill\nallowed-tools:\n  - gh\n---\n# Alpha\n")
+        self.write_skill("workspace/beta", "---\nname: beta\ndescription: Second skill\nversion: 2\n---\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_skill(self, relative, content, mtime=None):
+        skill_dir = self.root / relative
+        skill_dir.mkdir(parents=True, exist_ok=True)
+        skill_md = skill_dir / "SKILL.md"
+        skill_md.write_text(content, encoding="utf-8")
+        if mtime is not None:
+            os.utime(skill_md, (mtime, mtime))
+        return skill_dir
+
+    def refresh(self, **kwargs):
+        with patch.object(skill_registry, "_skill_entry", wraps=skill_registry._skill_entry) as spy:
+            registry, stats = skill_registry.refresh_registry(self.registry_path, [self.root], **kwargs)
+        return registry, stats, sorted(Path(c.args[0]).name for c in spy.call_args_list)
+
+    def test_registry_holds_validated_frontmatter(self):
+        registry, stats, _ = self.refresh()
+        skills = {e["name"]: e for e in skill_registry.load_registry(self.registry_path)["skills"]}
+
+        self.assertEqual(registry["skills"], list(skills.values()))
+        self.assertEqual((stats.skills, stats.added, stats.written), (2, 2, True))
+        self.assertTrue(skills["alpha"]["valid"])
+        self.assertEqual(skills["alpha"]["frontmatter"]["allowed-tools"], ["gh"])
+        self.assertEqual(len(skills["alpha"]["sha256"]), 64)
+        self.assertFalse(skills["beta"]["valid"])
+        self.assertIn("version", skills["beta"]["message"])
+
+    def test_refresh_rereads_only_changed_skills(self):
+        self.refresh()
+        written = self.registry_path.stat().st_mtime_ns
+
+        _, stats, reread = self.refresh()
+        self.assertEqual((stats.unchanged, stats.written, reread), (2, False, []))
+        self.assertEqual(self.registry_path.stat().st_mtime_ns, written)
+
+        self.write_skill("builtin/alpha", "---\nname: alpha\ndescription: Edited\n---\n", mtime=2_000_000_000)
+        self.write_skill("global/gamma", "---\nname: gamma\ndescription: New\n---\n")
+        shutil.rmtree(self.root / "workspace" / "beta")
+        registry, stats, reread = self.refresh()
+
+        self.assertEqual((stats.updated, stats.added, stats.removed, stats.unchanged), (1, 1, 1, 0))
+        self.assertEqual(reread, ["alpha", "gamma"])
+        self.assertEqual([e["name"] for e in registry["skills"]], ["alpha", "gamma"])
+        self.assertEqual(registry["skills"][0]["frontmatter"]["description"], "Edited")
+
+    def test_rule_change_rebuilds_every_entry(self):
+        self.refresh()
+
+        with patch.object(quick_validate, "ALLOWED_PROPERTIES", quick_validate.ALLOWED_PROPERTIES | {"version"}):
+            registry, _, reread = self.refresh()
+
+        self.assertEqual(reread, ["alpha", "beta"])
+        self.assertTrue(all(e["valid"] for e in registry["skills"]))
+
+    def test_archive_digests_are_picked_up(self):
+        dist = self.temp_dir / "dist"
+        dist.mkdir()
+        self.refresh(dist=dist)
+        (dist / "alpha.skill.sha256").write_text(f"{'ab' * 32}  alpha.skill\n", encoding="utf-8")
+
+        registry, stats, reread = self.refresh(dist=dist)
+
+        self.assertEqual((stats.updated, reread), (1, []))
+        self.assertEqual([e["archive_sha256"] for e in registry["skills"]], ["ab" * 32, None])
+
+    def test_cli_reports_stats(self):
+        argv = ["skill_registry.py", str(self.root), "--output", str(self.registry_path), "--json"]
+        out = io.StringIO()
+        with patch.object(sys, "argv", argv), redirect_stdout(out), redirect_stderr(io.StringIO()):
+            code = skill_registry.main()
+
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out.getvalue())["invalid"], 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,13 @@ done
 
 # 2. Generate summary CSV
 echo "📊 Generating summary CSV..."
-EXPENSE_DIR="$EXPENSE_DIR" node "$SCRIPT_DIR/build-summary.js" "$TARGET_DIR/$SUMMARY_NAME"
+# build_summary.py only reads rows appended since the last sync; fall back to
+# the full-rescan node script where python3 is unavailable.
+if command -v python3 >/dev/null 2>&1; then
+  EXPENSE_DIR="$EXPENSE_DIR" python3 "$SCRIPT_DIR/build_summary.py" "$TARGET_DIR/$SUMMARY_NAME"
+else
+  EXPENSE_DIR="$EXPENSE_DIR" node "$SCRIPT_DIR/build-summary.js" "$TARGET_DIR/$SUMMARY_NAME"
+fi
 
 # 3. Remove legacy Excel export if present
 if [ -f "$TARGET_DIR/expenses.xlsx" ]; then
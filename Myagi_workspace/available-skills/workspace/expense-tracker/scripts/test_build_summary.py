@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the incremental summary.csv builder.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main, skipUnless
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import build_summary
+
+HEADER = "date,time,category,item,amount,note\n"
+
+
+class TestBuildSummary(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_build_summary_"))
+        self.expense_dir = self.temp_dir / "expenses"
+        self.expense_dir.mkdir()
+        self.output = self.temp_dir / "Expense tracking" / "summary.csv"
+        self.state = self.expense_dir / build_summary.STATE_NAME
+        self.write("2026-03.csv", HEADER + "2026-03-18,13:14,餐飲,滷味,120,午餐\n2026-03-18,15:00,飲料,紅茶,25,\n")
+        self.write("2026-04.csv", HEADER + "2026-04-01,08:10,交通,捷運,35,\n\n")
+        self.write("2026-05.csv", "")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name, text, mode="w"):
+        with open(self.expense_dir / name, mode, encoding="utf-8") as fh:
+            fh.write(text)
+
+    def build(self):
+        return build_summary.build_summary(self.expense_dir, self.output, self.state)
+
+    def test_summary_rows(self):
+        stats = self.build()
+
+        self.assertTrue(stats.written)
+        self.assertEqual(
+            self.output.read_text(encoding="utf-8"),
+            "period,record_count,total_amount\n2026-03,2,145\n2026-04,1,35\n2026-05,0,0\nALL_TIME,3,180\n",
+        )
+
+    def test_append_reads_only_new_bytes(self):
+        self.build()
+        self.write("2026-04.csv", "2026-04-02,09:00,餐飲,早餐,60,\n", mode="a")
+
+        stats = self.build()
+
+        self.assertEqual((stats.appended, stats.rebuilt, stats.unchanged, stats.lines_read), (1, 0, 2, 1))
+        self.assertIn("2026-04,2,95\n", self.output.read_text(encoding="utf-8"))
+
+    def test_shrunk_or_rewritten_file_is_rebuilt(self):
+        self.build()
+        self.write("2026-03.csv", HEADER + "2026-03-18,13:14,餐飲,滷味,100,午餐\n")
+
+        stats = self.build()
+
+        self.assertEqual(stats.rebuilt, 1)
+        self.assertIn("2026-03,1,100\n", self.output.read_text(encoding="utf-8"))
+
+    def test_head_change_forces_rebuild(self):
+        self.build()
+        self.write("2026-04.csv", HEADER.replace("note", "memo") + "2026-04-01,08:10,交通,捷運,35,\n2026-04-02,08:10,交通,公車,15,\n")
+
+        stats = self.build()
+
+        self.assertEqual((stats.appended, stats.rebuilt), (0, 1))
+        self.assertIn("2026-04,2,50\n", self.output.read_text(encoding="utf-8"))
+
+    def test_fractional_amounts_are_summed_exactly(self):
+        self.build()
+        self.write("2026-04.csv", "2026-04-02,09:00,飲料,豆漿,12.5,\n2026-04-02,09:05,其他,找零,0.1,\n", mode="a")
+        self.build()
+        self.write("2026-04.csv", "2026-04-02,09:10,其他,找零,0.2,\n", mode="a")
+
+        self.build()
+
+        text = self.output.read_text(encoding="utf-8")
+        self.assertIn(f"2026-04,4,{35 + 12.5 + 0.1 + 0.2}\n", text)
+        self.assertTrue(text.endswith(f"ALL_TIME,6,{145 + (35 + 12.5 + 0.1 + 0.2) + 0}\n"))
+
+    def test_noop_run_leaves_files_alone(self):
+        self.build()
+        before = (self.output.stat().st_mtime_ns, self.state.stat().st_mtime_ns)
+
+        stats = self.build()
+
+        self.assertFalse(stats.written)
+        self.assertEqual((self.output.stat().st_mtime_ns, self.state.stat().st_mtime_ns), before)
+
+    @skipUnless(shutil.which("node"), "node is not installed")
+    def test_matches_build_summary_js(self):
+        self.write("2026-03.csv", "2026-03-20,12:00,飲料,豆漿,12.5,\n2026-03-20,12:01,其他,找零,0.1,\n", mode="a")
+        self.write("2026-04.csv", "2026-04-02,09:00,其他,找零,0.2,\n2026-04-03,10:00,其他,雜支,7", mode="a")
+        self.build()
+        js_output = self.temp_dir / "js-summary.csv"
+        subprocess.run(
+            ["node", str(SCRIPT_DIR / "build-summary.js"), str(js_output)],
+            env={**os.environ, "EXPENSE_DIR": str(self.expense_dir)},
+            check=True, capture_output=True,
+        )
+
+        self.assertEqual(self.output.read_text(encoding="utf-8"), js_output.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    main()
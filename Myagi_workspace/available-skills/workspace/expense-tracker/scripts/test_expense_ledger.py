@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the columnar expense ledger.
+"""
+
+import io
+import json
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import expense_ledger
+
+HEADER = "date,time,category,item,amount,note\n"
+
+
+class TestExpenseLedger(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_expense_ledger_"))
+        self.write("2026-03.csv", HEADER + "2026-03-18,13:14,餐飲,滷味,120,午餐\n2026-03-18,15:00,飲料,紅茶,25,\n")
+        self.write("2026-04.csv", HEADER + "2026-04-01,08:10,交通,捷運,35,\n2026-04-06,12:00,餐飲,便當,90,有逗號, 也沒關係\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name, text, mode="w"):
+        with open(self.temp_dir / name, mode, encoding="utf-8") as fh:
+            fh.write(text)
+
+    def open(self):
+        return expense_ledger.open_ledger(self.temp_dir)
+
+    def test_queries_match_the_csvs(self):
+        ledger, _ = self.open()
+
+        day = ledger.summary(date(2026, 3, 18), date(2026, 3, 18))
+        self.assertEqual((day.count, day.total, day.categories), (2, 145, {"餐飲": 120, "飲料": 25}))
+        everything = ledger.summary(date(2026, 1, 1), date(2026, 12, 31))
+        self.assertEqual((everything.count, everything.total), (4, 270))
+        self.assertEqual(list(ledger.rows(date(2026, 4, 6)))[0].note, "有逗號, 也沒關係")
+        self.assertEqual(list(ledger.rows())[0].time, "13:14")
+
+    def test_fractional_amounts_are_not_rounded(self):
+        self.write("2026-03.csv", "2026-03-18,16:00,飲料,豆漿,12.5,\n2026-03-18,16:05,飲料,豆漿,12.5,\n", mode="a")
+        self.open()
+
+        ledger, _ = expense_ledger.open_ledger(self.temp_dir, refresh=False)
+        day = ledger.summary(date(2026, 3, 18), date(2026, 3, 18))
+
+        self.assertEqual((day.total, day.categories["飲料"]), (170, 50))
+        self.assertEqual(list(ledger.rows())[2].amount, 12.5)
+        self.write("2026-03.csv", "2026-03-18,17:00,其他,找零,0.3,\n", mode="a")
+        ledger, _ = self.open()
+        day = ledger.summary(date(2026, 3, 18), date(2026, 3, 18))
+        self.assertEqual(day.total, 170.3)
+        # stats.sh prints totals with awk's %d.
+        self.assertIn("💰 總計：$170（5 筆）", expense_ledger.format_summary("", day))
+
+    def test_store_round_trip_answers_without_csvs(self):
+        self.open()
+        for csv_file in self.temp_dir.glob("*.csv"):
+            csv_file.unlink()
+
+        ledger, stats = expense_ledger.open_ledger(self.temp_dir, refresh=False)
+
+        self.assertIsNone(stats)
+        self.assertEqual(ledger.summary(date(2026, 4, 1), date(2026, 4, 30)).total, 125)
+
+    def test_append_parses_only_new_rows(self):
+        self.open()
+        self.write("2026-04.csv", "2026-04-07,19:30,娛樂,電影,300,\n", mode="a")
+
+        ledger, stats = self.open()
+
+        self.assertEqual((stats.appended, stats.rebuilt, stats.unchanged, stats.rows_parsed), (1, 0, 1, 1))
+        self.assertEqual(ledger.summary(date(2026, 4, 6), date(2026, 4, 12)).categories, {"娛樂": 300, "餐飲": 90})
+
+    def test_rewrite_and_removal_rebuild(self):
+        self.open()
+        self.write("2026-03.csv", HEADER + "2026-03-20,09:00,其他,雜支,10,\n2026-03-21,09:00,其他,雜支,10,\n2026-03-22,09:00,其他,雜支,10,\n")
+        (self.temp_dir / "2026-04.csv").unlink()
+
+        ledger, stats = self.open()
+
+        self.assertEqual((stats.rebuilt, stats.removed), (1, 1))
+        self.assertEqual(ledger.summary(date(2026, 1, 1), date(2026, 12, 31)).total, 30)
+
+    def test_unfinished_last_line_is_reread(self):
+        self.write("2026-05.csv", HEADER + "2026-05-01,10:00,餐飲,早餐,5")
+        ledger, _ = self.open()
+        self.assertEqual(ledger.summary(date(2026, 5, 1), date(2026, 5, 1)).total, 5)
+
+        self.write("2026-05.csv", "5,\n", mode="a")
+        ledger, stats = self.open()
+
+        self.assertEqual(stats.rebuilt, 1)
+        self.assertEqual(ledger.summary(date(2026, 5, 1), date(2026, 5, 1)).total, 55)
+
+    def test_periods_follow_stats_sh(self):
+        self.assertEqual(expense_ledger.period_for("weekly", ["2026-03-18"])[1:], (date(2026, 3, 16), date(2026, 3, 22)))
+        self.assertEqual(expense_ledger.period_for("monthly", ["2024-02"])[1:], (date(2024, 2, 1), date(2024, 2, 29)))
+        with self.assertRaises(ValueError):
+            expense_ledger.period_for("range", ["2026-03-01"])
+
+    def test_cli_reports(self):
+        out = io.StringIO()
+        argv = ["expense_ledger.py", "monthly", "2026-03", "--expense-dir", str(self.temp_dir)]
+        with patch.object(sys, "argv", argv), redirect_stdout(out):
+            self.assertEqual(expense_ledger.main(), 0)
+        self.assertIn("💰 總計：$145（2 筆）", out.getvalue())
+
+        out = io.StringIO()
+        with patch.object(sys, "argv", argv[:2] + ["2026-06", "--json"] + argv[3:]), redirect_stdout(out):
+            expense_ledger.main()
+        self.assertEqual(json.loads(out.getvalue())["count"], 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the streaming XLSX exporter.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import TestCase, main
+from xml.etree import ElementTree
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import export_xlsx
+
+HEADER = "date,time,category,item,amount,note\n"
+NS = {"m": export_xlsx.MAIN_NS}
+
+
+def read_workbook(path):
+    """{sheet name: [[cell values]]} for the sheets in tab order."""
+    with zipfile.ZipFile(path) as zf:
+        rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {r.get("Id"): r.get("Target") for r in rels}
+        book = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        sheets = {}
+        for sheet in book.find("m:sheets", NS):
+            rid = sheet.get(f"{{{export_xlsx.REL_NS}}}id")
+            root = ElementTree.fromstring(zf.read("xl/" + targets[rid]))
+            rows = []
+            for row in root.iter(f"{{{export_xlsx.MAIN_NS}}}row"):
+                values = []
+                for cell in row:
+                    text = cell.find("m:is/m:t", NS)
+                    number = cell.find("m:v", NS)
+                    values.append(text.text if text is not None else json.loads(number.text) if number is not None else "")
+                rows.append(values)
+            sheets[sheet.get("name")] = rows
+        return sheets
+
+
+class TestExportXlsx(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_export_xlsx_"))
+        self.expense_dir = self.temp_dir / "expenses"
+        self.expense_dir.mkdir()
+        self.output = self.temp_dir / "expenses.xlsx"
+        self.write("2026-03.csv", HEADER + "2026-03-18,13:14,餐飲,滷味,120,午餐 <辣> & 蛋\n2026-03-19,15:00,飲料,紅茶,25,\n")
+        self.write("2026-04.csv", HEADER + "2026-04-01,08:10,交通,捷運,35,\n")
+        self.write("2026-05.csv", HEADER)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name, text, mode="w"):
+        with open(self.expense_dir / name, mode, encoding="utf-8") as fh:
+            fh.write(text)
+
+    def export(self):
+        return export_xlsx.export_workbook(self.expense_dir, self.output)
+
+    def test_workbook_layout_matches_csv2xlsx(self):
+        stats = self.export()
+        sheets = read_workbook(self.output)
+
+        self.assertEqual(list(sheets), ["2026-03", "2026-04", "總覽", "全部紀錄"])
+        self.assertEqual(stats.sheets, list(sheets))
+        self.assertEqual(sheets["2026-03"][1], ["2026-03-18", "13:14", "餐飲", "滷味", 120, "午餐 <辣> & 蛋"])
+        self.assertEqual(sheets["2026-03"][2][:5], ["2026-03-19", "15:00", "飲料", "紅茶", 25])
+        self.assertEqual(sheets["總覽"][2], ["總筆數", 3, "總金額", 180])
+        self.assertEqual(sheets["總覽"][5][:3], ["餐飲", 120, "66.7%"])
+        self.assertEqual(len(sheets["全部紀錄"]), 4)
+
+    def test_new_expense_renders_only_its_month(self):
+        self.export()
+        self.write("2026-04.csv", "2026-04-02,09:00,娛樂,電影,300,\n", mode="a")
+
+        stats = self.export()
+        sheets = read_workbook(self.output)
+
+        self.assertEqual((stats.rendered, stats.cached), (1, 2))
+        self.assertEqual(sheets["總覽"][2], ["總筆數", 4, "總金額", 480])
+        self.assertEqual(sheets["全部紀錄"][-1][:5], ["2026-04-02", "09:00", "娛樂", "電影", 300])
+        # Only the current entries survive in the cache.
+        self.assertEqual(len(list((self.expense_dir / export_xlsx.CACHE_DIR_NAME).glob("*.rows.xml"))), 3)
+
+    def test_fractional_amounts_are_kept(self):
+        self.write("2026-04.csv", "2026-04-02,09:00,飲料,豆漿,12.5,\n", mode="a")
+
+        self.export()
+        sheets = read_workbook(self.output)
+
+        self.assertEqual(sheets["2026-04"][-1][4], 12.5)
+        self.assertEqual(sheets["總覽"][2], ["總筆數", 4, "總金額", 192.5])
+
+    def test_shared_cache_dir_keeps_foreign_files(self):
+        cache_dir = self.temp_dir / "shared"
+        cache_dir.mkdir()
+        (cache_dir / "notes.txt").write_text("keep me", encoding="utf-8")
+        (cache_dir / "budget.json").write_text("{}", encoding="utf-8")
+        export_xlsx.export_workbook(self.expense_dir, self.output, cache_dir)
+        (self.expense_dir / "2026-04.csv").unlink()
+
+        export_xlsx.export_workbook(self.expense_dir, self.output, cache_dir)
+
+        self.assertEqual((cache_dir / "notes.txt").read_text(encoding="utf-8"), "keep me")
+        self.assertTrue((cache_dir / "budget.json").exists())
+        self.assertEqual(len(list(cache_dir.glob("*.rows.xml"))), 2)
+
+    def test_placeholder_without_records(self):
+        for csv_file in self.expense_dir.glob("*.csv"):
+            csv_file.write_text(HEADER, encoding="utf-8")
+
+        self.export()
+
+        self.assertEqual(read_workbook(self.output), {"總覽": [export_xlsx.HEADER, ["（尚無紀錄）", "", "", "", 0, ""]]})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,89 @@
 #!/usr/bin/env python3
 import argparse
+import base64
+import difflib
+import hashlib
 import json
+import mmap
+import os
+import random
 import re
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import zlib
+from array import array
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import date, timedelta
+from itertools import repeat
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 DATE_FILE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:.*)?\.md$")
 DATE_HEADER_RE = re.compile(r"^#\s+\d{4}-\d{2}-\d{2}\s*$", re.MULTILINE)
 SECTION_SPLIT_RE = re.compile(r"(?m)^##\s+")
 
+# Byte-level equivalents for the mmap scanning path. `\s`, str.strip() and
+# str.splitlines() are Unicode-aware, so their multi-byte UTF-8 forms are
+# spelled out to keep both paths producing the same digests. Date headers are
+# matched with ASCII digits only.
+UNICODE_SPACES = "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680" + "".join(map(chr, range(0x2000, 0x200B))) + "\u2028\u2029\u202f\u205f\u3000"
+UNICODE_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_ASCII_SPACE_INTS = frozenset(ord(c) for c in UNICODE_SPACES if ord(c) < 0x80)
+
+
+def _bytes_alternation(chars: str) -> bytes:
+    return b"(?:" + b"|".join(re.escape(c.encode("utf-8")) for c in chars) + b")"
+
+
+def _multibyte_by_last_byte(chars: str) -> Dict[int, Tuple[bytes, ...]]:
+    grouped: Dict[int, Tuple[bytes, ...]] = defaultdict(tuple)
+    for encoded in (c.encode("utf-8") for c in chars if ord(c) >= 0x80):
+        grouped[encoded[-1]] += (encoded,)
+    return dict(grouped)
+
+
+_WS_B = _bytes_alternation(UNICODE_SPACES)
+SECTION_SPLIT_BYTES_RE = re.compile(rb"(?m)^##" + _WS_B + rb"+")
+DATE_HEADER_BYTES_RE = re.compile(rb"(?m)^#" + _WS_B + rb"+[0-9]{4}-[0-9]{2}-[0-9]{2}" + _WS_B + rb"*$")
+LEADING_WS_BYTES_RE = re.compile(_WS_B + rb"*")
+LINE_BREAK_BYTES_RE = re.compile(_bytes_alternation(UNICODE_LINE_BREAKS))
+NEWLINE_BYTES_RE = re.compile(rb"\n")
+_MULTIBYTE_SPACES_BY_LAST_BYTE = _multibyte_by_last_byte(UNICODE_SPACES)
+# Files at least this large are scanned through mmap instead of read_text().
+MMAP_THRESHOLD = 1 << 20
+
+# Bump whenever scanning rules or the cached entry layout change so that stale
+# caches are discarded instead of silently reused.
+CACHE_VERSION = 1
+CACHE_FILENAME = ".find_daily_memory_dupes.cache.json"
+
+# Workspace indexing daemon (memory-retrieval/scripts/workspace_indexd.py).
+# While one is listening, scans come from its warm in-memory index instead.
+INDEXD_SOCKET_NAME = ".workspace-indexd.sock"
+INDEXD_SOCKET_ENV = "WORKSPACE_INDEXD_SOCKET"
+INDEXD_TIMEOUT = 30.0
+
+# Near-duplicate (MinHash + LSH) parameters. 16 bands x 4 rows puts the LSH
+# candidate threshold around Jaccard 0.5, comfortably below --near-threshold.
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+SHINGLE_TOKEN_RE = re.compile(rf"[{CJK_RANGES}]|[^\W{CJK_RANGES}]+")
+DIGITS_RE = re.compile(r"\d+")
+SHINGLE_SIZE = 3
+NEAR_NUM_PERM = 64
+NEAR_BANDS = 16
+NEAR_ROWS = NEAR_NUM_PERM // NEAR_BANDS
+_MERSENNE_PRIME = (1 << 31) - 1
+_perm_rng = random.Random(0x5EED)
+MINHASH_PERMUTATIONS = [
+    (_perm_rng.randrange(1, _MERSENNE_PRIME), _perm_rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NEAR_NUM_PERM)
+]
+
 
 @dataclass
 class FileReport:
@@ -21,13 +93,73 @@ class FileReport:
     duplicate_section_titles: List[str]
 
 
+@dataclass
+class SectionDigest:
+    title: str
+    line: int
+    digest: str
+    # Encoded MinHash signature; None when not computed, "" when the section
+    # has no shingles.
+    minhash: Optional[str] = None
+
+
+@dataclass
+class FileScan:
+    mtime_ns: int
+    size: int
+    sha256: str
+    report: FileReport
+    sections: List[SectionDigest]
+
+
+@dataclass
+class SectionLocation:
+    file: str
+    line: int
+
+
+@dataclass
+class CrossFileGroup:
+    title: str
+    digest: str
+    locations: List[SectionLocation]
+
+
+@dataclass
+class NearDuplicate:
+    title: str
+    line: int
+    similar_to: str
+    similar_title: str
+    similarity: float
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Find duplicate headers/sections in daily memory files.")
     p.add_argument("files", nargs="*", help="Specific daily memory files to scan")
     p.add_argument("--root", default="/home/node/.openclaw/workspace/memory", help="Memory directory root")
     p.add_argument("--days", type=int, default=None, help="Only scan files whose YYYY-MM-DD filename falls within the last N days")
-    p.add_argument("--json", action="store_true", help="Emit JSON")
-    return p.parse_args()
+    output = p.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="Emit JSON")
+    output.add_argument("--jsonl", action="store_true", help="Stream one JSON record per line as files are scanned, then a summary record")
+    p.add_argument("--cross-file", action="store_true", help="Also report identical sections repeated across different files")
+    p.add_argument("--near", action="store_true", help="Also report near-duplicate sections (MinHash/LSH), within and across files")
+    p.add_argument("--near-threshold", type=float, default=0.8, help="Minimum estimated Jaccard similarity for --near (default: 0.8)")
+    p.add_argument("--cache", default=None, help=f"Scan cache file (default: <root>/{CACHE_FILENAME}, if <root> exists)")
+    p.add_argument("--mmap-threshold", type=int, default=MMAP_THRESHOLD, help=f"Scan files of at least this many bytes via mmap and byte offsets; 0 disables (default: {MMAP_THRESHOLD})")
+    p.add_argument("--jobs", type=int, default=1, help="Scan files in N worker processes (0 = one per CPU; default: 1)")
+    p.add_argument("--fix", action="store_true", help="Rewrite affected files: keep the first copy of each duplicate section and drop extra date headers")
+    p.add_argument("--dry-run", action="store_true", help="With --fix, print a unified diff instead of writing")
+    p.add_argument("--no-daemon", action="store_true", help="Scan directly even when the workspace indexing daemon is running")
+    cache_mode = p.add_mutually_exclusive_group()
+    cache_mode.add_argument("--no-cache", action="store_true", help="Neither read nor write the scan cache")
+    cache_mode.add_argument("--rebuild-cache", action="store_true", help="Ignore existing cache entries and rescan every file")
+    args = p.parse_args()
+    if args.dry_run and not args.fix:
+        p.error("--dry-run requires --fix")
+    if args.fix and (args.json or args.jsonl):
+        p.error("--fix reports in text form; do not combine it with --json/--jsonl")
+    return args
 
 
 def iter_files(root: Path, files: List[str], days: int | None) -> List[Path]:
@@ -53,17 +185,58 @@ def iter_files(root: Path, files: List[str], days: int | None) -> List[Path]:
     return selected
 
 
-def scan_file(path: Path) -> FileReport:
-    text = path.read_text(encoding="utf-8")
+def section_shingles(text: str) -> set:
+    """
+    Hash the section into token shingles.
+
+    Latin words and single CJK characters are both tokens, so CJK text yields
+    character n-grams while English yields word n-grams. Digit runs collapse
+    to one token so that timestamps and counters do not break similarity.
+    """
+    tokens = SHINGLE_TOKEN_RE.findall(DIGITS_RE.sub("0", text.lower()))
+    if not tokens:
+        return set()
+    if len(tokens) < SHINGLE_SIZE:
+        return {zlib.crc32("\x1f".join(tokens).encode("utf-8"))}
+    return {
+        zlib.crc32("\x1f".join(tokens[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(shingles: set) -> Tuple[int, ...]:
+    return tuple(
+        min([(a * h + b) % _MERSENNE_PRIME for h in shingles])
+        for a, b in MINHASH_PERMUTATIONS
+    )
+
 
+def encode_signature(signature: Tuple[int, ...]) -> str:
+    return base64.b64encode(array("I", signature).tobytes()).decode("ascii")
+
+
+def decode_signature(encoded: str) -> Tuple[int, ...]:
+    values = array("I")
+    values.frombytes(base64.b64decode(encoded))
+    return tuple(values)
+
+
+def scan_text(name: str, text: str, near: bool = False) -> Tuple[FileReport, List[SectionDigest]]:
     date_header_count = len(DATE_HEADER_RE.findall(text))
     duplicate_date_headers = max(date_header_count - 1, 0)
 
     duplicate_titles: List[str] = []
     seen_sections = defaultdict(int)
+    sections: List[SectionDigest] = []
 
-    parts = SECTION_SPLIT_RE.split(text)
-    for part in parts[1:]:
+    matches = list(SECTION_SPLIT_RE.finditer(text))
+    line = 1
+    prev = 0
+    for idx, m in enumerate(matches):
+        line += text.count("\n", prev, m.start())
+        prev = m.start()
+        end = matches[idx + 1].start() if idx + 1 < len(matches) else len(text)
+        part = text[m.end():end]
         normalized = ("## " + part.strip()).strip()
         if not normalized:
             continue
@@ -71,28 +244,584 @@ def scan_file(path: Path) -> FileReport:
         seen_sections[normalized] += 1
         if seen_sections[normalized] == 2:
             duplicate_titles.append(title)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        minhash = None
+        if near:
+            shingles = section_shingles(normalized)
+            minhash = encode_signature(minhash_signature(shingles)) if shingles else ""
+        sections.append(SectionDigest(title=title, line=line, digest=digest, minhash=minhash))
+
+    report = FileReport(
+        file=name,
+        duplicate_date_headers=duplicate_date_headers,
+        duplicate_sections=len(duplicate_titles),
+        duplicate_section_titles=duplicate_titles,
+    )
+    return report, sections
+
+
+def _rstrip_bytes(buf, start: int, end: int) -> int:
+    while end > start:
+        last = buf[end - 1]
+        if last in _ASCII_SPACE_INTS:
+            end -= 1
+            continue
+        for ws in _MULTIBYTE_SPACES_BY_LAST_BYTE.get(last, ()):
+            if end - len(ws) >= start and buf[end - len(ws):end] == ws:
+                end -= len(ws)
+                break
+        else:
+            break
+    return end
+
+
+def scan_buffer(name: str, buf, near: bool = False) -> Tuple[FileReport, List[SectionDigest]]:
+    """
+    Scan a UTF-8 buffer (typically an mmap) using byte offsets only.
+
+    Section digests are fed straight from a memoryview and line numbers are
+    counted in place, so the body of a section is never copied or decoded.
+    Each title line is decoded straight from the mapping, because digests
+    (and their cache entries) carry titles for --cross-file and --near
+    reports that are only assembled after the mapping is closed. Produces
+    the same report and digests as scan_text().
+    """
+    view = memoryview(buf)
+    date_header_count = sum(1 for _ in DATE_HEADER_BYTES_RE.finditer(buf))
+    duplicate_date_headers = max(date_header_count - 1, 0)
+
+    duplicate_titles: List[str] = []
+    seen_sections = defaultdict(int)
+    sections: List[SectionDigest] = []
+
+    bounds = [(m.start(), m.end()) for m in SECTION_SPLIT_BYTES_RE.finditer(buf)]
+    line = 1
+    prev = 0
+    for idx, (start, body) in enumerate(bounds):
+        # mmap has no count(); findall() scans the mapping without slicing it.
+        line += len(NEWLINE_BYTES_RE.findall(buf, prev, start))
+        prev = start
+        end = bounds[idx + 1][0] if idx + 1 < len(bounds) else len(buf)
+        body = LEADING_WS_BYTES_RE.match(buf, body, end).end()
+        end = _rstrip_bytes(buf, body, end)
+
+        sha1 = hashlib.sha1(b"## " if end > body else b"##")
+        sha1.update(view[body:end])
+        digest = sha1.hexdigest()
+
+        brk = LINE_BREAK_BYTES_RE.search(buf, body, end)
+        title_end = brk.start() if brk else end
+        title = "## " + str(view[body:title_end], "utf-8") if end > body else "##"
+
+        seen_sections[digest] += 1
+        if seen_sections[digest] == 2:
+            duplicate_titles.append(title)
+        minhash = None
+        if near:
+            normalized = "## " + str(view[body:end], "utf-8")
+            shingles = section_shingles(normalized)
+            minhash = encode_signature(minhash_signature(shingles)) if shingles else ""
+        sections.append(SectionDigest(title=title, line=line, digest=digest, minhash=minhash))
+    view.release()
 
-    duplicate_sections = len(duplicate_titles)
-    return FileReport(
-        file=str(path),
+    report = FileReport(
+        file=name,
         duplicate_date_headers=duplicate_date_headers,
-        duplicate_sections=duplicate_sections,
+        duplicate_sections=len(duplicate_titles),
         duplicate_section_titles=duplicate_titles,
     )
+    return report, sections
+
+
+def scan_file(path: Path) -> FileReport:
+    report, _ = scan_text(str(path), path.read_text(encoding="utf-8"))
+    return report
+
+
+def scan_file_sections(
+    path: Path, near: bool = False, mmap_threshold: int = MMAP_THRESHOLD
+) -> Tuple[FileReport, List[SectionDigest]]:
+    scan = scan_fingerprinted(path, near, mmap_threshold)
+    return scan.report, scan.sections
+
+
+def scan_fingerprinted(path: Path, near: bool = False, mmap_threshold: int = MMAP_THRESHOLD) -> FileScan:
+    st = path.stat()
+    if 0 < mmap_threshold <= st.st_size:
+        with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            sha256 = hashlib.sha256(buf).hexdigest()
+            report, sections = scan_buffer(str(path), buf, near=near)
+    else:
+        data = path.read_bytes()
+        sha256 = hashlib.sha256(data).hexdigest()
+        report, sections = scan_text(str(path), data.decode("utf-8"), near=near)
+    return FileScan(
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+        sha256=sha256,
+        report=report,
+        sections=sections,
+    )
+
+
+def file_sha256(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write via a temp file in the same directory + os.replace()."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+        if path.exists():
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _fix_once(text: str) -> str:
+    matches = list(SECTION_SPLIT_RE.finditer(text))
+    chunks = [text[:matches[0].start()] if matches else text]
+    seen_sections = set()
+    for idx, m in enumerate(matches):
+        end = matches[idx + 1].start() if idx + 1 < len(matches) else len(text)
+        normalized = ("## " + text[m.end():end].strip()).strip()
+        if normalized in seen_sections:
+            continue
+        seen_sections.add(normalized)
+        chunks.append(text[m.start():end])
+
+    kept_lines = []
+    seen_date_header = False
+    drop_blank = False
+    for line in "".join(chunks).splitlines(keepends=True):
+        if drop_blank and not line.strip():
+            drop_blank = False
+            continue
+        drop_blank = False
+        if DATE_HEADER_RE.match(line.rstrip("\r\n")):
+            if seen_date_header:
+                drop_blank = True
+                continue
+            seen_date_header = True
+        kept_lines.append(line)
+    fixed = "".join(kept_lines)
+    if fixed != text and text.endswith("\n"):
+        newline = "\r\n" if text.endswith("\r\n") else "\n"
+        fixed = fixed.rstrip() + newline
+    return fixed
+
+
+def fix_text(text: str) -> str:
+    """
+    Drop every repeated `## ` section after its first copy and every
+    `# YYYY-MM-DD` header after the first one. Repeats until stable, since
+    dropping a header can make two sections identical.
+    """
+    for _ in range(5):
+        fixed = _fix_once(text)
+        if fixed == text:
+            break
+        text = fixed
+    return text
+
+
+def fix_file(path: Path, dry_run: bool = False) -> Optional[str]:
+    """Return a unified diff if the file needs fixing; rewrite it unless dry_run."""
+    original = path.read_bytes().decode("utf-8")
+    fixed = fix_text(original)
+    if fixed == original:
+        return None
+    diff = "".join(
+        difflib.unified_diff(
+            original.splitlines(keepends=True),
+            fixed.splitlines(keepends=True),
+            fromfile=str(path),
+            tofile=f"{path} (fixed)",
+        )
+    )
+    if not dry_run:
+        atomic_write_text(path, fixed)
+    return diff
+
+
+class CrossFileIndex:
+    """
+    Single-pass hash index of section digests across the whole scan set.
+
+    Only the first location of each digest is kept until a second copy shows
+    up, so memory grows with the number of unique sections, not the text size.
+    """
+
+    def __init__(self):
+        self._first: Dict[str, Tuple[str, str, int]] = {}
+        self._groups: Dict[str, CrossFileGroup] = {}
+
+    def add(self, file: str, sections: List[SectionDigest]) -> None:
+        for section in sections:
+            location = SectionLocation(file=file, line=section.line)
+            group = self._groups.get(section.digest)
+            if group is not None:
+                group.locations.append(location)
+                continue
+            first = self._first.get(section.digest)
+            if first is None:
+                self._first[section.digest] = (section.title, file, section.line)
+                continue
+            title, first_file, first_line = first
+            self._groups[section.digest] = CrossFileGroup(
+                title=title,
+                digest=section.digest,
+                locations=[SectionLocation(file=first_file, line=first_line), location],
+            )
+
+    def groups(self) -> List[CrossFileGroup]:
+        return [
+            group
+            for group in self._groups.values()
+            if len({loc.file for loc in group.locations}) > 1
+        ]
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index over unique sections of the whole scan set.
+
+    Sections are bucketed by signature bands, so only sections sharing at
+    least one band are compared instead of diffing every pair.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._seen_digests: set = set()
+        self._items: List[Tuple[str, SectionDigest, Tuple[int, ...]]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+
+    def add(self, file: str, sections: List[SectionDigest]) -> None:
+        for section in sections:
+            # Exact copies are already reported; index one representative.
+            if not section.minhash or section.digest in self._seen_digests:
+                continue
+            self._seen_digests.add(section.digest)
+            signature = decode_signature(section.minhash)
+            idx = len(self._items)
+            self._items.append((file, section, signature))
+            for band in range(NEAR_BANDS):
+                key = (band, signature[band * NEAR_ROWS:(band + 1) * NEAR_ROWS])
+                self._buckets[key].append(idx)
+
+    def by_file(self) -> Dict[str, List[NearDuplicate]]:
+        candidates = set()
+        for members in self._buckets.values():
+            for i, left in enumerate(members):
+                for right in members[i + 1:]:
+                    candidates.add((left, right))
+
+        found: Dict[str, List[NearDuplicate]] = defaultdict(list)
+        for left, right in sorted(candidates):
+            first_file, first, first_sig = self._items[left]
+            later_file, later, later_sig = self._items[right]
+            matches = sum(1 for x, y in zip(first_sig, later_sig) if x == y)
+            similarity = matches / NEAR_NUM_PERM
+            if similarity < self.threshold:
+                continue
+            found[later_file].append(
+                NearDuplicate(
+                    title=later.title,
+                    line=later.line,
+                    similar_to=f"{first_file}#L{first.line}",
+                    similar_title=first.title,
+                    similarity=round(similarity, 3),
+                )
+            )
+        for items in found.values():
+            items.sort(key=lambda item: (item.line, -item.similarity))
+        return found
+
+
+class ScanCache:
+    """
+    Persistent per-file scan results keyed by path + mtime + size + content hash.
+
+    A file whose mtime and size are unchanged is answered from a single stat();
+    a file that was touched but not edited is re-hashed but not re-split.
+    """
+
+    def __init__(self, path: Path, rebuild: bool = False):
+        self.path = path
+        self.entries: Dict[str, dict] = {} if rebuild else self._load()
+        self.seen: set = set()
+        self.dirty = rebuild
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def lookup(self, path: Path, near: bool = False) -> Optional[Tuple[FileReport, List[SectionDigest]]]:
+        key = str(path.resolve())
+        self.seen.add(key)
+        st = path.stat()
+        entry = self.entries.get(key)
+        if entry and near and any(s.get("minhash") is None for s in entry["sections"]):
+            # Cached before --near was used; signatures need the section text.
+            entry = None
+        if entry is None:
+            return None
+        if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return self._from_entry(path, entry)
+
+        if entry["sha256"] != file_sha256(path):
+            return None
+        entry["mtime_ns"] = st.st_mtime_ns
+        entry["size"] = st.st_size
+        self.dirty = True
+        return self._from_entry(path, entry)
+
+    def store(self, path: Path, scan: FileScan) -> Tuple[FileReport, List[SectionDigest]]:
+        fields = asdict(scan.report)
+        fields.pop("file")
+        self.entries[str(path.resolve())] = {
+            "mtime_ns": scan.mtime_ns,
+            "size": scan.size,
+            "sha256": scan.sha256,
+            "report": fields,
+            "sections": [asdict(s) for s in scan.sections],
+        }
+        self.dirty = True
+        return scan.report, scan.sections
+
+    def scan(
+        self, path: Path, near: bool = False, mmap_threshold: int = MMAP_THRESHOLD
+    ) -> Tuple[FileReport, List[SectionDigest]]:
+        hit = self.lookup(path, near)
+        if hit is not None:
+            return hit
+        return self.store(path, scan_fingerprinted(path, near, mmap_threshold))
+
+    @staticmethod
+    def _from_entry(path: Path, entry: dict) -> Tuple[FileReport, List[SectionDigest]]:
+        report = FileReport(file=str(path), **entry["report"])
+        sections = [SectionDigest(**s) for s in entry["sections"]]
+        return report, sections
+
+    def save(self) -> None:
+        for key in [k for k in self.entries if k not in self.seen]:
+            if not os.path.exists(key):
+                del self.entries[key]
+                self.dirty = True
+        if not self.dirty:
+            return
+
+        payload = json.dumps({"version": CACHE_VERSION, "entries": self.entries}, ensure_ascii=False)
+        atomic_write_text(self.path, payload)
+        self.dirty = False
+
+
+def open_cache(args: argparse.Namespace, root: Path) -> Optional[ScanCache]:
+    """The scan cache, or None. The default one lives in an existing --root only, never creating it."""
+    if args.no_cache:
+        return None
+    if args.cache:
+        return ScanCache(Path(args.cache), rebuild=args.rebuild_cache)
+    if not root.is_dir():
+        return None
+    return ScanCache(root / CACHE_FILENAME, rebuild=args.rebuild_cache)
+
+
+def indexd_socket(start: Path) -> Optional[Path]:
+    """$WORKSPACE_INDEXD_SOCKET (empty disables), else the nearest daemon socket at or above start."""
+    configured = os.environ.get(INDEXD_SOCKET_ENV)
+    if configured is not None:
+        return Path(configured) if configured else None
+    for directory in (start, *start.parents):
+        candidate = directory / INDEXD_SOCKET_NAME
+        if candidate.is_socket():
+            return candidate
+    return None
+
+
+def indexd_scans(
+    socket_path: Path, paths: List[Path], near: bool = False, mmap_threshold: int = MMAP_THRESHOLD
+) -> Optional[List[Tuple[FileReport, List[SectionDigest]]]]:
+    """Scan results for paths from the indexing daemon, or None when it does not answer."""
+    request = {
+        "op": "dupes.scan",
+        "paths": [str(path.resolve()) for path in paths],
+        "near": near,
+        "mmap_threshold": mmap_threshold,
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(INDEXD_TIMEOUT)
+            conn.connect(str(socket_path))
+            conn.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            with conn.makefile("rb") as reader:
+                reply = json.loads(reader.readline())
+        if not reply.get("ok"):
+            return None
+        return [
+            (FileReport(file=str(path), **item["report"]), [SectionDigest(**s) for s in item["sections"]])
+            for path, item in zip(paths, reply["result"]["files"])
+        ]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def iter_scans(
+    paths: List[Path],
+    near: bool = False,
+    jobs: int = 1,
+    cache: Optional[ScanCache] = None,
+    mmap_threshold: int = MMAP_THRESHOLD,
+) -> Iterator[Tuple[FileReport, List[SectionDigest]]]:
+    """
+    Yield (report, sections) for each path, always in the order of `paths`.
+
+    With jobs > 1, cache misses are fanned out to a process pool in chunks
+    and merged back in path order, so output matches a serial run exactly.
+    """
+    if jobs <= 1:
+        for path in paths:
+            if cache is not None:
+                yield cache.scan(path, near, mmap_threshold)
+            else:
+                yield scan_file_sections(path, near, mmap_threshold)
+        return
+
+    hits = [cache.lookup(path, near) if cache is not None else None for path in paths]
+    misses = [path for path, hit in zip(paths, hits) if hit is None]
+    if not misses:
+        yield from hits
+        return
+
+    chunksize = max(1, len(misses) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(misses))) as pool:
+        scanned = pool.map(scan_fingerprinted, misses, repeat(near), repeat(mmap_threshold), chunksize=chunksize)
+        for path, hit in zip(paths, hits):
+            if hit is None:
+                result = next(scanned)
+                hit = cache.store(path, result) if cache is not None else (result.report, result.sections)
+            yield hit
+
+
+def has_findings(report: FileReport) -> bool:
+    return bool(report.duplicate_date_headers or report.duplicate_sections)
+
+
+def emit_jsonl(record: dict) -> None:
+    print(json.dumps(record, ensure_ascii=False), flush=True)
 
 
 def main() -> int:
     args = parse_args()
+    started = time.perf_counter()
     root = Path(args.root)
     files = iter_files(root, args.files, args.days)
-    reports = [scan_file(path) for path in files if path.exists() and path.is_file()]
-    reports = [r for r in reports if r.duplicate_date_headers or r.duplicate_sections]
+    files = [path for path in files if path.exists() and path.is_file()]
+
+    scans = None
+    if files and not (args.no_daemon or args.rebuild_cache):
+        daemon = indexd_socket(files[0].resolve().parent)
+        if daemon is not None:
+            scans = indexd_scans(daemon, files, near=args.near, mmap_threshold=args.mmap_threshold)
+    # The daemon keeps scans warm itself; the cache file is only for direct scans.
+    cache = open_cache(args, root) if scans is None else None
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if scans is None:
+        scans = iter_scans(files, near=args.near, jobs=jobs, cache=cache, mmap_threshold=args.mmap_threshold)
+    index = CrossFileIndex() if args.cross_file else None
+    near_index = NearDuplicateIndex(args.near_threshold) if args.near else None
+
+    reports = []
+    totals = {"files_scanned": 0, "files_with_findings": 0, "duplicate_date_headers": 0, "duplicate_sections": 0}
+    for report, sections in scans:
+        totals["files_scanned"] += 1
+        if has_findings(report):
+            totals["files_with_findings"] += 1
+            totals["duplicate_date_headers"] += report.duplicate_date_headers
+            totals["duplicate_sections"] += report.duplicate_sections
+        if args.jsonl:
+            # Stream instead of collecting so memory stays flat on big scans.
+            if has_findings(report):
+                emit_jsonl({"type": "file", **asdict(report)})
+        else:
+            reports.append(report)
+        if index is not None:
+            index.add(report.file, sections)
+        if near_index is not None:
+            near_index.add(report.file, sections)
+
+    fixes: List[Tuple[str, str]] = []
+    if args.fix:
+        # Only files with exact findings are opened for writing; everything
+        # else keeps its mtime and therefore its cache entry.
+        for report in reports:
+            if not has_findings(report):
+                continue
+            path = Path(report.file)
+            diff = fix_file(path, dry_run=args.dry_run)
+            if diff is None:
+                continue
+            fixes.append((report.file, diff))
+            if cache is not None and not args.dry_run:
+                cache.store(path, scan_fingerprinted(path, args.near, args.mmap_threshold))
+
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"[WARN] Could not write scan cache {cache.path}: {e}", file=sys.stderr)
+    near = near_index.by_file() if near_index is not None else {}
+    reports = [r for r in reports if has_findings(r) or r.file in near]
+    groups = index.groups() if index is not None else []
+
+    if args.jsonl:
+        for file, items in near.items():
+            for item in items:
+                emit_jsonl({"type": "near_duplicate", "file": file, **asdict(item)})
+        for group in groups:
+            emit_jsonl({"type": "cross_file_duplicate", **asdict(group)})
+        totals["near_duplicate_sections"] = sum(len(items) for items in near.values())
+        totals["cross_file_duplicates"] = len(groups)
+        totals["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        emit_jsonl({"type": "summary", **totals})
+        return 0
 
     if args.json:
-        print(json.dumps([asdict(r) for r in reports], ensure_ascii=False, indent=2))
+        file_payload = []
+        for r in reports:
+            item = asdict(r)
+            if args.near:
+                item["near_duplicate_sections"] = [asdict(n) for n in near.get(r.file, [])]
+            file_payload.append(item)
+        if index is None:
+            payload = file_payload
+        else:
+            payload = {
+                "files": file_payload,
+                "cross_file_duplicates": [asdict(g) for g in groups],
+            }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
         return 0
 
-    if not reports:
+    if not reports and not groups:
         print("No exact duplicate daily-memory sections or extra date headers found.")
         return 0
 
@@ -103,6 +832,27 @@ def main() -> int:
         if report.duplicate_section_titles:
             for title in report.duplicate_section_titles:
                 print(f"    - {title}")
+        if report.file in near:
+            print(f"  near_duplicate_sections: {len(near[report.file])}")
+            for item in near[report.file]:
+                print(f"    - {item.title} ~ {item.similar_to} ({item.similarity:.2f})")
+
+    if groups:
+        if reports:
+            print()
+        print("Cross-file duplicate sections:")
+        for group in groups:
+            print(f"  {group.title} ({len(group.locations)} copies)")
+            for loc in group.locations:
+                print(f"    - {loc.file}#L{loc.line}")
+
+    if fixes:
+        print()
+        for file, diff in fixes:
+            if args.dry_run:
+                print(diff, end="")
+            else:
+                print(f"Fixed: {file}")
     return 0
 
 
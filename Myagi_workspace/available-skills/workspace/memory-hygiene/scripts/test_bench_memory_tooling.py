@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the memory tooling benchmark and corpus generator.
+"""
+
+import io
+import json
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import bench_memory_tooling as bench
+import find_daily_memory_dupes as dupes
+
+
+class TestGenerateCorpus(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_bench_memory_"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_corpus_is_deterministic(self):
+        bench.generate_corpus(self.temp_dir / "a", 30, dup_ratio=0.3, seed=7)
+        bench.generate_corpus(self.temp_dir / "b", 30, dup_ratio=0.3, seed=7)
+
+        a = sorted((self.temp_dir / "a" / "memory").iterdir())
+        b = sorted((self.temp_dir / "b" / "memory").iterdir())
+        self.assertEqual([p.name for p in a], [p.name for p in b])
+        self.assertEqual([p.read_bytes() for p in a], [p.read_bytes() for p in b])
+
+    def test_file_names_are_dated(self):
+        names = bench.file_names(2000)
+
+        self.assertEqual(len(set(names)), 2000)
+        self.assertEqual(names[0], "2026-01-01.md")
+        self.assertTrue(all(dupes.DATE_FILE_RE.match(name) for name in names))
+
+    def scan(self, workspace):
+        paths = dupes.iter_files(workspace / "memory", [], None)
+        index = dupes.CrossFileIndex()
+        headers = sections = 0
+        for report, digests in dupes.iter_scans(paths):
+            headers += report.duplicate_date_headers
+            sections += report.duplicate_sections
+            index.add(report.file, digests)
+        return len(paths), headers, sections, index.groups()
+
+    def test_planted_duplicates_are_detected(self):
+        stats = bench.generate_corpus(self.temp_dir, 200, dup_ratio=0.3, seed=1)
+        files, headers, sections, groups = self.scan(self.temp_dir)
+
+        self.assertEqual(files, stats.files)
+        self.assertEqual(headers, stats.planted_extra_date_headers)
+        self.assertGreater(stats.planted_same_file_duplicates, 0)
+        self.assertGreater(sections, 0)
+        self.assertGreater(stats.planted_cross_file_duplicates, 0)
+        self.assertTrue(groups)
+
+    def test_zero_ratio_plants_nothing(self):
+        stats = bench.generate_corpus(self.temp_dir, 200, dup_ratio=0.0, seed=1)
+
+        self.assertEqual(self.scan(self.temp_dir)[1:], (0, 0, []))
+        self.assertEqual(stats.planted_near_duplicates, 0)
+
+
+class TestBenchmarkRun(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_bench_memory_"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_main(self, *extra):
+        argv = ["bench_memory_tooling.py", "--files", "20", "--repeat", "1", *extra]
+        out, err = io.StringIO(), io.StringIO()
+        with patch.object(sys, "argv", argv), redirect_stdout(out), redirect_stderr(err):
+            code = bench.main()
+        return code, out.getvalue()
+
+    def test_results_are_machine_readable(self):
+        code, out = self.run_main("--suites", "scan,cross_file,search", "--corpus-dir", str(self.temp_dir / "ws"))
+        payload = json.loads(out)
+
+        self.assertEqual(code, 0)
+        self.assertEqual(payload["corpus"]["files"], 20)
+        self.assertEqual(
+            set(payload["results"]),
+            {"scan", "cross_file", "search_index_build", "search_refresh_noop", "search_lexical", "search_bm25"},
+        )
+        self.assertEqual(payload["results"]["scan"]["items"], 20)
+        self.assertEqual(set(payload["results"]["scan"]), {"runs", "min_s", "median_s", "max_s", "items"})
+        self.assertFalse((self.temp_dir / "ws" / "memory" / dupes.CACHE_FILENAME).exists())
+
+    def test_compare_flags_regressions(self):
+        baseline = self.temp_dir / "baseline.json"
+        baseline.write_text(json.dumps({"results": {"scan": {"median_s": 1e-9}, "gone": {"median_s": 1.0}}}), encoding="utf-8")
+
+        code, out = self.run_main("--suites", "scan", "--compare", str(baseline))
+        comparison = json.loads(out)["comparison"]
+
+        self.assertEqual(code, 1)
+        self.assertEqual(set(comparison), {"scan"})
+        self.assertTrue(comparison["scan"]["regressed"])
+
+
+if __name__ == "__main__":
+    main()
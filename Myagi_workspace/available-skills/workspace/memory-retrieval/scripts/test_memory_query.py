@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the indexed memory search.
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main, skipUnless
+from unittest.mock import patch
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import memory_query
+
+MEMORY_MD = """# MEMORY.md
+
+## Preferences
+- 使用者偏好繁體中文回覆
+- Model fallback order: codex -> claude
+"""
+
+DAY_ONE = """# 2026-03-14
+
+## Model fallback
+- 設定 model fallback，主模型失敗時改用 claude
+- TODO: verify cron routing after restart
+
+## Expense
+- 午餐 120
+"""
+
+DAY_TWO = """# 2026-03-19
+
+## 記帳技能
+- 新增 expense-tracker 記帳 skill
+- cronjob 每天 21:00 提醒記帳
+"""
+
+
+class TestMemoryQuery(TestCase):
+    def setUp(self):
+        self.workspace = Path(tempfile.mkdtemp(prefix="test_memory_query_"))
+        (self.workspace / "memory").mkdir()
+        (self.workspace / "MEMORY.md").write_text(MEMORY_MD, encoding="utf-8")
+        (self.workspace / "memory" / "2026-03-14.md").write_text(DAY_ONE, encoding="utf-8")
+        (self.workspace / "memory" / "2026-03-19.md").write_text(DAY_TWO, encoding="utf-8")
+        self.index = memory_query.MemoryIndex(self.workspace)
+        self.index.refresh()
+
+    def tearDown(self):
+        self.index.close()
+        if self.workspace.exists():
+            shutil.rmtree(self.workspace)
+
+    def test_build_terms_matches_js_behavior(self):
+        terms = memory_query.build_terms("  Model 記帳提醒 ")
+
+        self.assertEqual(terms[:2], ["model 記帳提醒", "model"])
+        self.assertIn("記帳", terms)
+        self.assertIn("帳提醒", terms)
+
+    def test_substring_terms_are_found_through_grams(self):
+        _, results = self.index.search("cron", top=10, context=0)
+
+        lines = {(r.path, r.line) for r in results if r.score > 1}
+        self.assertIn(("memory/2026-03-14.md", 5), lines)
+        self.assertIn(("memory/2026-03-19.md", 5), lines)
+
+    def test_search_is_served_from_index(self):
+        with patch.object(Path, "read_text", side_effect=AssertionError("file reread")):
+            self.index.refresh()
+            total, results = self.index.search("model fallback", top=3, context=1)
+
+        self.assertGreater(total, 0)
+        self.assertEqual(results[0].score, 11)
+        self.assertEqual(results[0].path, "memory/2026-03-14.md")
+        self.assertEqual(results[0].text, "- 設定 model fallback，主模型失敗時改用 claude")
+        self.assertEqual(results[0].snippet, "## Model fallback\n- 設定 model fallback，主模型失敗時改用 claude\n- TODO: verify cron routing after restart")
+
+    def test_refresh_reindexes_only_changed_files(self):
+        day_two = self.workspace / "memory" / "2026-03-19.md"
+        day_two.write_text(DAY_TWO + "- 新增 weekly stats 報表\n", encoding="utf-8")
+
+        with patch.object(self.index, "_index_file", wraps=self.index._index_file) as spy:
+            self.index.refresh()
+
+        self.assertEqual(spy.call_count, 1)
+        _, results = self.index.search("weekly stats", top=1, context=0)
+        self.assertEqual((results[0].path, results[0].line), ("memory/2026-03-19.md", 6))
+
+    def test_removed_files_leave_the_index(self):
+        (self.workspace / "memory" / "2026-03-14.md").unlink()
+
+        self.index.refresh()
+        _, results = self.index.search("午餐", top=5, context=0)
+
+        self.assertNotIn("memory/2026-03-14.md", {r.path for r in results})
+
+    def test_concurrent_refreshes_index_a_new_file_once(self):
+        (self.workspace / "memory" / "2026-03-20.md").write_text("# 2026-03-20\n- weekly stats\n", encoding="utf-8")
+        other = memory_query.MemoryIndex(self.workspace)
+        self.addCleanup(other.close)
+        stale = other._stale
+
+        def racing(current):
+            # The other process decides first; this one refreshes meanwhile.
+            found = stale(current)
+            other._stale = stale
+            self.index.refresh()
+            return found
+
+        other._stale = racing
+        other.refresh()
+
+        rows = self.index.conn.execute("SELECT COUNT(*) FROM lines WHERE text = '- weekly stats'").fetchone()
+        self.assertEqual(rows[0], 1)
+        self.assertEqual(len(other.paths), 4)
+
+    def test_bm25_prefers_rare_terms(self):
+        total, results = self.index.search_bm25("expense 午餐", top=10, context=0)
+
+        self.assertEqual(total, len({(r.path, r.line) for r in results}))
+        self.assertEqual((results[0].path, results[0].line), ("memory/2026-03-14.md", 8))
+        self.assertEqual(results, sorted(results, key=lambda r: (-r.score, r.path, r.line)))
+
+    def test_bm25_heading_match_covers_its_section(self):
+        _, results = self.index.search_bm25("記帳技能", top=10, context=0)
+
+        lines = [(r.path, r.line) for r in results]
+        self.assertEqual(lines[0], ("memory/2026-03-19.md", 3))
+        self.assertIn(("memory/2026-03-19.md", 5), lines)
+        self.assertNotIn("memory/2026-03-14.md", {r.path for r in results})
+
+    def test_bm25_document_frequency_comes_from_the_index(self):
+        self.assertEqual(self.index.term_df("技能"), 3)
+        self.assertEqual(self.index.term_df("fallback"), 4)
+        self.assertEqual(self.index.term_df("nowhere"), 0)
+        self.assertIsNone(self.index.term_df("a"))
+
+        with patch.object(self.index, "_line_rows", wraps=self.index._line_rows) as rows:
+            self.assertEqual(self.index.bm25_scores(["nowhere"]), {})
+        rows.assert_not_called()
+
+    def test_gram_stats_follow_refresh(self):
+        def stats():
+            return {gram: (df, field_df) for gram, df, field_df in self.index.conn.execute("SELECT * FROM gram_df")}
+
+        day_one = self.workspace / "memory" / "2026-03-14.md"
+        before = stats()
+        day_one.unlink()
+        self.index.refresh()
+        day_one.write_text(DAY_ONE, encoding="utf-8")
+        self.index.refresh()
+
+        self.assertEqual(stats(), before)
+        self.assertEqual(before["午餐"], (1, 1))
+        # "## 記帳技能" puts 技能 in the heading field of the two lines below it.
+        self.assertEqual(before["技能"], (1, 3))
+
+    def test_bm25_cli_keeps_json_shape(self):
+        out = subprocess.run(
+            [sys.executable, str(SCRIPT_DIR / "memory_query.py"), "model fallback", "--rank", "bm25",
+             "--json", "--top", "2", "--workspace", str(self.workspace)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        data = json.loads(out)
+
+        self.assertEqual(set(data), {"query", "totalHits", "results"})
+        self.assertEqual(len(data["results"]), 2)
+        self.assertEqual(set(data["results"][0]), {"score", "path", "line", "text", "snippet"})
+
+    @skipUnless(shutil.which("node"), "node is not installed")
+    def test_json_output_matches_memory_query_js(self):
+        for query in ("model fallback", "記帳", "cron", "a"):
+            cmd = [query, "--json", "--top", "10", "--context", "1", "--workspace", str(self.workspace)]
+            expected = subprocess.run(
+                ["node", str(SCRIPT_DIR / "memory_query.js"), *cmd],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            actual = subprocess.run(
+                [sys.executable, str(SCRIPT_DIR / "memory_query.py"), *cmd],
+                capture_output=True, text=True, check=True,
+            ).stdout
+
+            self.assertEqual(json.loads(actual), json.loads(expected), query)
+
+
+if __name__ == "__main__":
+    main()
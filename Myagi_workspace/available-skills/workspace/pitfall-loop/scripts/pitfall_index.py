@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Indexed pitfall lookup - Python companion to pitfall_query.js.
+
+Parses memory/pitfalls.jsonl once into a persistent SQLite index instead of
+JSON-parsing every entry on every query:
+
+  records - byte offset/length of each entry in pitfalls.jsonl, plus the
+            fields needed for ranking (severity, createdAt)
+  fields  - exact-match postings for category, taskType, severity and tags
+  grams   - character 2/3-gram postings over each entry's search haystack
+
+Filters are answered from `fields`, query terms narrow the candidates through
+`grams`, and only the candidate entries are read back from the JSONL (by
+offset) to compute the exact pitfall_query.js score. The index catches up
+incrementally: bytes appended by pitfall_add.js since the last run are the
+only ones parsed. A file that shrank or no longer starts with the same bytes
+is reindexed from scratch.
+
+Usage:
+    python pitfall_index.py "query text" [--top 8] [--category code] [--taskType coding] [--json] [--checklist]
+    python pitfall_index.py --query "telegram reminder" --category messaging --tag telegram --top 5
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SCHEMA_VERSION = "1"
+INDEX_FILENAME = ".pitfalls.index.sqlite3"
+PITFALLS_FILENAME = "pitfalls.jsonl"
+DEFAULT_WORKSPACE = Path(__file__).resolve().parents[3]
+HEAD_HASH_BYTES = 4096
+SQL_BATCH = 500
+# Membership by binary search once a set is this many times smaller than the
+# posting list it is intersected with.
+BISECT_RATIO = 16
+# Rank sets up to this size by loading their rows; larger ones walk the index.
+RANK_SCAN_MIN = 256
+HIGH_KEY = ("high", "1")
+
+# Fields joined (in this order) into the haystack scored by pitfall_query.js.
+HAYSTACK_FIELDS = ("title", "symptom", "rootCause", "fix", "prevention", "context", "tags", "category", "taskType")
+# Exact-match filter fields and the CLI flag for each.
+FILTER_FIELDS = {"category": "category", "taskType": "taskType", "severity": "severity", "tag": "tags"}
+
+# Mirrors [^\p{L}\p{N}_]+ (Python's Unicode \w is letters, digits and underscore).
+TOKEN_SPLIT_RE = re.compile(r"[^\w]+")
+WORD_RUN_RE = re.compile(r"\w+")
+
+
+@dataclass
+class RefreshStats:
+    rebuilt: bool = False
+    lines_read: int = 0
+    records_added: int = 0
+
+
+def js_string(value) -> str:
+    """String(value) for the scalar values a pitfall entry holds; null/undefined join as ''."""
+    if value is None:
+        return ""
+    if value is True or value is False:
+        return "true" if value else "false"
+    return str(value)
+
+
+def tag_list(entry: dict) -> List[str]:
+    tags = entry.get("tags") or []
+    return [js_string(t) for t in tags] if isinstance(tags, list) else [js_string(tags)]
+
+
+def haystack(entry: dict) -> str:
+    parts = [" ".join(tag_list(entry)) if f == "tags" else js_string(entry.get(f)) for f in HAYSTACK_FIELDS]
+    return " \n ".join(parts).lower()
+
+
+def build_terms(query: str) -> List[str]:
+    q = (query or "").lower().strip()
+    if not q:
+        return []
+    terms = [t for t in (x.strip() for x in TOKEN_SPLIT_RE.split(q)) if len(t) >= 2]
+    return list(dict.fromkeys([q, *terms]))
+
+
+def is_high(entry: dict) -> bool:
+    return (entry.get("severity") or "") == "high"
+
+
+def term_score(hay: str, terms: List[str]) -> int:
+    """pitfall_query.js scoreEntry() without the severity point."""
+    return sum((2 if len(t) >= 4 else 1) for t in terms if t and t in hay)
+
+
+def text_grams(lowered: str) -> Set[str]:
+    """Character 2/3-grams inside each word run of an already-lowercased text."""
+    grams: Set[str] = set()
+    for run in WORD_RUN_RE.findall(lowered):
+        for n in (2, 3):
+            for i in range(len(run) - n + 1):
+                grams.add(run[i:i + n])
+    return grams
+
+
+def term_grams(term: str) -> Optional[List[str]]:
+    """
+    Grams every haystack containing `term` must also contain, or None when the
+    term has no run of two or more word characters to narrow on.
+    """
+    grams: List[str] = []
+    for run in WORD_RUN_RE.findall(term):
+        if len(run) >= 3:
+            grams.extend(run[i:i + 3] for i in range(len(run) - 2))
+        elif len(run) == 2:
+            grams.append(run)
+    return list(dict.fromkeys(grams)) or None
+
+
+def top_checklist(entries: Iterable[dict], limit: int = 6) -> List[dict]:
+    counts: Counter = Counter()
+    for entry in entries:
+        prevention = js_string(entry.get("prevention")).strip()
+        if prevention:
+            counts[prevention] += 1
+    return [{"text": text, "count": count} for text, count in counts.most_common(limit)]
+
+
+def _contains(ids: array, value: int) -> bool:
+    i = bisect_left(ids, value)
+    return i < len(ids) and ids[i] == value
+
+
+def _batched(items: List[int], size: int = SQL_BATCH) -> Iterable[List[int]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class PitfallIndex:
+    """
+    Persistent index over memory/pitfalls.jsonl.
+
+    Tables:
+      records  - one row per entry: byte offset/length in the JSONL, severity
+                 flag, createdAt, lowercased haystack and its field postings
+      postings - (kind, key) -> packed ascending array of record ids, where
+                 kind is a filter field (category, taskType, severity, tags)
+                 or "gram" for the haystack's character 2/3-grams
+      meta     - schema version and the watermark: size/mtime seen last, the
+                 offset just past the last complete line (`end`) and a hash
+                 of the file's first bytes
+
+    An entry on an unterminated last line is indexed but sits past `end`, so
+    it is dropped and re-read on the next catch-up.
+    """
+
+    def __init__(self, workspace: Path, index_path: Optional[Path] = None):
+        self.workspace = workspace
+        self.path = workspace / "memory" / PITFALLS_FILENAME
+        self.index_path = index_path or workspace / "memory" / INDEX_FILENAME
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.index_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._ensure_schema()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _ensure_schema(self) -> None:
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or row[0] != SCHEMA_VERSION:
+                self.conn.executescript(
+                    """
+                    DROP TABLE IF EXISTS postings;
+                    DROP TABLE IF EXISTS records;
+                    DELETE FROM meta;
+                    """
+                )
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    id INTEGER PRIMARY KEY,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    high INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    hay TEXT NOT NULL,
+                    fields TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS records_offset ON records (offset);
+                CREATE INDEX IF NOT EXISTS records_rank ON records (high DESC, created_at DESC, id);
+                CREATE INDEX IF NOT EXISTS records_created ON records (created_at DESC, id);
+                CREATE TABLE IF NOT EXISTS postings (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    ids BLOB NOT NULL,
+                    PRIMARY KEY (kind, key)
+                ) WITHOUT ROWID;
+                """
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (SCHEMA_VERSION,)
+            )
+
+    def _meta(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT key, value FROM meta"))
+
+    def _set_meta(self, **values) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            ((key, str(value)) for key, value in values.items()),
+        )
+
+    def rebuild(self) -> None:
+        with self.conn:
+            self._clear()
+
+    def _clear(self) -> None:
+        self.conn.execute("DELETE FROM postings")
+        self.conn.execute("DELETE FROM records")
+        self.conn.execute("DELETE FROM meta WHERE key != 'schema'")
+
+    def _load_postings(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], array]:
+        found: Dict[Tuple[str, str], array] = {}
+        for kind, key in keys:
+            row = self.conn.execute("SELECT ids FROM postings WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if row is not None:
+                ids = array("I")
+                ids.frombytes(row[0])
+                found[(kind, key)] = ids
+        return found
+
+    def _store_postings(self, postings: Dict[Tuple[str, str], array]) -> None:
+        self.conn.executemany(
+            "DELETE FROM postings WHERE kind = ? AND key = ?", (k for k, ids in postings.items() if not ids)
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO postings (kind, key, ids) VALUES (?, ?, ?)",
+            ((kind, key, ids.tobytes()) for (kind, key), ids in postings.items() if ids),
+        )
+
+    def _drop_from(self, offset: int) -> None:
+        """Remove the entries at or past `offset`; they are always the newest ids."""
+        stale = self.conn.execute("SELECT id, hay, fields FROM records WHERE offset >= ?", (offset,)).fetchall()
+        if not stale:
+            return
+        first = min(rid for rid, _, _ in stale)
+        keys: Set[Tuple[str, str]] = set()
+        for _, hay, fields in stale:
+            keys.update(("gram", gram) for gram in text_grams(hay))
+            keys.update(tuple(key) for key in json.loads(fields))
+        postings = self._load_postings(keys)
+        for ids in postings.values():
+            while ids and ids[-1] >= first:
+                ids.pop()
+        self._store_postings(postings)
+        self.conn.execute("DELETE FROM records WHERE id >= ?", (first,))
+
+    def refresh(self) -> RefreshStats:
+        """Index whatever was appended to pitfalls.jsonl since the last refresh."""
+        stats = RefreshStats()
+        meta = self._meta()
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            if meta.get("size") is not None:
+                self.rebuild()
+                stats.rebuilt = True
+            return stats
+        if meta.get("size") == str(st.st_size) and meta.get("mtime_ns") == str(st.st_mtime_ns):
+            return stats
+
+        with self.conn, open(self.path, "rb") as fh:
+            head = fh.read(HEAD_HASH_BYTES)
+            end = int(meta.get("end", 0))
+            # The stored hash covers the head as it was then: a file that was
+            # shorter than HEAD_HASH_BYTES only has to still start with it.
+            old_head = hashlib.sha256(head[: int(meta.get("head_len", 0))]).hexdigest()
+            if st.st_size < end or old_head != meta.get("head_sha256", old_head):
+                self._clear()
+                end = 0
+                stats.rebuilt = True
+            else:
+                self._drop_from(end)
+            fh.seek(end)
+            data = fh.read(st.st_size - end)
+
+            added: Dict[Tuple[str, str], array] = {}
+            next_id = (self.conn.execute("SELECT MAX(id) FROM records").fetchone()[0] or 0) + 1
+            offset, limit = end, end + len(data)
+            for line in data.split(b"\n"):
+                if line.strip():
+                    stats.lines_read += 1
+                    if self._index_line(next_id, offset, line, added):
+                        next_id += 1
+                        stats.records_added += 1
+                if offset + len(line) < limit:
+                    offset += len(line) + 1
+                    end = offset
+
+            postings = self._load_postings(added) if not stats.rebuilt else {}
+            for key, ids in added.items():
+                postings.setdefault(key, array("I")).extend(ids)
+            self._store_postings(postings)
+            self._set_meta(
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+                end=end,
+                head_sha256=hashlib.sha256(head).hexdigest(),
+                head_len=len(head),
+            )
+        return stats
+
+    def _index_line(self, record_id: int, offset: int, line: bytes, postings: Dict[Tuple[str, str], array]) -> bool:
+        try:
+            entry = json.loads(line.decode("utf-8"))
+        except ValueError:
+            return False
+        if not isinstance(entry, dict):
+            return False
+        hay = haystack(entry)
+        fields = {(field, js_string(entry.get(field)).lower()) for field in ("category", "taskType", "severity")}
+        fields.update(("tags", tag.lower()) for tag in tag_list(entry))
+        if is_high(entry):
+            fields.add(HIGH_KEY)
+        self.conn.execute(
+            "INSERT INTO records (id, offset, length, high, created_at, hay, fields) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (record_id, offset, len(line), int(is_high(entry)), js_string(entry.get("createdAt")), hay,
+             json.dumps(sorted(fields), ensure_ascii=False)),
+        )
+        for key in fields | {("gram", gram) for gram in text_grams(hay)}:
+            postings.setdefault(key, array("I")).append(record_id)
+        return True
+
+    def _intersect(self, keys: List[Tuple[str, str]], within: Optional[Set[int]] = None) -> Set[int]:
+        """Record ids present in every posting list (and in `within`), smallest list first."""
+        postings = self._load_postings(keys)
+        if len(postings) < len(set(keys)):
+            return set()
+        lists = sorted(postings.values(), key=len)
+        found = set(lists[0]) if within is None else within.intersection(lists[0])
+        for ids in lists[1:]:
+            if not found:
+                break
+            if len(found) * BISECT_RATIO < len(ids):
+                found = {rid for rid in found if _contains(ids, rid)}
+            else:
+                found.intersection_update(ids)
+        return found
+
+    def _newest(self, record_ids: Set[int], limit: int) -> List[Tuple[int, str]]:
+        """
+        Up to `limit` (id, createdAt) pairs from record_ids, newest first and
+        in file order on ties. Large sets walk the createdAt index and stop
+        once enough ids were seen instead of loading every row.
+        """
+        if limit <= 0:
+            return []
+        if len(record_ids) <= RANK_SCAN_MIN:
+            rows = sorted(self._rows("created_at", record_ids))
+            rows.sort(key=lambda row: row[1], reverse=True)
+            return rows[:limit]
+        picked = []
+        for rid, created_at in self.conn.execute("SELECT id, created_at FROM records ORDER BY created_at DESC, id"):
+            if rid in record_ids:
+                picked.append((rid, created_at))
+                if len(picked) >= limit:
+                    break
+        return picked
+
+    def _rows(self, columns: str, record_ids: Iterable[int]) -> Iterable[tuple]:
+        ids = sorted(set(record_ids))
+        for batch in _batched(ids):
+            marks = ",".join("?" * len(batch))
+            yield from self.conn.execute(f"SELECT id, {columns} FROM records WHERE id IN ({marks})", batch)
+
+    def fetch(self, record_ids: Iterable[int]) -> Dict[int, dict]:
+        """Read the given entries back from pitfalls.jsonl by offset."""
+        found: Dict[int, dict] = {}
+        spans = sorted(self._rows("offset, length", record_ids), key=lambda span: span[1])
+        if not spans:
+            return found
+        with open(self.path, "rb") as fh:
+            for rid, offset, length in spans:
+                fh.seek(offset)
+                found[rid] = json.loads(fh.read(length).decode("utf-8"))
+        return found
+
+    def search(self, query: str, top: int = 8, **filters: Optional[str]) -> Tuple[int, int, List[dict]]:
+        """
+        Rank entries like pitfall_query.js. Returns (entries passing the
+        filters, matched entries, top results with `_score`).
+        """
+        query = (query or "").strip()
+        keys = [(FILTER_FIELDS[flag], str(value).lower()) for flag, value in filters.items() if value]
+        allowed = self._intersect(keys) if keys else None
+        if allowed is None:
+            total = self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        else:
+            total = len(allowed)
+
+        if not query:
+            if allowed is None:
+                best = self.conn.execute(
+                    "SELECT id, high FROM records ORDER BY high DESC, created_at DESC, id LIMIT ?", (top,)
+                ).fetchall()
+            else:
+                high = self._intersect([HIGH_KEY], allowed)
+                best = [(rid, 1) for rid, _ in self._newest(high, top)]
+                best += [(rid, 0) for rid, _ in self._newest(allowed - high, top - len(best))]
+            return total, total, self._results(best)
+
+        terms = build_terms(query)
+        candidates: Optional[Set[int]] = set()
+        for term in terms:
+            grams = term_grams(term)
+            if grams is None:
+                # Too short to narrow through the index: every entry.
+                candidates = None
+                break
+            candidates |= self._intersect([("gram", gram) for gram in grams], allowed)
+        if candidates is None:
+            candidates = allowed if allowed is not None else {rid for (rid,) in self.conn.execute("SELECT id FROM records")}
+
+        ranked: Dict[int, Tuple[int, str]] = {}
+        for rid, hay, high, created_at in self._rows("hay, high, created_at", candidates):
+            score = term_score(hay, terms) + high
+            if score > 0:
+                ranked[rid] = (score, created_at)
+        # High severity alone scores 1 in pitfall_query.js, so those entries
+        # match every query even without a term hit.
+        high_only = self._intersect([HIGH_KEY], allowed) - ranked.keys()
+
+        # pitfall_query.js order: score desc, then createdAt desc, then file order.
+        order = sorted(ranked)
+        order.sort(key=lambda rid: ranked[rid][1], reverse=True)
+        order.sort(key=lambda rid: ranked[rid][0], reverse=True)
+        best = [(rid, ranked[rid][0]) for rid in order if ranked[rid][0] > 1][:top]
+        if len(best) < top:
+            ones = {rid for rid, (score, _) in ranked.items() if score == 1} | high_only
+            best += [(rid, 1) for rid, _ in self._newest(ones, top - len(best))]
+        return total, len(ranked) + len(high_only), self._results(best)
+
+    def _results(self, best: List[Tuple[int, int]]) -> List[dict]:
+        entries = self.fetch([rid for rid, _ in best])
+        return [{**entries[rid], "_score": score} for rid, score in best]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Search memory/pitfalls.jsonl through a persistent, incrementally updated index.")
+    p.add_argument("terms", nargs="*", help="Query text")
+    p.add_argument("--query", default=None, help="Query text (alternative to positional terms)")
+    p.add_argument("--top", type=int, default=8, help="Number of results (1-30, default: 8)")
+    p.add_argument("--category", default=None, help="Only entries with this category")
+    p.add_argument("--taskType", default=None, help="Only entries with this taskType")
+    p.add_argument("--severity", default=None, help="Only entries with this severity")
+    p.add_argument("--tag", default=None, help="Only entries carrying this tag")
+    p.add_argument("--json", action="store_true", help="Emit JSON")
+    p.add_argument("--checklist", action="store_true", help="Print a preflight checklist from the matched prevention notes")
+    p.add_argument("--workspace", default=None, help="Workspace root (default: auto)")
+    p.add_argument("--index", default=None, help=f"Index file (default: <workspace>/memory/{INDEX_FILENAME})")
+    p.add_argument("--rebuild", action="store_true", help="Drop the index and reparse the whole file")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    query = (args.query or " ".join(args.terms) or "").strip()
+    top = max(1, min(30, args.top))
+    workspace = Path(args.workspace).resolve() if args.workspace else DEFAULT_WORKSPACE
+    filters = {flag: getattr(args, flag) for flag in FILTER_FIELDS}
+
+    index = PitfallIndex(workspace, Path(args.index) if args.index else None)
+    try:
+        if args.rebuild:
+            index.rebuild()
+        index.refresh()
+        total, matched, results = index.search(query, top=top, **filters)
+    finally:
+        index.close()
+
+    if args.json:
+        payload = {"query": query, "total": total, "matched": matched, "results": results, "checklist": top_checklist(results)}
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"Pitfalls file: memory/{PITFALLS_FILENAME}")
+    print(f"Total entries: {total} | Matched: {matched} | Showing: {len(results)}")
+    for flag in ("category", "taskType", "tag"):
+        if filters[flag]:
+            print(f"{flag[0].upper()}{flag[1:]} filter: {filters[flag]}")
+    if query:
+        print(f"Query: {query}")
+    print("")
+
+    for i, r in enumerate(results, start=1):
+        when = r.get("date") or r.get("createdAt") or "n/a"
+        print(f"[{i}] ({r['_score']}) {when} | {js_string(r.get('category'))}/{js_string(r.get('taskType'))} | {js_string(r.get('title'))}")
+        for key in ("symptom", "rootCause", "prevention"):
+            if r.get(key):
+                print(f"  {key}: {r[key]}")
+        print(f"  id: {js_string(r.get('id'))}")
+
+    if args.checklist:
+        checklist = top_checklist(results)
+        print("\nPreflight checklist (from matched pitfalls):")
+        if not checklist:
+            print("- (no prevention notes yet)")
+        for item in checklist:
+            print(f"- [{item['count']}x] {item['text']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
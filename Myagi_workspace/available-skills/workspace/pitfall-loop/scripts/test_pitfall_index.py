@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the indexed pitfall lookup.
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main, skipUnless
+from unittest.mock import patch
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import pitfall_index
+
+ENTRIES = [
+    {"id": "1", "createdAt": "2026-03-10T18:13:29.555Z", "date": "2026-03-10", "title": "內部工具錯誤訊息外露",
+     "category": "messaging", "taskType": "chat", "severity": "medium", "symptom": "回覆中直接出現 Exec 失敗訊息",
+     "rootCause": "把除錯輸出當成對使用者可見內容", "prevention": "回覆前掃描工具錯誤關鍵字", "tags": ["ux", "Tooling"]},
+    {"id": "2", "createdAt": "2026-04-04T06:12:02.609Z", "date": "2026-04-04", "title": "Telegram reminder sent twice",
+     "category": "messaging", "taskType": "automation", "severity": "high", "symptom": "cron fired on both hosts",
+     "rootCause": "duplicate cron entry", "prevention": "list cron jobs before adding one", "tags": ["telegram", "cron"]},
+    {"id": "3", "createdAt": "2026-04-05T09:00:00.000Z", "date": "2026-04-05", "title": "Verilog ECC width mismatch",
+     "category": "code", "taskType": "coding", "severity": "low", "rootCause": "syndrome width off by one",
+     "prevention": "list cron jobs before adding one", "tags": ["ecc", "verilog"]},
+]
+
+
+class TestPitfallIndex(TestCase):
+    def setUp(self):
+        self.workspace = Path(tempfile.mkdtemp(prefix="test_pitfall_index_"))
+        (self.workspace / "memory").mkdir()
+        self.ledger = self.workspace / "memory" / "pitfalls.jsonl"
+        self.append(*ENTRIES)
+        self.index = pitfall_index.PitfallIndex(self.workspace)
+        self.index.refresh()
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def append(self, *entries, raw=""):
+        with open(self.ledger, "a", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries) + raw)
+
+    def ids(self, *args, **kwargs):
+        return [r["id"] for r in self.index.search(*args, **kwargs)[2]]
+
+    def test_ranking_and_filters(self):
+        total, matched, results = self.index.search("cron jobs")
+
+        # The whole query and both terms hit 2 and 3; 2 also scores for high severity.
+        self.assertEqual((total, matched), (3, 2))
+        self.assertEqual([(r["id"], r["_score"]) for r in results], [("2", 7), ("3", 6)])
+        self.assertEqual(self.ids("", category="MESSAGING"), ["2", "1"])
+        self.assertEqual(self.ids("", tag="tooling"), ["1"])
+        self.assertEqual(self.ids("錯誤", severity="high"), ["2"])
+
+    def test_lookup_reads_only_matching_records(self):
+        with patch.object(pitfall_index.PitfallIndex, "fetch", wraps=self.index.fetch) as spy:
+            self.ids("verilog", taskType="coding")
+
+        fetched = {rid for call in spy.call_args_list for rid in call.args[0]}
+        self.assertEqual(len(fetched), 1)
+
+    def test_appended_entries_are_parsed_incrementally(self):
+        self.append({"id": "4", "createdAt": "2026-05-01T00:00:00.000Z", "title": "ECC decoder stall",
+                     "category": "code", "tags": ["ecc"]}, raw="not json\n")
+
+        stats = self.index.refresh()
+
+        self.assertEqual((stats.rebuilt, stats.lines_read, stats.records_added), (False, 2, 1))
+        self.assertEqual(self.ids("ecc", category="code"), ["4", "3"])
+        self.assertEqual(self.index.refresh().lines_read, 0)
+
+    def test_unterminated_line_is_reread(self):
+        self.append(raw='{"id": "4", "title": "half written ecc"')
+        self.index.refresh()
+        self.assertEqual(self.ids("ecc", category="code"), ["3"])
+
+        self.append(raw=', "category": "code"}\n')
+        stats = self.index.refresh()
+
+        self.assertEqual((stats.rebuilt, stats.records_added), (False, 1))
+        self.assertEqual(self.ids("ecc", category="code"), ["3", "4"])
+
+    def test_rewritten_file_is_reindexed(self):
+        self.ledger.write_text(json.dumps(ENTRIES[2]) + "\n", encoding="utf-8")
+
+        stats = self.index.refresh()
+
+        self.assertTrue(stats.rebuilt)
+        self.assertEqual(self.index.search("")[:2], (1, 1))
+
+    @skipUnless(shutil.which("node"), "node is not installed")
+    def test_json_output_matches_pitfall_query_js(self):
+        cases = [["cron jobs"], ["ECC"], ["錯誤"], ["a"], [], ["--category", "messaging"], ["telegram", "--severity", "HIGH"]]
+        for args in cases:
+            cmd = [*args, "--json", "--top", "10", "--workspace", str(self.workspace)]
+            expected = subprocess.run(
+                ["node", str(SCRIPT_DIR / "pitfall_query.js"), *cmd], capture_output=True, text=True, check=True,
+            ).stdout
+            actual = subprocess.run(
+                [sys.executable, str(SCRIPT_DIR / "pitfall_index.py"), *cmd], capture_output=True, text=True, check=True,
+            ).stdout
+
+            self.assertEqual(json.loads(actual), json.loads(expected), args)
+
+
+if __name__ == "__main__":
+    main()
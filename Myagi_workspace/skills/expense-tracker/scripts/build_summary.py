@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Incremental summary.csv builder: the same output as build-summary.js
+(`period,record_count,total_amount` per month, then `ALL_TIME`), but each run
+only reads the bytes appended to a month file since the previous run.
+Amounts are parsed and summed the way `Number()` and JS addition do, in the
+same order, so fractional amounts give the same totals byte for byte.
+
+Per-file watermarks and partial sums are kept in a state file next to the
+CSVs (`.summary-state.json`). A month file that shrank, was edited in place
+or no longer starts with the same bytes is re-read from the beginning.
+summary.csv is written atomically and left untouched when nothing changed.
+
+Usage:
+    python build_summary.py [output.csv]
+    EXPENSE_DIR=~/expenses python build_summary.py "Expense tracking/summary.csv"
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from expense_ledger import (
+    DEFAULT_EXPENSE_DIR,
+    Amount,
+    Watermark,
+    expense_dir_from_env,
+    format_amount,
+    month_files,
+    parse_amount,
+)
+
+STATE_NAME = ".summary-state.json"
+STATE_VERSION = 2
+
+
+@dataclass
+class MonthTally:
+    mark: Watermark = field(default_factory=Watermark)
+    # Non-empty lines seen so far; the first one is the header.
+    lines: int = 0
+    total: Amount = 0
+
+    @property
+    def count(self) -> int:
+        return max(self.lines - 1, 0)
+
+    def add(self, data: bytes) -> int:
+        """Tally the non-empty lines in data; returns how many there were."""
+        added = 0
+        for line in data.decode("utf-8").split("\n"):
+            if not line.strip():
+                continue
+            if self.lines:
+                cols = line.split(",")
+                self.total += parse_amount(cols[4]) if len(cols) > 4 else 0
+            self.lines += 1
+            added += 1
+        return added
+
+
+@dataclass
+class BuildStats:
+    months: int = 0
+    unchanged: int = 0
+    appended: int = 0
+    rebuilt: int = 0
+    lines_read: int = 0
+    written: bool = False
+
+
+def load_state(state_path: Path) -> Dict[str, MonthTally]:
+    try:
+        data = json.loads(state_path.read_text(encoding="utf-8"))
+        if data.get("version") != STATE_VERSION:
+            return {}
+        return {
+            name: MonthTally(mark=Watermark(**entry["mark"]), lines=entry["lines"], total=entry["total"])
+            for name, entry in data["months"].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def render_summary(names: List[str], tallies: Dict[str, MonthTally]) -> str:
+    rows = [["period", "record_count", "total_amount"]]
+    grand_count = 0
+    grand_total: Amount = 0
+    for name in names:
+        tally = tallies[name]
+        rows.append([name[: -len(".csv")], str(tally.count), format_amount(tally.total)])
+        grand_count += tally.count
+        grand_total += tally.total
+    rows.append(["ALL_TIME", str(grand_count), format_amount(grand_total)])
+    return "\n".join(",".join(row) for row in rows) + "\n"
+
+
+def build_summary(expense_dir: Path, output: Path, state_path: Path) -> BuildStats:
+    stats = BuildStats()
+    previous = load_state(state_path)
+    tallies: Dict[str, MonthTally] = {}
+    names = []
+    for name in month_files(expense_dir):
+        path = expense_dir / name
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        names.append(name)
+        tally = previous.get(name)
+        status = tally.mark.status(path, st) if tally is not None else "rebuild"
+        if status == "unchanged":
+            stats.unchanged += 1
+        else:
+            if status == "append":
+                stats.appended += 1
+            else:
+                stats.rebuilt += 1
+                tally = MonthTally()
+            stats.lines_read += tally.add(tally.mark.read(path, st))
+        tallies[name] = tally
+    stats.months = len(names)
+
+    text = render_summary(names, tallies)
+    try:
+        current = output.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        current = None
+    if current != text:
+        _atomic_write_text(output, text)
+        stats.written = True
+    if stats.appended or stats.rebuilt or set(previous) != set(tallies) or not state_path.exists():
+        state = {"version": STATE_VERSION, "months": {name: asdict(t) for name, t in tallies.items()}}
+        _atomic_write_text(state_path, json.dumps(state, ensure_ascii=False, separators=(",", ":")))
+    return stats
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Build summary.csv from the month CSVs, reading only new rows.")
+    p.add_argument("output", nargs="?", default=None, help="Summary CSV to write (default: <expense-dir>/summary.csv)")
+    p.add_argument("--expense-dir", default=None, help=f"Month CSV directory (default: $EXPENSE_DIR or {DEFAULT_EXPENSE_DIR})")
+    p.add_argument("--state", default=None, help=f"Watermark state file (default: <expense-dir>/{STATE_NAME})")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    expense_dir = Path(args.expense_dir) if args.expense_dir else expense_dir_from_env()
+    output = Path(args.output) if args.output else expense_dir / "summary.csv"
+    state_path = Path(args.state) if args.state else expense_dir / STATE_NAME
+
+    stats = build_summary(expense_dir, output, state_path)
+    all_time = output.read_text(encoding="utf-8").rstrip("\n").rsplit(",", 1)[-1]
+    print(f"Summary CSV {'written to' if stats.written else 'unchanged'}: {output}")
+    print(f"Months: {stats.months} ({stats.appended} appended, {stats.rebuilt} rebuilt, {stats.unchanged} unchanged)")
+    print(f"All-time total: {all_time}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Columnar expense ledger: answers the stats.sh queries from a compact store
+instead of re-reading every month CSV.
+
+Each `YYYY-MM.csv` (`date,time,category,item,amount,note`) becomes a segment
+of typed columns (date ordinals, minutes, interned category ids, amounts)
+plus per-day, per-category running totals. The store is one JSON file next
+to the CSVs (`.expense-ledger.json`). On refresh only the bytes appended to a
+month file since the last run are parsed; a month file that shrank, was
+edited in place or no longer starts with the same bytes is re-read in full.
+
+Usage:
+    python expense_ledger.py daily [YYYY-MM-DD]
+    python expense_ledger.py weekly [YYYY-MM-DD]
+    python expense_ledger.py monthly [YYYY-MM]
+    python expense_ledger.py range YYYY-MM-DD YYYY-MM-DD
+    python expense_ledger.py monthly 2026-03 --json
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from array import array
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+DEFAULT_EXPENSE_DIR = "/home/node/.openclaw/workspace/expenses"
+STORE_NAME = ".expense-ledger.json"
+STORE_VERSION = 3
+MONTH_FILE_RE = re.compile(r"^\d{4}-\d{2}\.csv$")
+HEADER_PREFIX = "date,"
+# A rewritten month file is detected by hashing this much of its start.
+HEAD_HASH_BYTES = 4096
+NO_TIME = -1
+TAIPEI = timezone(timedelta(hours=8))
+# What Number() accepts once the string is trimmed; anything else is NaN.
+JS_NUMBER_RE = re.compile(
+    r"[+-]?(?:Infinity|(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)"
+    r"|0[xX][0-9a-fA-F]+|0[oO][0-7]+|0[bB][01]+"
+)
+MAX_SAFE_INTEGER = 2 ** 53
+
+Amount = Union[int, float]
+
+
+def expense_dir_from_env() -> Path:
+    return Path(os.environ.get("EXPENSE_DIR", DEFAULT_EXPENSE_DIR))
+
+
+def parse_amount(text: str) -> Amount:
+    """
+    `Number(cols[4]) || 0`, as in the JS scripts: fractions are kept, not rounded.
+
+    Integral values come back as int. Python adds ints exactly and an int to
+    a float the same way JS adds two doubles (below 2**53), so line-by-line
+    sums match the JS totals exactly.
+    """
+    text = text.strip()
+    if not JS_NUMBER_RE.fullmatch(text):
+        return 0
+    value = float(int(text, 0)) if text[:2].lower() in ("0x", "0o", "0b") else float(text)
+    if value.is_integer() and abs(value) <= MAX_SAFE_INTEGER:
+        return int(value)
+    return value
+
+
+def format_amount(value: Amount) -> str:
+    """String(value) in JS: integral doubles print without a fraction."""
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value.is_integer() and abs(value) < 1e21:
+        return str(int(value))
+    text = repr(value)
+    if "e" not in text:
+        return text
+    mantissa, exponent = text.split("e")
+    if -7 < int(exponent) < 21:
+        # repr() switches to exponents sooner than JS does.
+        return format(Decimal(text), "f")
+    return f"{mantissa}e{int(exponent):+d}"
+
+
+def normalize_amount(value: Amount) -> Amount:
+    """A sum as int when it is whole, so JSON output does not grow a `.0`."""
+    if isinstance(value, float) and value.is_integer() and abs(value) <= MAX_SAFE_INTEGER:
+        return int(value)
+    return value
+
+
+def parse_minutes(text: str) -> int:
+    hours, sep, minutes = text.strip().partition(":")
+    if not sep or not hours.isdigit() or not minutes.isdigit():
+        return NO_TIME
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int) -> str:
+    return "" if minutes == NO_TIME else f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _encode(values: array) -> str:
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _decode(typecode: str, encoded: str) -> array:
+    values = array(typecode)
+    values.frombytes(base64.b64decode(encoded))
+    return values
+
+
+class Row(NamedTuple):
+    date: date
+    time: str
+    category: str
+    item: str
+    amount: Amount
+    note: str
+
+
+@dataclass
+class Summary:
+    start: str
+    end: str
+    count: int = 0
+    total: Amount = 0
+    categories: Dict[str, Amount] = field(default_factory=dict)
+
+
+@dataclass
+class RefreshStats:
+    files: int = 0
+    unchanged: int = 0
+    appended: int = 0
+    rebuilt: int = 0
+    removed: int = 0
+    rows_parsed: int = 0
+
+
+def month_files(expense_dir: Path) -> List[str]:
+    try:
+        return sorted(n for n in os.listdir(expense_dir) if MONTH_FILE_RE.match(n))
+    except FileNotFoundError:
+        return []
+
+
+def head_sha256(path: Path, length: int) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read(min(length, HEAD_HASH_BYTES))).hexdigest()
+
+
+@dataclass
+class Watermark:
+    """How much of an append-only month CSV has been consumed, and what it looked like."""
+
+    size: int = 0
+    mtime_ns: int = 0
+    # False when the file ended mid-line: that row may still be extended.
+    complete: bool = True
+    head_sha256: str = ""
+
+    def status(self, path: Path, st: os.stat_result) -> str:
+        """"unchanged", "append" (only new bytes at the end) or "rebuild"."""
+        if st.st_size == self.size and st.st_mtime_ns == self.mtime_ns:
+            return "unchanged"
+        if st.st_size > self.size and self.complete and head_sha256(path, self.size) == self.head_sha256:
+            return "append"
+        return "rebuild"
+
+    def read(self, path: Path, st: os.stat_result) -> bytes:
+        """The bytes past the watermark, advancing it to the end of the file."""
+        with open(path, "rb") as fh:
+            fh.seek(self.size)
+            data = fh.read()
+        self.size += len(data)
+        self.mtime_ns = st.st_mtime_ns
+        if data:
+            self.complete = data.endswith(b"\n")
+        self.head_sha256 = head_sha256(path, self.size)
+        return data
+
+
+@dataclass
+class MonthSegment:
+    """Columns and daily totals for one month CSV, plus its watermark."""
+
+    mark: Watermark = field(default_factory=Watermark)
+    dates: array = field(default_factory=lambda: array("l"))
+    minutes: array = field(default_factory=lambda: array("h"))
+    categories: array = field(default_factory=lambda: array("H"))
+    amounts: array = field(default_factory=lambda: array("d"))
+    items: List[str] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+    # date ordinal -> category id -> [count, total]
+    days: Dict[int, Dict[int, List[Amount]]] = field(default_factory=dict)
+
+    def to_json(self) -> dict:
+        return {
+            "mark": asdict(self.mark),
+            "dates": _encode(self.dates),
+            "minutes": _encode(self.minutes),
+            "categories": _encode(self.categories),
+            "amounts": _encode(self.amounts),
+            "items": self.items,
+            "notes": self.notes,
+            "days": {str(day): {str(cat): totals for cat, totals in cats.items()} for day, cats in self.days.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "MonthSegment":
+        return cls(
+            mark=Watermark(**data["mark"]),
+            dates=_decode("l", data["dates"]),
+            minutes=_decode("h", data["minutes"]),
+            categories=_decode("H", data["categories"]),
+            amounts=_decode("d", data["amounts"]),
+            items=list(data["items"]),
+            notes=list(data["notes"]),
+            days={int(day): {int(cat): totals for cat, totals in cats.items()} for day, cats in data["days"].items()},
+        )
+
+
+class Ledger:
+    """All month segments of an expense directory, with interned categories."""
+
+    def __init__(self, expense_dir, store_path=None):
+        self.expense_dir = Path(expense_dir)
+        self.store_path = Path(store_path) if store_path else self.expense_dir / STORE_NAME
+        self.category_names: List[str] = []
+        self.category_ids: Dict[str, int] = {}
+        self.segments: Dict[str, MonthSegment] = {}
+
+    @classmethod
+    def load(cls, expense_dir, store_path=None) -> "Ledger":
+        """The stored ledger, or an empty one if the store is missing, stale or corrupt."""
+        ledger = cls(expense_dir, store_path)
+        try:
+            data = json.loads(ledger.store_path.read_bytes())
+            if data.get("version") != STORE_VERSION:
+                return ledger
+            ledger.category_names = list(data["categories"])
+            ledger.segments = {name: MonthSegment.from_json(seg) for name, seg in data["segments"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(expense_dir, store_path)
+        ledger.category_ids = {name: i for i, name in enumerate(ledger.category_names)}
+        return ledger
+
+    def save(self) -> None:
+        payload = {
+            "version": STORE_VERSION,
+            "categories": self.category_names,
+            "segments": {name: seg.to_json() for name, seg in sorted(self.segments.items())},
+        }
+        path = self.store_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _intern(self, category: str) -> int:
+        cat_id = self.category_ids.get(category)
+        if cat_id is None:
+            cat_id = len(self.category_names)
+            self.category_names.append(category)
+            self.category_ids[category] = cat_id
+        return cat_id
+
+    def _add_line(self, seg: MonthSegment, line: str) -> bool:
+        line = line.rstrip("\r")
+        if not line or line.startswith(HEADER_PREFIX):
+            return False
+        cols = line.split(",", 5)
+        cols += [""] * (6 - len(cols))
+        try:
+            day = date.fromisoformat(cols[0].strip()).toordinal()
+        except ValueError:
+            return False
+        cat_id = self._intern(cols[2] or "其他")
+        amount = parse_amount(cols[4])
+        seg.dates.append(day)
+        seg.minutes.append(parse_minutes(cols[1]))
+        seg.categories.append(cat_id)
+        seg.amounts.append(amount)
+        seg.items.append(cols[3])
+        seg.notes.append(cols[5])
+        totals = seg.days.setdefault(day, {}).setdefault(cat_id, [0, 0])
+        totals[0] += 1
+        totals[1] += amount
+        return True
+
+    def _consume(self, path: Path, seg: MonthSegment, st: os.stat_result) -> int:
+        """Parse everything past the segment's watermark; returns rows added."""
+        added = 0
+        for line in seg.mark.read(path, st).decode("utf-8").split("\n"):
+            added += self._add_line(seg, line)
+        return added
+
+    def refresh(self) -> RefreshStats:
+        """Bring every segment up to date with the month CSVs; returns what was done."""
+        stats = RefreshStats()
+        seen = set()
+        for name in month_files(self.expense_dir):
+            path = self.expense_dir / name
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            seen.add(name)
+            stats.files += 1
+            seg = self.segments.get(name)
+            status = seg.mark.status(path, st) if seg is not None else "rebuild"
+            if status == "unchanged":
+                stats.unchanged += 1
+                continue
+            if status == "append":
+                stats.appended += 1
+            else:
+                stats.rebuilt += 1
+                seg = self.segments[name] = MonthSegment()
+            stats.rows_parsed += self._consume(path, seg, st)
+
+        for name in list(self.segments):
+            if name not in seen:
+                del self.segments[name]
+                stats.removed += 1
+        return stats
+
+    def summary(self, start: date, end: date) -> Summary:
+        """Count, total and per-category totals for start..end inclusive, from daily totals only."""
+        first, last = start.toordinal(), end.toordinal()
+        result = Summary(start=start.isoformat(), end=end.isoformat())
+        by_id: Dict[int, Amount] = {}
+        for seg in self.segments.values():
+            for day, cats in seg.days.items():
+                if first <= day <= last:
+                    for cat_id, (count, total) in cats.items():
+                        result.count += count
+                        result.total += total
+                        by_id[cat_id] = by_id.get(cat_id, 0) + total
+        ranked = sorted(by_id.items(), key=lambda kv: (-kv[1], self.category_names[kv[0]]))
+        result.total = normalize_amount(result.total)
+        result.categories = {self.category_names[cat_id]: normalize_amount(total) for cat_id, total in ranked}
+        return result
+
+    def rows(self, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[Row]:
+        """Rows in file order, optionally limited to start..end inclusive."""
+        first = start.toordinal() if start else None
+        last = end.toordinal() if end else None
+        for _, seg in sorted(self.segments.items()):
+            for i, day in enumerate(seg.dates):
+                if (first is not None and day < first) or (last is not None and day > last):
+                    continue
+                yield Row(
+                    date=date.fromordinal(day),
+                    time=format_minutes(seg.minutes[i]),
+                    category=self.category_names[seg.categories[i]],
+                    item=seg.items[i],
+                    amount=normalize_amount(seg.amounts[i]),
+                    note=seg.notes[i],
+                )
+
+
+def open_ledger(expense_dir, store_path=None, refresh: bool = True) -> Tuple[Ledger, Optional[RefreshStats]]:
+    """Load the stored ledger and, unless told not to, catch up with the CSVs and save."""
+    ledger = Ledger.load(expense_dir, store_path)
+    if not refresh:
+        return ledger, None
+    stats = ledger.refresh()
+    if stats.appended or stats.rebuilt or stats.removed or not ledger.store_path.exists():
+        ledger.save()
+    return ledger, stats
+
+
+def today_taipei() -> date:
+    return datetime.now(TAIPEI).date()
+
+
+def period_for(mode: str, args: List[str]) -> Tuple[str, date, date]:
+    """(title, start, end) for a stats.sh mode and its arguments."""
+    if mode == "daily":
+        day = date.fromisoformat(args[0]) if args else today_taipei()
+        return f"📅 日報：{day.isoformat()}", day, day
+    if mode == "weekly":
+        day = date.fromisoformat(args[0]) if args else today_taipei()
+        monday = day - timedelta(days=day.weekday())
+        sunday = monday + timedelta(days=6)
+        return f"📅 週報：{monday.isoformat()} ~ {sunday.isoformat()}", monday, sunday
+    if mode == "monthly":
+        month = args[0] if args else today_taipei().strftime("%Y-%m")
+        first = date.fromisoformat(f"{month}-01")
+        last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        return f"📅 月報：{month}", first, last
+    if mode == "range":
+        if len(args) != 2:
+            raise ValueError("range needs START and END (YYYY-MM-DD)")
+        start, end = date.fromisoformat(args[0]), date.fromisoformat(args[1])
+        return f"📅 區間統計：{args[0]} ~ {args[1]}", start, end
+    raise ValueError(f"unknown mode: {mode}")
+
+
+def format_summary(title: str, summary: Summary) -> str:
+    """The same report stats.sh prints."""
+    lines = [title, "---"]
+    if summary.count == 0:
+        lines.append("（無消費紀錄）")
+        return "\n".join(lines)
+    # stats.sh prints amounts with awk's %d, which truncates fractions.
+    lines.append(f"💰 總計：${int(summary.total)}（{summary.count} 筆）")
+    lines.append("")
+    lines.append("📊 分類明細：")
+    for category, total in summary.categories.items():
+        lines.append(f"  {category:<8} ${int(total)}")
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Expense statistics from the columnar ledger.")
+    p.add_argument("mode", choices=("daily", "weekly", "monthly", "range"))
+    p.add_argument("dates", nargs="*", help="Date (YYYY-MM-DD), month (YYYY-MM) or START END for range")
+    p.add_argument("--expense-dir", default=None, help=f"Month CSV directory (default: $EXPENSE_DIR or {DEFAULT_EXPENSE_DIR})")
+    p.add_argument("--store", default=None, help=f"Ledger store path (default: <expense-dir>/{STORE_NAME})")
+    p.add_argument("--no-refresh", action="store_true", help="Answer from the store without checking the CSVs")
+    p.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        title, start, end = period_for(args.mode, args.dates)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    expense_dir = Path(args.expense_dir) if args.expense_dir else expense_dir_from_env()
+    ledger, _ = open_ledger(expense_dir, args.store, refresh=not args.no_refresh)
+    summary = ledger.summary(start, end)
+    if args.json:
+        print(json.dumps(asdict(summary), ensure_ascii=False, indent=2))
+    else:
+        print(format_summary(title, summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
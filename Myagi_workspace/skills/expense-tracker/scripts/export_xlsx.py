@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Stream every month CSV into one Excel workbook: one sheet per month plus the
+總覽 (overview) and 全部紀錄 (all records) sheets, like csv2xlsx.js.
+
+Rows are rendered month by month straight into the XLSX (a zip of
+SpreadsheetML parts), so memory stays flat however long the history gets.
+Rendered month rows are cached under `.xlsx-cache/` keyed by the CSV content
+hash: after a new expense only the current month is rendered again, and the
+all-records sheet is assembled from the cached month rows.
+
+Usage:
+    python export_xlsx.py [output.xlsx]
+    EXPENSE_DIR=~/expenses python export_xlsx.py expenses.xlsx
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from expense_ledger import (
+    DEFAULT_EXPENSE_DIR,
+    Amount,
+    expense_dir_from_env,
+    format_amount,
+    month_files,
+    parse_amount,
+)
+
+# Bump whenever the rendered rows change so cached month sheets expire.
+RENDER_VERSION = 2
+CACHE_DIR_NAME = ".xlsx-cache"
+HASH_CHUNK_SIZE = 1 << 16
+HEADER = ["date", "time", "category", "item", "amount", "note"]
+RECORD_WIDTHS = [12, 8, 10, 20, 10, 20]
+OVERVIEW_WIDTHS = [12, 12, 12, 12]
+OVERVIEW_SHEET = "總覽"
+ALL_RECORDS_SHEET = "全部紀錄"
+AMOUNT_COLUMN = 4
+# Characters XML 1.0 does not allow, even escaped.
+XML_INVALID_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+# Names of the files cached_month()/render_month() write; --cache-dir may point
+# at a shared directory, so pruning never touches anything else.
+CACHE_ENTRY_RE = re.compile(r"^([0-9a-f]{64})\.(?:rows\.xml|json|rows\.xml\.\w+\.tmp)$")
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+STYLES_XML = (
+    f'{XML_DECL}<styleSheet xmlns="{MAIN_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    "</styleSheet>"
+)
+
+
+@dataclass
+class MonthRows:
+    """A month's rendered data rows (a cache file) and its totals."""
+
+    rows_path: Path
+    count: int = 0
+    total: Amount = 0
+    categories: Dict[str, Amount] = field(default_factory=dict)
+
+
+@dataclass
+class ExportStats:
+    months: int = 0
+    rendered: int = 0
+    cached: int = 0
+    records: int = 0
+    sheets: List[str] = field(default_factory=list)
+
+
+def _cell(value) -> str:
+    # Cells carry no r= reference: each one simply follows the previous one.
+    if isinstance(value, (int, float)):
+        return f"<c><v>{format_amount(value)}</v></c>"
+    if value == "":
+        return "<c/>"
+    text = escape(XML_INVALID_RE.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(values: Iterable) -> str:
+    return "<row>" + "".join(_cell(v) for v in values) + "</row>"
+
+
+def _sheet_head(widths: List[int]) -> str:
+    cols = "".join(f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>' for i, w in enumerate(widths, 1))
+    return f'{XML_DECL}<worksheet xmlns="{MAIN_NS}"><cols>{cols}</cols><sheetData>'
+
+
+SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def csv_sha256(path: Path) -> str:
+    h = hashlib.sha256(f"render-v{RENDER_VERSION}\0".encode())
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def render_month(csv_path: Path, rows_path: Path) -> MonthRows:
+    """Write the month's data rows as sheet XML to rows_path, one CSV line at a time."""
+    month = MonthRows(rows_path=rows_path)
+    fd, tmp = tempfile.mkstemp(prefix=rows_path.name + ".", suffix=".tmp", dir=rows_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out, open(csv_path, "r", encoding="utf-8", newline="") as src:
+            header_seen = False
+            for line in src:
+                line = line.rstrip("\r\n")
+                if not line.strip():
+                    continue
+                if not header_seen:
+                    header_seen = True
+                    continue
+                cols = line.split(",", 5)
+                cols += [""] * (len(HEADER) - len(cols))
+                cols[AMOUNT_COLUMN] = amount = parse_amount(cols[AMOUNT_COLUMN])
+                out.write(_row(cols))
+                category = cols[2] or "其他"
+                month.count += 1
+                month.total += amount
+                month.categories[category] = month.categories.get(category, 0) + amount
+        os.replace(tmp, rows_path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return month
+
+
+def cached_month(cache_dir: Path, csv_path: Path) -> Tuple[MonthRows, bool]:
+    """The month's rendered rows from the cache, rendering them on a miss; (rows, was_cached)."""
+    key = csv_sha256(csv_path)
+    rows_path = cache_dir / f"{key}.rows.xml"
+    meta_path = cache_dir / f"{key}.json"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if rows_path.exists():
+            return MonthRows(rows_path, meta["count"], meta["total"], meta["categories"]), True
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    month = render_month(csv_path, rows_path)
+    meta = {"count": month.count, "total": month.total, "categories": month.categories}
+    meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    return month, False
+
+
+def _prune_cache(cache_dir: Path, keep: Iterable[Path]) -> None:
+    """Remove this exporter's cache entries for months no longer in keep."""
+    keep_keys = {path.name.split(".", 1)[0] for path in keep}
+    for entry in cache_dir.iterdir():
+        match = CACHE_ENTRY_RE.match(entry.name)
+        if match and match.group(1) not in keep_keys:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+
+
+def _overview_rows(count: int, total: Amount, categories: Dict[str, Amount]) -> List[list]:
+    rows = [
+        ["📊 消費總覽", "", "", ""],
+        ["", "", "", ""],
+        ["總筆數", count, "總金額", total],
+        ["", "", "", ""],
+        ["分類", "金額", "佔比", ""],
+    ]
+    for category, amount in sorted(categories.items(), key=lambda kv: -kv[1]):
+        share = f"{amount / total * 100:.1f}%" if total > 0 else "0%"
+        rows.append([category, amount, share, ""])
+    return rows
+
+
+class WorkbookWriter:
+    """Write-only XLSX: sheets are streamed into the zip as they are produced."""
+
+    def __init__(self, zipf: zipfile.ZipFile):
+        self.zipf = zipf
+        self.sheets: List[Tuple[str, str]] = []
+
+    def add_sheet(self, name: str, widths: List[int], parts: Iterable) -> str:
+        """parts: row XML strings or paths of cached row fragments, in order."""
+        part = f"xl/worksheets/sheet{len(self.sheets) + 1}.xml"
+        with self.zipf.open(part, "w") as dest:
+            dest.write(_sheet_head(widths).encode("utf-8"))
+            for piece in parts:
+                if isinstance(piece, Path):
+                    with open(piece, "rb") as src:
+                        shutil.copyfileobj(src, dest)
+                else:
+                    dest.write(piece.encode("utf-8"))
+            dest.write(SHEET_TAIL.encode("utf-8"))
+        self.sheets.append((name, part))
+        return part
+
+    def finish(self, order: List[str]) -> None:
+        """Write the package parts; `order` is the tab order by sheet name."""
+        parts = dict(self.sheets)
+        ids = {name: i for i, (name, _) in enumerate(self.sheets, 1)}
+        overrides = "".join(
+            f'<Override PartName="/{part}" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for _, part in self.sheets
+        )
+        self.zipf.writestr(
+            "[Content_Types].xml",
+            f'{XML_DECL}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f"{overrides}</Types>",
+        )
+        self.zipf.writestr(
+            "_rels/.rels",
+            f'{XML_DECL}<Relationships xmlns="{PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{REL_NS}/officeDocument" Target="xl/workbook.xml"/></Relationships>',
+        )
+        sheets = "".join(f'<sheet name={quoteattr(name)} sheetId="{ids[name]}" r:id="rId{ids[name]}"/>' for name in order)
+        self.zipf.writestr(
+            "xl/workbook.xml",
+            f'{XML_DECL}<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><sheets>{sheets}</sheets></workbook>',
+        )
+        rels = "".join(
+            f'<Relationship Id="rId{ids[name]}" Type="{REL_NS}/worksheet" Target="{parts[name][len("xl/"):]}"/>'
+            for name, _ in self.sheets
+        )
+        styles_id = len(self.sheets) + 1
+        self.zipf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            f'{XML_DECL}<Relationships xmlns="{PKG_REL_NS}">{rels}'
+            f'<Relationship Id="rId{styles_id}" Type="{REL_NS}/styles" Target="styles.xml"/></Relationships>',
+        )
+        self.zipf.writestr("xl/styles.xml", STYLES_XML)
+
+
+def export_workbook(expense_dir: Path, output: Path, cache_dir: Optional[Path] = None) -> ExportStats:
+    stats = ExportStats()
+    cache_dir = cache_dir or expense_dir / CACHE_DIR_NAME
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    months: List[Tuple[str, MonthRows]] = []
+    used = []
+    for name in month_files(expense_dir):
+        month, was_cached = cached_month(cache_dir, expense_dir / name)
+        used.append(month.rows_path)
+        stats.months += 1
+        stats.cached += was_cached
+        stats.rendered += not was_cached
+        if month.count:
+            months.append((name[: -len(".csv")], month))
+    _prune_cache(cache_dir, used)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=output.name + ".", suffix=".tmp", dir=output.parent)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zipf:
+            book = WorkbookWriter(zipf)
+            header = _row(HEADER)
+            for sheet_name, month in months:
+                book.add_sheet(sheet_name, RECORD_WIDTHS, [header, month.rows_path])
+            order = [name for name, _ in months]
+
+            if months:
+                count = sum(m.count for _, m in months)
+                total = sum(m.total for _, m in months)
+                categories: Dict[str, Amount] = {}
+                for _, month in months:
+                    for category, amount in month.categories.items():
+                        categories[category] = categories.get(category, 0) + amount
+                book.add_sheet(OVERVIEW_SHEET, OVERVIEW_WIDTHS, [_row(r) for r in _overview_rows(count, total, categories)])
+                book.add_sheet(ALL_RECORDS_SHEET, RECORD_WIDTHS, [header] + [m.rows_path for _, m in months])
+                order += [OVERVIEW_SHEET, ALL_RECORDS_SHEET]
+                stats.records = count
+            else:
+                # No data yet: a placeholder sheet, as csv2xlsx.js writes.
+                book.add_sheet(OVERVIEW_SHEET, RECORD_WIDTHS, [header, _row(["（尚無紀錄）", "", "", "", 0, ""])])
+                order.append(OVERVIEW_SHEET)
+            book.finish(order)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    stats.sheets = order
+    return stats
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Export all month CSVs to one Excel workbook.")
+    p.add_argument("output", nargs="?", default=None, help="Workbook to write (default: <expense-dir>/expenses.xlsx)")
+    p.add_argument("--expense-dir", default=None, help=f"Month CSV directory (default: $EXPENSE_DIR or {DEFAULT_EXPENSE_DIR})")
+    p.add_argument("--cache-dir", default=None, help=f"Rendered month cache (default: <expense-dir>/{CACHE_DIR_NAME})")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    expense_dir = Path(args.expense_dir) if args.expense_dir else expense_dir_from_env()
+    output = Path(args.output) if args.output else expense_dir / "expenses.xlsx"
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
+
+    if not month_files(expense_dir):
+        print("No CSV files found.")
+        return 0
+    stats = export_workbook(expense_dir, output, cache_dir)
+    print(f"Excel written to: {output}")
+    print(f"Sheets: {', '.join(stats.sheets)}")
+    print(f"Total records: {stats.records}")
+    print(f"Months rendered: {stats.rendered}, from cache: {stats.cached}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory tooling against a synthetic workspace.
+
+Generates a `memory/` tree shaped like the real one (dated filenames,
+`# YYYY-MM-DD` headers, `## ` sections, mixed CJK/English text) with a
+tunable share of planted duplicates, then times:
+  - scan        exact per-file scan (serial, and with --jobs when > 1)
+  - scan_cached scan answered from a warm scan cache
+  - cross_file  scan + cross-file duplicate grouping
+  - near        MinHash/LSH near-duplicate detection
+  - search      memory_query.py index build, no-op refresh, lexical and bm25 queries
+
+Results are written as one JSON document so runs from different commits can
+be compared with --compare.
+
+Usage:
+    python bench_memory_tooling.py --files 1000 --output bench.json
+    python bench_memory_tooling.py --files 10000 --jobs 4 --compare baseline.json
+    python bench_memory_tooling.py --workspace ~/.openclaw/workspace --suites scan,search
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+RETRIEVAL_SCRIPTS = SCRIPT_DIR.parents[1] / "memory-retrieval" / "scripts"
+for _path in (SCRIPT_DIR, RETRIEVAL_SCRIPTS):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+import find_daily_memory_dupes as dupes
+
+try:
+    import memory_query
+except ImportError:  # memory-retrieval not installed next to memory-hygiene
+    memory_query = None
+
+BENCH_VERSION = 1
+SUITES = ("scan", "scan_cached", "cross_file", "near", "search")
+START_DATE = date(2026, 1, 1)
+SEARCH_QUERIES = ("model fallback", "記帳 提醒", "cron", "deploy gateway 設定", "週報")
+
+EN_WORDS = (
+    "model fallback cron gateway deploy session memory token budget codex claude "
+    "review expense report weekly monthly reminder schedule config restart audit "
+    "skill package validate index cache sync github backup route agent heartbeat"
+).split()
+CJK_WORDS = (
+    "記帳 提醒 設定 決定 偏好 待辦 截止 週報 月報 模型 排程 備份 同步 "
+    "檢查 整理 重啟 預算 午餐 晚餐 交通 訂閱 會議 報告 技能 記憶"
+).split()
+TOPICS = ("expense", "cron", "models", "review", "meeting", "skills", "gateway")
+
+
+@dataclass
+class CorpusStats:
+    files: int
+    sections: int
+    bytes: int
+    planted_same_file_duplicates: int
+    planted_cross_file_duplicates: int
+    planted_near_duplicates: int
+    planted_extra_date_headers: int
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark memory scanning, dedup and search on a synthetic workspace.")
+    p.add_argument("--files", type=int, default=1000, help="Number of daily memory files to generate (default: 1000)")
+    p.add_argument("--dup-ratio", type=float, default=0.1, help="Share of sections planted as duplicates (default: 0.1)")
+    p.add_argument("--seed", type=int, default=0, help="Corpus generator seed (default: 0)")
+    source = p.add_mutually_exclusive_group()
+    source.add_argument("--corpus-dir", default=None, help="Generate the workspace here and keep it (default: a temp dir, removed afterwards)")
+    source.add_argument("--workspace", default=None, help="Benchmark an existing workspace instead of generating one")
+    p.add_argument("--suites", default=",".join(SUITES), help=f"Comma-separated suites to run (default: {','.join(SUITES)})")
+    p.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    p.add_argument("--jobs", type=int, default=1, help="Also time the scan with N worker processes (0 = one per CPU; default: 1)")
+    p.add_argument("--output", default=None, help="Write the JSON results here instead of stdout")
+    p.add_argument("--compare", default=None, help="Baseline results JSON to compare medians against")
+    p.add_argument("--max-regression", type=float, default=0.2, help="With --compare, exit 1 if a median is this much slower (default: 0.2)")
+    args = p.parse_args()
+    args.suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = sorted(set(args.suites) - set(SUITES))
+    if unknown:
+        p.error(f"unknown suite(s): {', '.join(unknown)}")
+    if not 0 <= args.dup_ratio <= 1:
+        p.error("--dup-ratio must be between 0 and 1")
+    if args.files < 1 or args.repeat < 1:
+        p.error("--files and --repeat must be positive")
+    return args
+
+
+def _sentence(rng: random.Random) -> str:
+    words = []
+    for _ in range(rng.randint(4, 12)):
+        if rng.random() < 0.5:
+            words.append(rng.choice(CJK_WORDS))
+        else:
+            words.append(rng.choice(EN_WORDS))
+    if rng.random() < 0.3:
+        words.append(str(rng.randint(1, 2000)))
+    return " ".join(words)
+
+
+def _section(rng: random.Random) -> str:
+    title = f"{rng.choice(CJK_WORDS)} {rng.choice(EN_WORDS)} {rng.randint(1, 999)}"
+    bullets = [f"- {_sentence(rng)}" for _ in range(rng.randint(2, 8))]
+    return f"## {title}\n" + "\n".join(bullets) + "\n"
+
+
+def _perturb(rng: random.Random, section: str) -> str:
+    """Change one word of a long bullet so the copy is near, not exact."""
+    lines = section.split("\n")
+    body = [i for i in range(1, len(lines)) if len(lines[i].split()) > 6]
+    if not body:
+        return section + f"- {rng.choice(EN_WORDS)}\n"
+    i = rng.choice(body)
+    words = lines[i].split()
+    words[rng.randrange(1, len(words))] = rng.choice(EN_WORDS)
+    lines[i] = " ".join(words)
+    return "\n".join(lines)
+
+
+def file_names(count: int) -> List[str]:
+    """Dated names; days with several files get `-<topic>-<n>` suffixes like real notes."""
+    per_day = max(1, -(-count // 730))
+    names = []
+    for i in range(count):
+        day = (START_DATE + timedelta(days=i // per_day)).isoformat()
+        slot = i % per_day
+        names.append(f"{day}.md" if slot == 0 else f"{day}-{TOPICS[slot % len(TOPICS)]}-{slot}.md")
+    return names
+
+
+def generate_corpus(workspace: Path, files: int, dup_ratio: float = 0.1, seed: int = 0) -> CorpusStats:
+    """
+    Write MEMORY.md and `files` daily notes under workspace/memory.
+
+    A dup_ratio share of sections are copies of an earlier section: a third
+    from the same file, a third from another file, and a third from another
+    file with one word changed. Roughly dup_ratio / 4 of files also get a
+    repeated date header. Output depends only on the arguments.
+    """
+    rng = random.Random(seed)
+    memory_dir = workspace / "memory"
+    memory_dir.mkdir(parents=True, exist_ok=True)
+    (workspace / "MEMORY.md").write_text(
+        "# MEMORY.md\n\n" + "".join(_section(rng) + "\n" for _ in range(8)), encoding="utf-8"
+    )
+
+    stats = CorpusStats(files, 0, 0, 0, 0, 0, 0)
+    recent: List[str] = []
+    for name in file_names(files):
+        day = name[:10]
+        sections: List[str] = []
+        for _ in range(rng.randint(3, 8)):
+            roll = rng.random()
+            if roll < dup_ratio and (sections or recent):
+                kind = rng.randrange(3)
+                if kind == 0 and sections:
+                    sections.append(rng.choice(sections))
+                    stats.planted_same_file_duplicates += 1
+                elif recent:
+                    source = rng.choice(recent)
+                    if kind == 2:
+                        sections.append(_perturb(rng, source))
+                        stats.planted_near_duplicates += 1
+                    else:
+                        sections.append(source)
+                        stats.planted_cross_file_duplicates += 1
+                else:
+                    sections.append(_section(rng))
+            else:
+                sections.append(_section(rng))
+        header = f"# {day}\n\n"
+        text = header + "\n".join(sections)
+        if rng.random() < dup_ratio / 4:
+            text += "\n" + header
+            stats.planted_extra_date_headers += 1
+        data = text.encode("utf-8")
+        (memory_dir / name).write_bytes(data)
+        stats.sections += len(sections)
+        stats.bytes += len(data)
+        # Keep a bounded pool of sources so cross-file copies stay local in time.
+        recent.extend(s for s in sections if s not in recent)
+        del recent[:-64]
+    return stats
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> dict:
+    runs = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - started)
+    timing = {
+        "runs": repeat,
+        "min_s": round(min(runs), 6),
+        "median_s": round(statistics.median(runs), 6),
+        "max_s": round(max(runs), 6),
+    }
+    if isinstance(result, int):
+        timing["items"] = result
+    return timing
+
+
+def _scan(paths: List[Path], near: bool = False, jobs: int = 1, cache=None) -> int:
+    return sum(1 for _ in dupes.iter_scans(paths, near=near, jobs=jobs, cache=cache))
+
+
+def _cross_file(paths: List[Path]) -> int:
+    index = dupes.CrossFileIndex()
+    for report, sections in dupes.iter_scans(paths):
+        index.add(report.file, sections)
+    return len(index.groups())
+
+
+def _near(paths: List[Path], jobs: int) -> int:
+    index = dupes.NearDuplicateIndex(0.8)
+    for report, sections in dupes.iter_scans(paths, near=True, jobs=jobs):
+        index.add(report.file, sections)
+    return sum(len(items) for items in index.by_file().values())
+
+
+def run_suites(workspace: Path, suites: List[str], repeat: int, jobs: int) -> Dict[str, dict]:
+    paths = dupes.iter_files(workspace / "memory", [], None)
+    results: Dict[str, dict] = {}
+    scratch = Path(tempfile.mkdtemp(prefix="bench_memory_tooling_"))
+    try:
+        if "scan" in suites:
+            results["scan"] = measure(lambda: _scan(paths), repeat)
+            if jobs > 1:
+                results[f"scan_jobs{jobs}"] = measure(lambda: _scan(paths, jobs=jobs), repeat)
+        if "scan_cached" in suites:
+            cache_path = scratch / dupes.CACHE_FILENAME
+            warm = dupes.ScanCache(cache_path)
+            _scan(paths, cache=warm)
+            warm.save()
+            results["scan_cached"] = measure(lambda: _scan(paths, cache=dupes.ScanCache(cache_path)), repeat)
+        if "cross_file" in suites:
+            results["cross_file"] = measure(lambda: _cross_file(paths), repeat)
+        if "near" in suites:
+            results["near"] = measure(lambda: _near(paths, jobs), repeat)
+        if "search" in suites:
+            if memory_query is None:
+                print("[WARN] memory_query.py not found next to memory-hygiene; skipping search suite", file=sys.stderr)
+            else:
+                results.update(_search_suite(workspace, scratch / memory_query.INDEX_FILENAME, repeat))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def _search_suite(workspace: Path, index_path: Path, repeat: int) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    index = memory_query.MemoryIndex(workspace, index_path)
+    try:
+        results["search_index_build"] = measure(lambda: len(index.refresh()), repeat, setup=index.rebuild)
+        results["search_refresh_noop"] = measure(index.refresh, repeat)
+        results["search_lexical"] = measure(
+            lambda: sum(index.search(q, top=8, context=1)[0] for q in SEARCH_QUERIES), repeat
+        )
+        results["search_bm25"] = measure(
+            lambda: sum(index.search_bm25(q, top=8, context=1)[0] for q in SEARCH_QUERIES), repeat
+        )
+    finally:
+        index.close()
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(results: Dict[str, dict], baseline: dict, max_regression: float) -> Dict[str, dict]:
+    """Median ratio (current / baseline) for every benchmark present in both runs."""
+    comparison = {}
+    for name, timing in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("median_s"):
+            continue
+        ratio = timing["median_s"] / before["median_s"]
+        comparison[name] = {
+            "baseline_median_s": before["median_s"],
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1 + max_regression,
+        }
+    return comparison
+
+
+def main() -> int:
+    args = parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    cleanup = None
+    if args.workspace:
+        workspace = Path(args.workspace)
+        corpus = {"workspace": str(workspace)}
+    else:
+        if args.corpus_dir:
+            workspace = Path(args.corpus_dir)
+        else:
+            workspace = cleanup = Path(tempfile.mkdtemp(prefix="bench_memory_corpus_"))
+        started = time.perf_counter()
+        stats = generate_corpus(workspace, args.files, args.dup_ratio, args.seed)
+        corpus = {
+            "seed": args.seed,
+            "dup_ratio": args.dup_ratio,
+            "generate_s": round(time.perf_counter() - started, 3),
+            **asdict(stats),
+        }
+
+    try:
+        results = run_suites(workspace, args.suites, args.repeat, jobs)
+    finally:
+        if cleanup is not None:
+            shutil.rmtree(cleanup, ignore_errors=True)
+
+    payload = {
+        "benchmark": "memory-tooling",
+        "version": BENCH_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": jobs,
+        "repeat": args.repeat,
+        "corpus": corpus,
+        "results": results,
+    }
+
+    regressed = False
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        payload["comparison"] = compare(results, baseline, args.max_regression)
+        regressed = any(item["regressed"] for item in payload["comparison"].values())
+
+    for name, timing in results.items():
+        line = f"{name:22} median {timing['median_s']:.4f}s  min {timing['min_s']:.4f}s"
+        if name in payload.get("comparison", {}):
+            item = payload["comparison"][name]
+            line += f"  x{item['ratio']:.2f} vs baseline" + ("  REGRESSED" if item["regressed"] else "")
+        print(line, file=sys.stderr)
+
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if args.output:
+        dupes.atomic_write_text(Path(args.output), text + "\n")
+    else:
+        print(text)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
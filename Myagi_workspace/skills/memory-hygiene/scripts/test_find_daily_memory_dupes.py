@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Regression tests for daily memory duplicate scanning.
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import find_daily_memory_dupes as dupes
+
+DUPLICATED_DAY = """# 2026-03-12
+
+## Heartbeat
+- gateway ok
+
+## Notes
+- something new
+
+# 2026-03-12
+
+## Heartbeat
+- gateway ok
+"""
+
+
+class TestScanFile(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_memory_dupes_"))
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_reports_duplicate_sections_and_headers(self):
+        path = self.temp_dir / "2026-03-12.md"
+        path.write_text(DUPLICATED_DAY, encoding="utf-8")
+
+        report = dupes.scan_file(path)
+
+        self.assertEqual(report.duplicate_date_headers, 1)
+        self.assertEqual(report.duplicate_sections, 1)
+        self.assertEqual(report.duplicate_section_titles, ["## Heartbeat"])
+
+    def test_section_digests_record_line_numbers(self):
+        _, sections = dupes.scan_text("x.md", DUPLICATED_DAY)
+
+        self.assertEqual([s.line for s in sections], [3, 6, 11])
+        self.assertEqual(sections[0].digest, sections[2].digest)
+        self.assertNotEqual(sections[0].digest, sections[1].digest)
+
+
+class TestMappedScan(TestCase):
+    TRICKY = (
+        "# 2026-03-19\u3000\n\n"
+        "## 記帳技能\u3000\n- 新增 expense tracker\u3000\n\n"
+        "## Notes  \r\n\x85- crlf body \n"
+        "#\t2026-03-19\n"
+        "## 記帳技能\u3000\n- 新增 expense tracker\n\n\n"
+        "## \n"
+    )
+
+    def test_buffer_scan_matches_text_scan(self):
+        expected = dupes.scan_text("x.md", self.TRICKY, near=True)
+
+        actual = dupes.scan_buffer("x.md", self.TRICKY.encode("utf-8"), near=True)
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual[0].duplicate_section_titles, ["## 記帳技能\u3000"])
+
+    def test_large_files_are_scanned_through_mmap(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="test_memory_dupes_mmap_"))
+        try:
+            path = temp_dir / "2026-03-19-expense-skill.md"
+            path.write_text(DUPLICATED_DAY * 50, encoding="utf-8")
+
+            with patch.object(dupes, "scan_text", side_effect=AssertionError("read_text path")):
+                mapped = dupes.scan_fingerprinted(path, mmap_threshold=1)
+            plain = dupes.scan_fingerprinted(path, mmap_threshold=0)
+        finally:
+            import shutil
+
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(mapped, plain)
+
+
+class TestCrossFileIndex(TestCase):
+    def test_groups_sections_repeated_across_files(self):
+        index = dupes.CrossFileIndex()
+        _, day_sections = dupes.scan_text("2026-03-12.md", DUPLICATED_DAY)
+        _, heartbeat_sections = dupes.scan_text(
+            "2026-03-12-heartbeat-check.md", "## Heartbeat\n- gateway ok\n"
+        )
+
+        index.add("2026-03-12.md", day_sections)
+        index.add("2026-03-12-heartbeat-check.md", heartbeat_sections)
+        groups = index.groups()
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].title, "## Heartbeat")
+        self.assertEqual(
+            [(loc.file, loc.line) for loc in groups[0].locations],
+            [
+                ("2026-03-12.md", 3),
+                ("2026-03-12.md", 11),
+                ("2026-03-12-heartbeat-check.md", 1),
+            ],
+        )
+
+    def test_ignores_duplicates_confined_to_one_file(self):
+        index = dupes.CrossFileIndex()
+        _, sections = dupes.scan_text("2026-03-12.md", DUPLICATED_DAY)
+
+        index.add("2026-03-12.md", sections)
+
+        self.assertEqual(index.groups(), [])
+
+
+class TestNearDuplicateIndex(TestCase):
+    BASE = (
+        "## 訂閱續訂提醒\n"
+        "- 已建立 Claude 訂閱續訂提醒，每月 5 號早上九點提醒使用者檢查付款狀態\n"
+        "- cron job uses the main session and announces in Telegram\n"
+        "- verified with openclaw cron list --json after the change\n"
+    )
+
+    def index_sections(self, *files, threshold=0.6):
+        index = dupes.NearDuplicateIndex(threshold)
+        for name, text in files:
+            _, sections = dupes.scan_text(name, text, near=True)
+            index.add(name, sections)
+        return index.by_file()
+
+    def test_flags_sections_that_differ_by_timestamp_and_bullet(self):
+        variant = self.BASE.replace("5 號", "6 號") + "- 09:15 follow-up\n"
+
+        found = self.index_sections(("a.md", self.BASE), ("b.md", variant))
+
+        self.assertEqual(list(found), ["b.md"])
+        item = found["b.md"][0]
+        self.assertEqual(item.title, "## 訂閱續訂提醒")
+        self.assertEqual(item.similar_to, "a.md#L1")
+        self.assertGreaterEqual(item.similarity, 0.6)
+        self.assertLess(item.similarity, 1.0)
+
+    def test_ignores_unrelated_sections(self):
+        other = "## Expense review\n- lunch 120 TWD\n- coffee 65 TWD\n- bus card top-up 500 TWD\n"
+
+        found = self.index_sections(("a.md", self.BASE), ("b.md", other))
+
+        self.assertEqual(found, {})
+
+    def test_exact_copies_are_left_to_exact_detection(self):
+        found = self.index_sections(("a.md", self.BASE), ("b.md", self.BASE))
+
+        self.assertEqual(found, {})
+
+    def test_cjk_text_is_shingled_by_character(self):
+        shingles = dupes.section_shingles("整理記憶")
+
+        self.assertEqual(len(shingles), 2)
+
+
+class TestParallelScan(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_memory_dupes_jobs_"))
+        self.paths = []
+        for day in range(1, 10):
+            path = self.temp_dir / f"2026-03-{day:02d}.md"
+            body = DUPLICATED_DAY if day % 2 else f"# 2026-03-{day:02d}\n\n## Notes\n- day {day}\n"
+            path.write_text(body, encoding="utf-8")
+            self.paths.append(path)
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_pool_results_match_serial_order(self):
+        serial = list(dupes.iter_scans(self.paths, near=True))
+        parallel = list(dupes.iter_scans(self.paths, near=True, jobs=3))
+
+        self.assertEqual(serial, parallel)
+
+    def test_pool_only_scans_cache_misses(self):
+        cache_path = self.temp_dir / "cache.json"
+        cache = dupes.ScanCache(cache_path)
+        serial = list(dupes.iter_scans(self.paths[:5], cache=cache))
+        cache.save()
+
+        cache = dupes.ScanCache(cache_path)
+        parallel = list(dupes.iter_scans(self.paths, jobs=2, cache=cache))
+
+        self.assertEqual(parallel[:5], serial)
+        self.assertEqual(len(cache.entries), len(self.paths))
+
+
+class TestJsonlOutput(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_memory_dupes_jsonl_"))
+        (self.temp_dir / "2026-03-11.md").write_text("# 2026-03-11\n\n## Notes\n- ok\n", encoding="utf-8")
+        (self.temp_dir / "2026-03-12.md").write_text(DUPLICATED_DAY, encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def run_main(self, *extra):
+        argv = ["find_daily_memory_dupes.py", "--root", str(self.temp_dir), "--no-cache", *extra]
+        out = io.StringIO()
+        with patch.object(sys, "argv", argv), redirect_stdout(out):
+            self.assertEqual(dupes.main(), 0)
+        return out.getvalue()
+
+    def test_streams_file_records_then_summary(self):
+        records = [json.loads(line) for line in self.run_main("--jsonl").splitlines()]
+
+        self.assertEqual([r["type"] for r in records], ["file", "summary"])
+        self.assertEqual(records[0]["file"], str(self.temp_dir / "2026-03-12.md"))
+        self.assertEqual(records[0]["duplicate_section_titles"], ["## Heartbeat"])
+        summary = records[-1]
+        self.assertEqual(summary["files_scanned"], 2)
+        self.assertEqual(summary["files_with_findings"], 1)
+        self.assertEqual(summary["duplicate_sections"], 1)
+        self.assertIn("elapsed_seconds", summary)
+
+    def test_file_records_match_json_output(self):
+        as_json = json.loads(self.run_main("--json"))
+        streamed = [json.loads(line) for line in self.run_main("--jsonl").splitlines()]
+
+        files = [{k: v for k, v in r.items() if k != "type"} for r in streamed if r["type"] == "file"]
+        self.assertEqual(files, as_json)
+
+
+class TestFix(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_memory_dupes_fix_"))
+        self.clean = self.temp_dir / "2026-03-11.md"
+        self.clean.write_text("# 2026-03-11\n\n## Notes\n- ok\n", encoding="utf-8")
+        self.day = self.temp_dir / "2026-03-12.md"
+        self.day.write_text(DUPLICATED_DAY, encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def run_main(self, *extra):
+        argv = ["find_daily_memory_dupes.py", "--root", str(self.temp_dir), *extra]
+        out = io.StringIO()
+        with patch.object(sys, "argv", argv), redirect_stdout(out):
+            self.assertEqual(dupes.main(), 0)
+        return out.getvalue()
+
+    def test_keeps_first_copy_and_first_date_header(self):
+        fixed = dupes.fix_text(DUPLICATED_DAY)
+
+        self.assertEqual(
+            fixed,
+            "# 2026-03-12\n\n## Heartbeat\n- gateway ok\n\n## Notes\n- something new\n",
+        )
+        report, _ = dupes.scan_text("x.md", fixed)
+        self.assertEqual((report.duplicate_date_headers, report.duplicate_sections), (0, 0))
+
+    def test_clean_text_is_unchanged(self):
+        text = "# 2026-03-11\n\n## Notes\n- ok\n\n\n"
+
+        self.assertEqual(dupes.fix_text(text), text)
+
+    def test_fix_rewrites_only_files_with_findings(self):
+        clean_mtime = self.clean.stat().st_mtime_ns
+
+        out = self.run_main("--fix", "--no-cache")
+
+        self.assertIn(f"Fixed: {self.day}", out)
+        self.assertEqual(self.clean.stat().st_mtime_ns, clean_mtime)
+        self.assertEqual(self.day.read_text(encoding="utf-8"), dupes.fix_text(DUPLICATED_DAY))
+
+    def test_dry_run_prints_diff_without_writing(self):
+        out = self.run_main("--fix", "--dry-run", "--no-cache")
+
+        self.assertIn(f"--- {self.day}", out)
+        self.assertIn("-## Heartbeat", out)
+        self.assertEqual(self.day.read_text(encoding="utf-8"), DUPLICATED_DAY)
+
+    def test_fix_refreshes_cache_entry(self):
+        cache_path = self.temp_dir / "cache.json"
+
+        self.run_main("--fix", "--cache", str(cache_path))
+
+        with patch.object(dupes, "scan_text", side_effect=AssertionError("rescanned")):
+            report, _ = dupes.ScanCache(cache_path).scan(self.day)
+        self.assertEqual(report.duplicate_sections, 0)
+
+
+class TestDefaultCacheLocation(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_memory_dupes_cache_root_"))
+        self.day = self.temp_dir / "days" / "2026-03-12.md"
+        self.day.parent.mkdir()
+        self.day.write_text(DUPLICATED_DAY, encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def run_main(self, root):
+        argv = ["find_daily_memory_dupes.py", "--root", str(root), "--no-daemon", "--json", str(self.day)]
+        with patch.object(sys, "argv", argv), redirect_stdout(io.StringIO()):
+            self.assertEqual(dupes.main(), 0)
+
+    def test_missing_root_is_not_created(self):
+        self.run_main(self.temp_dir / "missing" / "deep")
+
+        self.assertFalse((self.temp_dir / "missing").exists())
+
+    def test_existing_root_holds_the_cache(self):
+        self.run_main(self.temp_dir)
+
+        self.assertTrue((self.temp_dir / dupes.CACHE_FILENAME).exists())
+
+
+class TestScanCache(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_memory_dupes_cache_"))
+        self.cache_path = self.temp_dir / "cache.json"
+        self.day = self.temp_dir / "2026-03-12.md"
+        self.day.write_text(DUPLICATED_DAY, encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def scan_with_fresh_cache(self, rebuild=False):
+        cache = dupes.ScanCache(self.cache_path, rebuild=rebuild)
+        result = cache.scan(self.day)
+        cache.save()
+        return result
+
+    def test_unchanged_file_is_served_from_cache(self):
+        first, _ = self.scan_with_fresh_cache()
+
+        with patch.object(dupes, "scan_text", side_effect=AssertionError("rescanned")):
+            with patch.object(Path, "read_bytes", side_effect=AssertionError("reread")):
+                second, _ = self.scan_with_fresh_cache()
+
+        self.assertEqual(first, second)
+
+    def test_touched_but_identical_file_is_not_resplit(self):
+        self.scan_with_fresh_cache()
+        st = self.day.stat()
+        os.utime(self.day, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+        with patch.object(dupes, "scan_text", side_effect=AssertionError("rescanned")):
+            report, _ = self.scan_with_fresh_cache()
+
+        self.assertEqual(report.duplicate_sections, 1)
+
+    def test_edited_file_invalidates_entry(self):
+        self.scan_with_fresh_cache()
+        self.day.write_text("# 2026-03-12\n\n## Heartbeat\n- gateway ok\n", encoding="utf-8")
+
+        report, _ = self.scan_with_fresh_cache()
+
+        self.assertEqual(report.duplicate_sections, 0)
+        self.assertEqual(report.duplicate_date_headers, 0)
+
+    def test_rebuild_ignores_existing_entries(self):
+        self.scan_with_fresh_cache()
+
+        with patch.object(dupes, "scan_text", wraps=dupes.scan_text) as spy:
+            self.scan_with_fresh_cache(rebuild=True)
+
+        self.assertEqual(spy.call_count, 1)
+
+    def test_version_mismatch_discards_cache(self):
+        self.cache_path.write_text('{"version": -1, "entries": {"x": {}}}', encoding="utf-8")
+
+        cache = dupes.ScanCache(self.cache_path)
+
+        self.assertEqual(cache.entries, {})
+
+    def test_near_mode_backfills_signatures_for_old_entries(self):
+        self.scan_with_fresh_cache()
+
+        cache = dupes.ScanCache(self.cache_path)
+        _, sections = cache.scan(self.day, near=True)
+        cache.save()
+
+        self.assertTrue(all(s.minhash for s in sections))
+        with patch.object(dupes, "scan_text", side_effect=AssertionError("rescanned")):
+            _, cached = dupes.ScanCache(self.cache_path).scan(self.day, near=True)
+        self.assertEqual(sections, cached)
+
+    def test_deleted_files_are_pruned_on_save(self):
+        self.scan_with_fresh_cache()
+        self.day.unlink()
+
+        cache = dupes.ScanCache(self.cache_path)
+        cache.save()
+
+        self.assertEqual(dupes.ScanCache(self.cache_path).entries, {})
+
+
+if __name__ == "__main__":
+    main()
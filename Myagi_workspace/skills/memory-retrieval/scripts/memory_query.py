@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+Indexed lexical memory search - Python companion to memory_query.js.
+
+Searches MEMORY.md + memory/*.md with the same scoring as memory_query.js,
+but answers from a persistent SQLite inverted index instead of rereading and
+rescoring every line on every query. The index is refreshed incrementally:
+only files whose mtime or size changed are reindexed.
+
+`--rank bm25` switches to BM25F ranking over two fields per line: the line
+itself (body) and the heading of the section it sits under. Document counts,
+field lengths and per-gram document frequencies are precomputed in the index,
+so a term's IDF is known before any line is read and only lines that contain
+the term are loaded, to count its occurrences.
+
+Usage:
+    python memory_query.py "query text" [--top 8] [--context 1] [--json]
+    python memory_query.py --query "query text" --top 10 --context 2
+    python memory_query.py "query text" --rank bm25 --json
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+from array import array
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SCHEMA_VERSION = "3"
+INDEX_FILENAME = ".memory_query.index.sqlite3"
+DEFAULT_WORKSPACE = Path(__file__).resolve().parents[3]
+
+# Mirrors memory_query.js: \p{Script=Han|Hiragana|Katakana|Hangul} and
+# [^\p{L}\p{N}_]+ (Python's Unicode \w is letters, digits and underscore).
+CJK_CHAR_RE = re.compile(
+    "[\u1100-\u11ff\u2e80-\u2fdf\u3005\u3007\u3021-\u3029\u3038-\u303b"
+    "\u3041-\u309f\u30a0-\u30ff\u3130-\u318f\u31f0-\u31ff\u3400-\u4dbf"
+    "\u4e00-\u9fff\ua960-\ua97f\uac00-\ud7ff\uf900-\ufaff\uff66-\uff9d"
+    "\uffa0-\uffdc\U00020000-\U0003134f]"
+)
+TOKEN_SPLIT_RE = re.compile(r"[^\w]+")
+WORD_RUN_RE = re.compile(r"\w+")
+LINE_SPLIT_RE = re.compile(r"\r?\n")
+HEADING_RE = re.compile(r"^#{1,6}\s")
+KEYWORD_RE = re.compile(r"\b(todo|next|decision|preference|deadline|action)\b", re.IGNORECASE | re.ASCII)
+CJK_KEYWORD_RE = re.compile(r"[待辦|決定|偏好|截止|提醒]")
+# String.prototype.trim() whitespace, which differs from str.strip().
+JS_WHITESPACE = "\t\n\x0b\x0c\r \xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+MAX_CJK_TERMS = 40
+SQL_BATCH = 500
+
+# BM25F parameters: (weight, length normalization b) per field. A heading
+# match is shared by every line in its section, so it counts for less than a
+# match on the line itself.
+BM25_K1 = 1.2
+BM25_BODY = (1.0, 0.75)
+BM25_HEADING = (0.5, 0.5)
+
+
+@dataclass
+class Hit:
+    score: float
+    path: str
+    line: int
+    text: str
+    snippet: str
+
+
+def js_trim(value: str) -> str:
+    return value.strip(JS_WHITESPACE)
+
+
+def build_terms(query: str) -> List[str]:
+    q = js_trim(query or "").lower()
+    if not q:
+        return []
+
+    token_terms = [t for t in (js_trim(x) for x in TOKEN_SPLIT_RE.split(q)) if len(t) >= 2]
+
+    chars = [c for c in q if CJK_CHAR_RE.match(c)]
+    cjk_terms: List[str] = []
+    if len(chars) >= 2:
+        for n in (2, 3):
+            for i in range(len(chars) - n + 1):
+                cjk_terms.append("".join(chars[i:i + n]))
+                if len(cjk_terms) >= MAX_CJK_TERMS:
+                    break
+            if len(cjk_terms) >= MAX_CJK_TERMS:
+                break
+
+    return list(dict.fromkeys([q, *token_terms, *cjk_terms]))
+
+
+def line_bonus(line: str) -> int:
+    return (1 if KEYWORD_RE.search(line) else 0) + (1 if CJK_KEYWORD_RE.search(line) else 0)
+
+
+def line_score(line: str, query: str, terms: List[str]) -> int:
+    t = line.lower()
+    score = 0
+
+    if query and query in t:
+        score += 6
+
+    for term in terms:
+        if not term or term == query:
+            continue
+        if term in t:
+            score += 2 if len(term) >= 4 else 1
+
+    return score + line_bonus(line)
+
+
+def text_length(text: str) -> int:
+    """Field length for BM25: word characters, so a CJK character counts as one."""
+    return sum(len(run) for run in WORD_RUN_RE.findall(text))
+
+
+def line_grams(lowered: str) -> Set[str]:
+    """Character 2/3-grams inside each word run of an already-lowercased line."""
+    grams: Set[str] = set()
+    for run in WORD_RUN_RE.findall(lowered):
+        for n in (2, 3):
+            for i in range(len(run) - n + 1):
+                grams.add(run[i:i + n])
+    return grams
+
+
+def term_grams(term: str) -> Optional[List[str]]:
+    """
+    Grams that every line containing `term` as a substring must also contain.
+
+    Query tokens and the CJK 2/3-gram terms from build_terms() never cross a
+    word boundary, so their grams are always present in the line's index
+    entry. Returns None when the term has no run of two or more word
+    characters and therefore cannot be narrowed through the index.
+    """
+    grams: List[str] = []
+    for run in WORD_RUN_RE.findall(term):
+        if len(run) >= 3:
+            grams.extend(run[i:i + 3] for i in range(len(run) - 2))
+        elif len(run) == 2:
+            grams.append(run)
+    return list(dict.fromkeys(grams)) or None
+
+
+def list_memory_files(workspace: Path) -> List[Path]:
+    files = []
+    memory_md = workspace / "MEMORY.md"
+    if memory_md.exists():
+        files.append(memory_md)
+
+    memory_dir = workspace / "memory"
+    if memory_dir.is_dir():
+        files.extend(p for p in memory_dir.iterdir() if p.name.endswith(".md"))
+
+    return sorted(files, key=str)
+
+
+def _batched(items: List[int], size: int = SQL_BATCH) -> Iterable[List[int]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class MemoryIndex:
+    """
+    Persistent inverted index over MEMORY.md + memory/*.md.
+
+    Tables:
+      files    - one row per indexed file with the mtime/size it was indexed at,
+                 plus its BM25 document count and summed field lengths
+      lines    - every line of every file, its query-independent bonus, body
+                 length and the line number of the heading it sits under
+      postings - (gram, file) -> packed array of line numbers containing gram,
+                 plus how many of the file's lines have gram in either field
+      gram_df  - number of lines containing each gram, used to plan lookups,
+                 and the BM25 document frequency (body or heading field)
+    """
+
+    def __init__(self, workspace: Path, index_path: Optional[Path] = None):
+        self.workspace = workspace
+        self.index_path = index_path or workspace / "memory" / INDEX_FILENAME
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.index_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._ensure_schema()
+        self.paths: Dict[int, str] = {}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _ensure_schema(self) -> None:
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or row[0] != SCHEMA_VERSION:
+                self.conn.executescript(
+                    """
+                    DROP TABLE IF EXISTS gram_df;
+                    DROP TABLE IF EXISTS postings;
+                    DROP TABLE IF EXISTS lines;
+                    DROP TABLE IF EXISTS files;
+                    """
+                )
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    docs INTEGER NOT NULL DEFAULT 0,
+                    body_len INTEGER NOT NULL DEFAULT 0,
+                    heading_len INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS lines (
+                    file_id INTEGER NOT NULL,
+                    lineno INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    bonus INTEGER NOT NULL,
+                    body_len INTEGER NOT NULL,
+                    heading_lineno INTEGER NOT NULL,
+                    PRIMARY KEY (file_id, lineno)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS lines_bonus ON lines (bonus) WHERE bonus > 0;
+                CREATE INDEX IF NOT EXISTS lines_heading ON lines (file_id, heading_lineno) WHERE heading_lineno > 0;
+                CREATE TABLE IF NOT EXISTS postings (
+                    gram TEXT NOT NULL,
+                    file_id INTEGER NOT NULL,
+                    linenos BLOB NOT NULL,
+                    field_df INTEGER NOT NULL,
+                    PRIMARY KEY (gram, file_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+                CREATE TABLE IF NOT EXISTS gram_df (
+                    gram TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL,
+                    field_df INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                """
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (SCHEMA_VERSION,)
+            )
+
+    def rebuild(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM gram_df")
+            self.conn.execute("DELETE FROM postings")
+            self.conn.execute("DELETE FROM lines")
+            self.conn.execute("DELETE FROM files")
+
+    def _stale(self, current: Dict[str, Path]) -> Tuple[Dict[str, Tuple[int, int, int]], Dict[str, os.stat_result]]:
+        """The indexed files, and the current files whose mtime/size differ from them."""
+        indexed = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in self.conn.execute(
+                "SELECT id, path, mtime_ns, size FROM files"
+            )
+        }
+        changed = {}
+        for rel, path in current.items():
+            st = path.stat()
+            known = indexed.get(rel)
+            if not (known and known[1] == st.st_mtime_ns and known[2] == st.st_size):
+                changed[rel] = st
+        return indexed, changed
+
+    def refresh(self) -> List[Path]:
+        """Bring the index in line with the workspace; returns the current file list."""
+        files = list_memory_files(self.workspace)
+        current = {p.relative_to(self.workspace).as_posix(): p for p in files}
+        indexed, changed = self._stale(current)
+
+        if changed or indexed.keys() - current.keys():
+            with self.conn:
+                # Another process may be refreshing too: take the write lock
+                # first, then decide again from what it committed.
+                self.conn.execute("BEGIN IMMEDIATE")
+                indexed, changed = self._stale(current)
+                self._apply(current, indexed, changed)
+
+        self.paths = dict(self.conn.execute("SELECT id, path FROM files"))
+        return files
+
+    def _apply(
+        self,
+        current: Dict[str, Path],
+        indexed: Dict[str, Tuple[int, int, int]],
+        changed: Dict[str, os.stat_result],
+    ) -> None:
+        for rel, (file_id, _, _) in indexed.items():
+            if rel not in current:
+                self._drop_file(file_id)
+                self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        for rel, st in changed.items():
+            known = indexed.get(rel)
+            if known:
+                file_id = known[0]
+                self._drop_file(file_id)
+                self.conn.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                    (st.st_mtime_ns, st.st_size, file_id),
+                )
+            else:
+                file_id = self.conn.execute(
+                    "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                    (rel, st.st_mtime_ns, st.st_size),
+                ).lastrowid
+            self._index_file(file_id, current[rel])
+
+    def _drop_file(self, file_id: int) -> None:
+        self.conn.executemany(
+            "UPDATE gram_df SET df = df - ?, field_df = field_df - ? WHERE gram = ?",
+            (
+                (len(blob) // array("I").itemsize, field_df, gram)
+                for gram, blob, field_df in self.conn.execute(
+                    "SELECT gram, linenos, field_df FROM postings WHERE file_id = ?", (file_id,)
+                ).fetchall()
+            ),
+        )
+        self.conn.execute("DELETE FROM gram_df WHERE df <= 0")
+        self.conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM lines WHERE file_id = ?", (file_id,))
+
+    def _index_file(self, file_id: int, path: Path) -> None:
+        lines = LINE_SPLIT_RE.split(path.read_text(encoding="utf-8", errors="replace"))
+        postings: Dict[str, array] = {}
+        # Lines that have a gram only through their section heading; added
+        # to the posting length to get the gram's BM25 document frequency.
+        heading_only: Dict[str, int] = {}
+        rows = []
+        docs = body_total = heading_total = 0
+        heading_lineno = heading_len = 0
+        heading_grams: Set[str] = set()
+        for lineno, line in enumerate(lines, start=1):
+            if not js_trim(line):
+                rows.append((file_id, lineno, line, 0, 0, 0))
+                continue
+            body_len = text_length(line)
+            grams = line_grams(line.lower())
+            if HEADING_RE.match(line):
+                # A heading is its own body; it is the heading field of the
+                # lines below it, not of itself.
+                rows.append((file_id, lineno, line, line_bonus(line), body_len, 0))
+                heading_lineno, heading_len, heading_grams = lineno, body_len, grams
+            else:
+                rows.append((file_id, lineno, line, line_bonus(line), body_len, heading_lineno))
+                heading_total += heading_len
+                for gram in heading_grams - grams:
+                    heading_only[gram] = heading_only.get(gram, 0) + 1
+            docs += 1
+            body_total += body_len
+            for gram in grams:
+                postings.setdefault(gram, array("I")).append(lineno)
+        self.conn.executemany(
+            "INSERT INTO lines (file_id, lineno, text, bonus, body_len, heading_lineno) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        # Every heading gram also has a posting here (the heading line itself).
+        stats = [(gram, ids, len(ids) + heading_only.get(gram, 0)) for gram, ids in postings.items()]
+        self.conn.executemany(
+            "INSERT INTO postings (gram, file_id, linenos, field_df) VALUES (?, ?, ?, ?)",
+            ((gram, file_id, ids.tobytes(), field_df) for gram, ids, field_df in stats),
+        )
+        self.conn.executemany(
+            "INSERT INTO gram_df (gram, df, field_df) VALUES (?, ?, ?) ON CONFLICT (gram) DO UPDATE SET "
+            "df = df + excluded.df, field_df = field_df + excluded.field_df",
+            ((gram, len(ids), field_df) for gram, ids, field_df in stats),
+        )
+        self.conn.execute(
+            "UPDATE files SET docs = ?, body_len = ?, heading_len = ? WHERE id = ?",
+            (docs, body_total, heading_total, file_id),
+        )
+
+    def _gram_postings(self, gram: str, file_ids: Optional[List[int]] = None) -> Dict[int, Set[int]]:
+        if file_ids is None:
+            batches = [(("SELECT file_id, linenos FROM postings WHERE gram = ?"), (gram,))]
+        else:
+            batches = [
+                (
+                    f"SELECT file_id, linenos FROM postings WHERE gram = ? AND file_id IN ({','.join('?' * len(batch))})",
+                    (gram, *batch),
+                )
+                for batch in _batched(file_ids)
+            ]
+        found: Dict[int, Set[int]] = {}
+        for sql, params in batches:
+            for file_id, blob in self.conn.execute(sql, params):
+                ids = array("I")
+                ids.frombytes(blob)
+                found[file_id] = set(ids)
+        return found
+
+    def candidates(self, grams: List[str]) -> Set[Tuple[int, int]]:
+        """Lines whose index entry contains every gram (a superset of true matches)."""
+        marks = ",".join("?" * len(grams))
+        dfs = dict(self.conn.execute(f"SELECT gram, df FROM gram_df WHERE gram IN ({marks})", grams))
+        if len(dfs) < len(grams):
+            return set()
+
+        # Start from the rarest gram and only fetch postings for files that
+        # are still in play.
+        ordered = sorted(grams, key=dfs.__getitem__)
+        current = self._gram_postings(ordered[0])
+        for gram in ordered[1:]:
+            if not current:
+                break
+            other = self._gram_postings(gram, list(current))
+            current = {fid: ids & other[fid] for fid, ids in current.items() if fid in other}
+            current = {fid: ids for fid, ids in current.items() if ids}
+        return {(fid, lineno) for fid, ids in current.items() for lineno in ids}
+
+    def _term_keys(self, term: str) -> Set[Tuple[int, int]]:
+        grams = term_grams(term)
+        if grams is None:
+            # Too short to narrow through the index: consider every stored line.
+            return {(fid, n) for fid, n in self.conn.execute("SELECT file_id, lineno FROM lines")}
+        return self.candidates(grams)
+
+    def _line_rows(self, keys: Set[Tuple[int, int]]) -> Iterable[Tuple[int, int, str, int, int]]:
+        """Yield (file_id, lineno, text, body_len, heading_lineno) for the given lines."""
+        by_file: Dict[int, List[int]] = {}
+        for file_id, lineno in keys:
+            by_file.setdefault(file_id, []).append(lineno)
+        for file_id, linenos in by_file.items():
+            for batch in _batched(sorted(linenos)):
+                marks = ",".join("?" * len(batch))
+                for lineno, text, body_len, heading_lineno in self.conn.execute(
+                    f"SELECT lineno, text, body_len, heading_lineno FROM lines WHERE file_id = ? AND lineno IN ({marks})",
+                    (file_id, *batch),
+                ):
+                    yield file_id, lineno, text, body_len, heading_lineno
+
+    def _snippet(self, file_id: int, lineno: int, context: int) -> Tuple[str, str]:
+        rows = self.conn.execute(
+            "SELECT lineno, text FROM lines WHERE file_id = ? AND lineno BETWEEN ? AND ? ORDER BY lineno",
+            (file_id, lineno - context, lineno + context),
+        ).fetchall()
+        text = next(t for n, t in rows if n == lineno)
+        return js_trim(text), js_trim("\n".join(t for _, t in rows))
+
+    def scored_lines(self, query: str, terms: List[str]) -> Dict[Tuple[int, int], int]:
+        """Score every line that can match any term; returns (file_id, lineno) -> score."""
+        keys: Set[Tuple[int, int]] = set()
+        for term in terms:
+            keys |= self._term_keys(term)
+
+        scores: Dict[Tuple[int, int], int] = {}
+        for file_id, lineno, text, _, _ in self._line_rows(keys):
+            if not js_trim(text):
+                continue
+            score = line_score(text, query, terms)
+            if score > 0:
+                scores[(file_id, lineno)] = score
+        return scores
+
+    def search(self, query_raw: str, top: int = 8, context: int = 1) -> Tuple[int, List[Hit]]:
+        query = js_trim(query_raw or "").lower()
+        terms = build_terms(query)
+        scores = self.scored_lines(query, terms)
+
+        # Lines that only earn the keyword bonus are hits for every query in
+        # memory_query.js, so they are included here as well.
+        for file_id, lineno, bonus in self.conn.execute(
+            "SELECT file_id, lineno, bonus FROM lines WHERE bonus > 0"
+        ):
+            scores.setdefault((file_id, lineno), bonus)
+
+        return len(scores), self._hits(scores, top, context)
+
+    def term_df(self, term: str) -> Optional[int]:
+        """
+        BM25 document frequency of `term` from the stored gram statistics.
+
+        Exact for terms that are a single gram (the CJK 2/3-gram terms and
+        short tokens); for longer terms it is the count of the rarest gram,
+        an upper bound. None when the term has no gram to look up.
+        """
+        grams = term_grams(term)
+        if grams is None:
+            return None
+        marks = ",".join("?" * len(grams))
+        found = self.conn.execute(f"SELECT field_df FROM gram_df WHERE gram IN ({marks})", grams).fetchall()
+        return min(df for df, in found) if len(found) == len(grams) else 0
+
+    def bm25_scores(self, terms: List[str]) -> Dict[Tuple[int, int], float]:
+        """BM25F over (body, heading) fields; returns (file_id, lineno) -> score."""
+        n_docs, body_total, heading_total = self.conn.execute(
+            "SELECT COALESCE(SUM(docs), 0), COALESCE(SUM(body_len), 0), COALESCE(SUM(heading_len), 0) FROM files"
+        ).fetchone()
+        if not n_docs:
+            return {}
+        avg_body = body_total / n_docs or 1.0
+        avg_heading = heading_total / n_docs or 1.0
+        body_weight, body_b = BM25_BODY
+        heading_weight, heading_b = BM25_HEADING
+
+        scores: Dict[Tuple[int, int], float] = {}
+        for term in terms:
+            df = self.term_df(term)
+            if df == 0:
+                continue
+            body_tf: Dict[Tuple[int, int], int] = {}
+            body_lens: Dict[Tuple[int, int], int] = {}
+            headings: List[Tuple[int, int]] = []
+            for file_id, lineno, text, body_len, heading_lineno in self._line_rows(self._term_keys(term)):
+                tf = text.lower().count(term)
+                if not tf or not js_trim(text):
+                    continue
+                key = (file_id, lineno)
+                body_tf[key] = tf
+                body_lens[key] = body_len
+                if heading_lineno == 0 and HEADING_RE.match(text):
+                    headings.append(key)
+
+            # Every line under a matching heading gets a heading-field match.
+            heading_tf: Dict[Tuple[int, int], Tuple[int, int]] = {}
+            for file_id, heading in headings:
+                tf, heading_len = body_tf[(file_id, heading)], body_lens[(file_id, heading)]
+                for lineno, body_len in self.conn.execute(
+                    "SELECT lineno, body_len FROM lines WHERE file_id = ? AND heading_lineno = ?",
+                    (file_id, heading),
+                ):
+                    heading_tf[(file_id, lineno)] = (tf, heading_len)
+                    body_lens.setdefault((file_id, lineno), body_len)
+
+            matched = body_tf.keys() | heading_tf.keys()
+            if not matched:
+                continue
+            if df is None:
+                # Nothing to look up: the term was matched against every line.
+                df = len(matched)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for key in matched:
+                weighted = 0.0
+                if key in body_tf:
+                    norm = 1 - body_b + body_b * body_lens[key] / avg_body
+                    weighted += body_weight * body_tf[key] / norm
+                if key in heading_tf:
+                    tf, heading_len = heading_tf[key]
+                    norm = 1 - heading_b + heading_b * heading_len / avg_heading
+                    weighted += heading_weight * tf / norm
+                scores[key] = scores.get(key, 0.0) + idf * weighted / (BM25_K1 + weighted)
+        return {key: round(score, 4) for key, score in scores.items()}
+
+    def search_bm25(self, query_raw: str, top: int = 8, context: int = 1) -> Tuple[int, List[Hit]]:
+        query = js_trim(query_raw or "").lower()
+        scores = self.bm25_scores(build_terms(query))
+        return len(scores), self._hits(scores, top, context)
+
+    def _hits(self, scores: Dict[Tuple[int, int], float], top: int, context: int) -> List[Hit]:
+        best = heapq.nsmallest(
+            top,
+            scores.items(),
+            key=lambda item: (-item[1], self.paths[item[0][0]], item[0][1]),
+        )
+        results = []
+        for (file_id, lineno), score in best:
+            text, snippet = self._snippet(file_id, lineno, context)
+            results.append(Hit(score=score, path=self.paths[file_id], line=lineno, text=text, snippet=snippet))
+        return results
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Search MEMORY.md + memory/*.md with lexical scoring from a persistent index and print top snippets."
+    )
+    p.add_argument("terms", nargs="*", help="Query text")
+    p.add_argument("--query", default=None, help="Query text (alternative to positional terms)")
+    p.add_argument("--top", type=int, default=8, help="Number of results (1-50, default: 8)")
+    p.add_argument("--context", type=int, default=1, help="Lines of context around each hit (0-5, default: 1)")
+    p.add_argument("--json", action="store_true", help="Emit JSON")
+    p.add_argument(
+        "--rank",
+        choices=("lexical", "bm25"),
+        default="lexical",
+        help="lexical: same scores as memory_query.js (default); bm25: BM25F over line + section heading",
+    )
+    p.add_argument("--workspace", default=None, help="Workspace root (default: auto)")
+    p.add_argument("--index", default=None, help=f"Index file (default: <workspace>/memory/{INDEX_FILENAME})")
+    p.add_argument("--rebuild", action="store_true", help="Drop the index and reindex every file")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    query_raw = args.query or " ".join(args.terms)
+    if not js_trim(query_raw):
+        print("Usage: python memory_query.py \"query text\" [--top 8] [--context 1] [--json]")
+        return 1
+
+    top = max(1, min(50, args.top))
+    context = max(0, min(5, args.context))
+    workspace = Path(args.workspace).resolve() if args.workspace else DEFAULT_WORKSPACE
+
+    index = MemoryIndex(workspace, Path(args.index) if args.index else None)
+    try:
+        if args.rebuild:
+            index.rebuild()
+        files = index.refresh()
+        if not files:
+            print("No memory files found.")
+            return 0
+        search = index.search_bm25 if args.rank == "bm25" else index.search
+        total_hits, results = search(query_raw, top=top, context=context)
+    finally:
+        index.close()
+
+    if args.json:
+        payload = {"query": query_raw, "totalHits": total_hits, "results": [asdict(r) for r in results]}
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"Query: {query_raw}")
+    print(f"Files: {len(files)} | Hits: {total_hits} | Showing top {len(results)}")
+    print("")
+    for idx, r in enumerate(results, start=1):
+        print(f"[{idx}] score={r.score} Source: {r.path}#L{r.line}")
+        print(r.snippet)
+        print("---")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
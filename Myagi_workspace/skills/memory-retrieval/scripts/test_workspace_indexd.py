@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the workspace indexing daemon and its clients.
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import TestCase, main, skipUnless
+from unittest.mock import patch
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import workspace_indexd
+
+find_daily_memory_dupes = workspace_indexd.import_helper("find_daily_memory_dupes")
+quick_validate = workspace_indexd.import_helper("quick_validate")
+
+DAY = """# 2026-03-14
+
+## Model fallback
+- 設定 model fallback
+
+## Model fallback
+- 設定 model fallback
+"""
+
+PITFALL = {"id": "1", "createdAt": "2026-04-04T06:12:02.609Z", "title": "Telegram reminder sent twice",
+           "category": "messaging", "severity": "high", "tags": ["telegram"]}
+
+
+def run_main(module, argv):
+    out = io.StringIO()
+    with patch.object(sys, "argv", argv), redirect_stdout(out):
+        code = module.main()
+    return code, out.getvalue()
+
+
+class TestWorkspaceIndexd(TestCase):
+    def setUp(self):
+        self.workspace = Path(tempfile.mkdtemp(prefix="test_indexd_"))
+        memory = self.workspace / "memory"
+        memory.mkdir()
+        (self.workspace / "MEMORY.md").write_text("# MEMORY.md\n- Model fallback order: codex -> claude\n", encoding="utf-8")
+        (memory / "2026-03-14.md").write_text(DAY, encoding="utf-8")
+        (memory / "2026-03-15.md").write_text("# 2026-03-15\n\n## Expense\n- 午餐 120\n", encoding="utf-8")
+        (memory / "pitfalls.jsonl").write_text(json.dumps(PITFALL) + "\n", encoding="utf-8")
+        self.write_skill("good", "---\nname: good\ndescription: A fine skill\n---\n")
+        self.write_skill("bad", "---\nname: Bad_Name\ndescription: Broken\n---\n")
+        self.socket = self.workspace / workspace_indexd.SOCKET_NAME
+        env = patch.dict(os.environ)
+        env.start()
+        self.addCleanup(env.stop)
+        os.environ.pop(workspace_indexd.SOCKET_ENV, None)
+        self.thread = None
+
+    def tearDown(self):
+        if self.thread is not None:
+            workspace_indexd.request(self.socket, {"op": "stop"})
+            self.thread.join(5)
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def write_skill(self, name, text):
+        skill = self.workspace / "skills" / name
+        skill.mkdir(parents=True, exist_ok=True)
+        (skill / "SKILL.md").write_text(text, encoding="utf-8")
+
+    def start(self, inotify=True):
+        server = workspace_indexd.IndexServer(self.workspace, poll_interval=0.05, inotify=inotify)
+        self.thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self.thread.start()
+        return server
+
+    def status(self):
+        return workspace_indexd.request(self.socket, {"op": "status"})["result"]
+
+    def test_dupes_cli_answers_from_daemon(self):
+        argv = ["find_daily_memory_dupes.py", "--root", str(self.workspace / "memory"), "--json", "--cross-file", "--near"]
+        _, direct = run_main(find_daily_memory_dupes, argv + ["--no-daemon", "--no-cache"])
+        self.start()
+
+        _, served = run_main(find_daily_memory_dupes, argv)
+
+        self.assertEqual(json.loads(served), json.loads(direct))
+        self.assertEqual(json.loads(served)["files"][0]["duplicate_sections"], 1)
+        self.assertEqual(self.status()["requests"], 2)
+        self.assertFalse((self.workspace / "memory" / find_daily_memory_dupes.CACHE_FILENAME).exists())
+
+    def test_quick_validate_answers_from_daemon(self):
+        argv = ["quick_validate.py", "--batch", str(self.workspace / "skills"), "--json", "--no-cache"]
+        _, direct = run_main(quick_validate, argv + ["--no-daemon"])
+        self.start()
+
+        code, served = run_main(quick_validate, argv)
+
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(served), json.loads(direct))
+        self.assertEqual(self.status()["skills_validated"], 2)
+
+    def test_edits_are_seen_by_the_next_request(self):
+        self.start(inotify=False)
+        self.write_skill("good", "---\nname: good\n---\n")
+
+        answered = quick_validate.indexd_validate(self.socket, [self.workspace / "skills" / "good"])
+
+        self.assertEqual(answered, [quick_validate.validate_skill(self.workspace / "skills" / "good", cache=None)])
+        self.assertFalse(answered[0][0])
+
+    def test_search_ops_match_direct_indexes(self):
+        self.start()
+        memory = workspace_indexd.request(self.socket, {"op": "memory.search", "query": "model fallback", "top": 3})
+        pitfalls = workspace_indexd.request(self.socket, {"op": "pitfalls.search", "query": "telegram", "tag": "telegram"})
+
+        self.assertTrue(memory["ok"], memory)
+        self.assertEqual(memory["result"]["results"][0]["path"], "memory/2026-03-14.md")
+        self.assertEqual((pitfalls["result"]["matched"], pitfalls["result"]["results"][0]["id"]), (1, "1"))
+
+    def test_clients_fall_back_when_no_daemon_answers(self):
+        self.start()
+        workspace_indexd.request(self.socket, {"op": "stop"})
+        self.thread.join(5)
+        self.thread = None
+
+        self.assertFalse(self.socket.exists())
+        self.assertIsNone(quick_validate.indexd_validate(self.socket, [self.workspace / "skills" / "good"]))
+        code, out = run_main(quick_validate, ["quick_validate.py", str(self.workspace / "skills" / "good"), "--no-cache"])
+        self.assertEqual((code, out), (0, "Skill is valid!\n"))
+
+    def test_second_daemon_refuses_a_live_socket(self):
+        self.start()
+        self.status()
+
+        with self.assertRaises(RuntimeError):
+            workspace_indexd.IndexServer(self.workspace)
+
+    def test_poll_watcher_reports_changed_files(self):
+        watcher = workspace_indexd.PollWatcher(self.workspace)
+        day = self.workspace / "memory" / "2026-03-15.md"
+        day.write_text("# 2026-03-15\n", encoding="utf-8")
+        (self.workspace / "skills" / "bad" / "SKILL.md").unlink()
+
+        self.assertEqual(watcher.changes(), {day, self.workspace / "skills" / "bad" / "SKILL.md"})
+        self.assertEqual(watcher.changes(), set())
+
+    @skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_watcher_reports_changed_files(self):
+        watcher = workspace_indexd.InotifyWatcher(self.workspace)
+        try:
+            with open(self.workspace / "memory" / "2026-03-15.md", "a", encoding="utf-8") as fh:
+                fh.write("- 晚餐 200\n")
+            self.assertIn(self.workspace / "memory" / "2026-03-15.md", watcher.changes())
+
+            # A new skill directory means a re-walk; its SKILL.md is then watched.
+            self.write_skill("new", "---\nname: new\ndescription: New\n---\n")
+            self.assertIsNone(watcher.changes())
+            (self.workspace / "skills" / "new" / "SKILL.md").write_text("---\nname: new\n---\n", encoding="utf-8")
+            self.assertIn(self.workspace / "skills" / "new" / "SKILL.md", watcher.changes())
+        finally:
+            watcher.close()
+
+    @skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_changes_are_indexed_before_they_are_asked_for(self):
+        self.start()
+        before = self.status()["files_scanned"]
+        (self.workspace / "memory" / "2026-03-16.md").write_text("# 2026-03-16\n", encoding="utf-8")
+
+        deadline = time.monotonic() + 5
+        while self.status()["files_scanned"] == before and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self.assertEqual(self.status()["files_scanned"], before + 1)
+
+
+if __name__ == "__main__":
+    main()
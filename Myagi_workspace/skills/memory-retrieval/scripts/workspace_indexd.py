@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+Workspace indexing daemon: keeps the memory, pitfall and skill indexes warm
+in one long-running process and answers queries over a Unix socket.
+
+Indexes kept warm:
+  MEMORY.md + memory/*.md   duplicate-section scans (find_daily_memory_dupes)
+                            and the lexical search index (memory_query)
+  memory/pitfalls.jsonl     the pitfall index (pitfall_index)
+  skills/*/SKILL.md         validation results (quick_validate)
+
+Changes are picked up from inotify events (through libc, no extra
+dependency) and re-indexed after a short debounce; where inotify is not
+available the tracked files are polled by mtime/size instead. Every request
+still re-checks the mtime/size of the files it touches, so an answer is never
+staler than a direct scan.
+
+find_daily_memory_dupes.py and quick_validate.py look for the socket
+(<workspace>/.workspace-indexd.sock, or $WORKSPACE_INDEXD_SOCKET) and use the
+daemon when it answers; otherwise they scan directly as before.
+
+Protocol: one JSON request line per connection, e.g.
+{"op": "dupes.scan", "paths": [...], "near": false}, answered with one line
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+
+Usage:
+    python workspace_indexd.py serve [--workspace DIR] [--poll-interval 2] [--no-inotify]
+    python workspace_indexd.py status
+    python workspace_indexd.py query memory "query text" [--top 8]
+    python workspace_indexd.py query pitfalls "query text" [--category code]
+    python workspace_indexd.py stop
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import importlib
+import json
+import os
+import selectors
+import signal
+import socket
+import stat
+import struct
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+PROTOCOL_VERSION = 1
+SOCKET_NAME = ".workspace-indexd.sock"
+SOCKET_ENV = "WORKSPACE_INDEXD_SOCKET"
+DEFAULT_POLL_INTERVAL = 2.0
+DEBOUNCE_SECONDS = 0.2
+REQUEST_TIMEOUT = 5.0
+MAX_REQUEST_BYTES = 1 << 20
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SKILLS_DIR = SCRIPT_DIR.parents[1]
+DEFAULT_WORKSPACE = Path(__file__).resolve().parents[3]
+# Where the modules behind each index live, both in skills/ and in the
+# available-skills/ mirror. Missing ones just disable their index.
+HELPER_DIRS = [
+    SCRIPT_DIR,
+    SKILLS_DIR / "memory-hygiene" / "scripts",
+    SKILLS_DIR / "pitfall-loop" / "scripts",
+    SKILLS_DIR.parent / "available-skills" / "builtin" / "skill-creator" / "scripts",
+    SKILLS_DIR.parent / "builtin" / "skill-creator" / "scripts",
+]
+
+# <sys/inotify.h>
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x1000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def import_helper(name: str):
+    """Import one of the index modules from HELPER_DIRS; None if it is not installed."""
+    for directory in HELPER_DIRS:
+        if directory.is_dir() and str(directory) not in sys.path:
+            sys.path.append(str(directory))
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def default_socket(workspace: Path) -> Path:
+    configured = os.environ.get(SOCKET_ENV)
+    return Path(configured) if configured else workspace / SOCKET_NAME
+
+
+def tracked_files(workspace: Path) -> List[Path]:
+    """Every file the daemon keeps an index for."""
+    files = []
+    memory_md = workspace / "MEMORY.md"
+    if memory_md.is_file():
+        files.append(memory_md)
+    memory_dir = workspace / "memory"
+    if memory_dir.is_dir():
+        files.extend(sorted(memory_dir.glob("*.md")))
+        pitfalls = memory_dir / "pitfalls.jsonl"
+        if pitfalls.is_file():
+            files.append(pitfalls)
+    skills_dir = workspace / "skills"
+    if skills_dir.is_dir():
+        files.extend(sorted(p for p in skills_dir.glob("*/SKILL.md") if p.is_file()))
+    return files
+
+
+class PollWatcher:
+    """Fallback watcher: compares mtime/size of the tracked files on every call."""
+
+    name = "poll"
+
+    def __init__(self, workspace: Path):
+        self.workspace = workspace
+        self.snapshot = self._stat_all()
+
+    def fileno(self) -> Optional[int]:
+        return None
+
+    def _stat_all(self) -> Dict[Path, Tuple[int, int]]:
+        found = {}
+        for path in tracked_files(self.workspace):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            found[path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def changes(self) -> Optional[Set[Path]]:
+        current = self._stat_all()
+        changed = {p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)}
+        self.snapshot = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    inotify watches on the workspace root, memory/, skills/ and every
+    skills/<name>/ directory. changes() drains the queued events without
+    blocking and returns the touched paths, or None when the kernel queue
+    overflowed or a watched directory appeared or went away and everything
+    has to be re-checked.
+    """
+
+    name = "inotify"
+
+    def __init__(self, workspace: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.workspace = workspace
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.dirs: Dict[int, Path] = {}
+        try:
+            self._watch_tree()
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def fileno(self) -> Optional[int]:
+        return self.fd
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):  # gone again before we got to it
+                return
+            raise OSError(err, f"inotify_add_watch {directory}: {os.strerror(err)}")
+        self.dirs[wd] = directory
+
+    def _watch_tree(self) -> None:
+        self._watch(self.workspace)
+        for name in ("memory", "skills"):
+            if (self.workspace / name).is_dir():
+                self._watch(self.workspace / name)
+        skills_dir = self.workspace / "skills"
+        if skills_dir.is_dir():
+            for child in sorted(skills_dir.iterdir()):
+                if child.is_dir():
+                    self._watch(child)
+
+    def changes(self) -> Optional[Set[Path]]:
+        changed: Set[Path] = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+                offset += INOTIFY_EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                directory = self.dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    self.dirs.pop(wd, None)
+                    rescan = True
+                    continue
+                if mask & IN_ISDIR:
+                    # memory/, skills/ or a skill directory came or went.
+                    rescan = True
+                    continue
+                changed.add(directory / os.fsdecode(name))
+        if rescan:
+            self._watch_tree()
+            return None
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def open_watcher(workspace: Path, inotify: bool = True):
+    if inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(workspace)
+        except OSError as e:
+            print(f"[WARN] inotify unavailable ({e}); polling instead", file=sys.stderr)
+    return PollWatcher(workspace)
+
+
+class WorkspaceIndexes:
+    """The in-memory indexes and the request handlers that read them."""
+
+    def __init__(self, workspace: Path):
+        self.workspace = workspace
+        self.dupes = import_helper("find_daily_memory_dupes")
+        self.validator = import_helper("quick_validate")
+        memory_query = import_helper("memory_query")
+        pitfall_index = import_helper("pitfall_index")
+        self.memory = memory_query.MemoryIndex(workspace) if memory_query else None
+        self.pitfalls = pitfall_index.PitfallIndex(workspace) if pitfall_index else None
+        # realpath -> (mtime_ns, size, near, FileScan)
+        self.scans: Dict[str, tuple] = {}
+        # SKILL.md realpath -> ((mtime_ns, size, ino), valid, message)
+        self.skills: Dict[str, tuple] = {}
+        self.requests = 0
+        self.refreshes = 0
+
+    def close(self) -> None:
+        for index in (self.memory, self.pitfalls):
+            if index is not None:
+                index.close()
+
+    def available(self) -> Dict[str, bool]:
+        return {
+            "dupes": self.dupes is not None,
+            "skills": self.validator is not None,
+            "memory": self.memory is not None,
+            "pitfalls": self.pitfalls is not None,
+        }
+
+    # -- warming ---------------------------------------------------------
+
+    def refresh(self, changed: Optional[Set[Path]]) -> None:
+        """Re-index what changed; None re-checks every tracked file."""
+        self.refreshes += 1
+        if changed is None:
+            changed = set(tracked_files(self.workspace))
+            changed.update(Path(p) for p in self.scans)
+            changed.update(Path(p) for p in self.skills)
+        memory_dir = self.workspace / "memory"
+        memory_changed = False
+        for path in changed:
+            if path.name == "SKILL.md":
+                if self.validator is not None:
+                    self._validate(path.parent)
+            elif path.suffix == ".md" and (path.parent == memory_dir or path == self.workspace / "MEMORY.md"):
+                memory_changed = True
+                if self.dupes is not None and path.parent == memory_dir:
+                    self._scan(path)
+            elif os.path.realpath(path) in self.scans:
+                self._scan(path)
+        if memory_changed and self.memory is not None:
+            self.memory.refresh()
+        if self.pitfalls is not None and memory_dir / "pitfalls.jsonl" in changed:
+            self.pitfalls.refresh()
+
+    def _scan(self, path: Path, near: Optional[bool] = None, mmap_threshold: Optional[int] = None):
+        """Cached FileScan for path, rescanned when its mtime/size moved or near data is missing."""
+        key = os.path.realpath(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.scans.pop(key, None)
+            return None
+        cached = self.scans.get(key)
+        if near is None:
+            near = bool(cached and cached[2])
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size) and (cached[2] or not near):
+            return cached[3]
+        if mmap_threshold is None:
+            mmap_threshold = self.dupes.MMAP_THRESHOLD
+        scan = self.dupes.scan_fingerprinted(Path(key), near, mmap_threshold)
+        self.scans[key] = (scan.mtime_ns, scan.size, near, scan)
+        return scan
+
+    def _validate(self, skill_path: Path) -> Tuple[bool, str]:
+        skill_md = os.path.realpath(skill_path / "SKILL.md")
+        try:
+            st = os.stat(skill_md)
+        except OSError:
+            self.skills.pop(skill_md, None)
+            return self.validator.validate_skill(skill_path, cache=None)
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = self.skills.get(skill_md)
+        if cached and cached[0] == stamp:
+            return cached[1], cached[2]
+        valid, message = self.validator.validate_skill(skill_path, cache=None)
+        self.skills[skill_md] = (stamp, valid, message)
+        return valid, message
+
+    # -- requests --------------------------------------------------------
+
+    def handle(self, request: dict):
+        self.requests += 1
+        op = request.get("op")
+        handler = {
+            "status": self._op_status,
+            "dupes.scan": self._op_dupes_scan,
+            "skills.validate": self._op_skills_validate,
+            "memory.search": self._op_memory_search,
+            "pitfalls.search": self._op_pitfalls_search,
+        }.get(op)
+        if handler is None:
+            raise ValueError(f"unknown op: {op!r}")
+        return handler(request)
+
+    def _require(self, name: str):
+        if not self.available()[name]:
+            raise RuntimeError(f"{name} index unavailable: its module was not found")
+
+    def _op_status(self, request: dict) -> dict:
+        return {
+            "protocol": PROTOCOL_VERSION,
+            "pid": os.getpid(),
+            "workspace": str(self.workspace),
+            "indexes": self.available(),
+            "files_scanned": len(self.scans),
+            "skills_validated": len(self.skills),
+            "requests": self.requests,
+            "refreshes": self.refreshes,
+        }
+
+    def _op_dupes_scan(self, request: dict) -> dict:
+        self._require("dupes")
+        near = bool(request.get("near"))
+        mmap_threshold = int(request.get("mmap_threshold", self.dupes.MMAP_THRESHOLD))
+        files = []
+        for path in request["paths"]:
+            scan = self._scan(Path(path), near, mmap_threshold)
+            if scan is None:
+                raise FileNotFoundError(path)
+            report = asdict(scan.report)
+            report.pop("file")
+            files.append({"report": report, "sections": [asdict(s) for s in scan.sections]})
+        return {"files": files}
+
+    def _op_skills_validate(self, request: dict) -> dict:
+        self._require("skills")
+        return {"results": [list(self._validate(Path(path))) for path in request["paths"]]}
+
+    def _op_memory_search(self, request: dict) -> dict:
+        self._require("memory")
+        self.memory.refresh()
+        search = self.memory.search_bm25 if request.get("rank") == "bm25" else self.memory.search
+        total, hits = search(request["query"], top=int(request.get("top", 8)), context=int(request.get("context", 1)))
+        return {"totalHits": total, "results": [asdict(hit) for hit in hits]}
+
+    def _op_pitfalls_search(self, request: dict) -> dict:
+        self._require("pitfalls")
+        self.pitfalls.refresh()
+        filters = {key: request.get(key) for key in ("category", "taskType", "severity", "tag")}
+        total, matched, results = self.pitfalls.search(request.get("query", ""), top=int(request.get("top", 8)), **filters)
+        return {"total": total, "matched": matched, "results": results}
+
+
+class IndexServer:
+    """
+    Single-threaded select loop over the listening socket and the watcher.
+    Requests are answered one at a time; they only touch warm indexes, so
+    this keeps the indexes free of locking.
+    """
+
+    def __init__(
+        self,
+        workspace: Path,
+        socket_path: Optional[Path] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        inotify: bool = True,
+    ):
+        self.workspace = workspace
+        self.socket_path = socket_path or default_socket(workspace)
+        self.poll_interval = poll_interval
+        self.inotify = inotify
+        self.stopping = False
+        self.listener = self._bind()
+
+    def _bind(self) -> socket.socket:
+        if self.socket_path.exists():
+            if not stat.S_ISSOCK(self.socket_path.stat().st_mode):
+                raise RuntimeError(f"{self.socket_path} exists and is not a socket")
+            if request(self.socket_path, {"op": "status"}, timeout=1.0) is not None:
+                raise RuntimeError(f"a daemon is already serving {self.socket_path}")
+            self.socket_path.unlink()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(16)
+        self._socket_ino = self.socket_path.stat().st_ino
+        return listener
+
+    def serve_forever(self) -> None:
+        # Indexes are built here so that their SQLite connections belong to
+        # the thread that serves requests.
+        indexes = WorkspaceIndexes(self.workspace)
+        watcher = open_watcher(self.workspace, self.inotify)
+        selector = selectors.DefaultSelector()
+        selector.register(self.listener, selectors.EVENT_READ, "accept")
+        if watcher.fileno() is not None:
+            selector.register(watcher.fileno(), selectors.EVENT_READ, "watch")
+        try:
+            indexes.refresh(None)
+            pending: Optional[Set[Path]] = set()
+            due: Optional[float] = None
+            next_poll = time.monotonic() + self.poll_interval
+            while not self.stopping:
+                now = time.monotonic()
+                deadline = due if due is not None else next_poll
+                for key, _ in selector.select(max(0.0, deadline - now)):
+                    if key.data == "accept":
+                        self._answer(indexes)
+                    else:
+                        pending, due = _merge(pending, watcher.changes()), due or time.monotonic() + DEBOUNCE_SECONDS
+                now = time.monotonic()
+                if watcher.fileno() is None and now >= next_poll:
+                    changed = watcher.changes()
+                    if changed:
+                        pending, due = _merge(pending, changed), now
+                    next_poll = now + self.poll_interval
+                elif watcher.fileno() is not None:
+                    next_poll = now + self.poll_interval
+                if due is not None and now >= due:
+                    indexes.refresh(pending)
+                    pending, due = set(), None
+        finally:
+            selector.close()
+            watcher.close()
+            indexes.close()
+            self.close()
+
+    def _answer(self, indexes: WorkspaceIndexes) -> None:
+        try:
+            conn, _ = self.listener.accept()
+        except OSError:
+            return
+        with conn:
+            conn.settimeout(REQUEST_TIMEOUT)
+            try:
+                line = _read_line(conn, MAX_REQUEST_BYTES)
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    raise ValueError("request must be a JSON object")
+                if message.get("op") == "stop":
+                    self.stopping = True
+                    reply = {"ok": True, "result": {"stopping": True}}
+                else:
+                    reply = {"ok": True, "result": indexes.handle(message)}
+            except Exception as e:  # reported to the client, the daemon keeps serving
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            try:
+                conn.sendall(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        self.listener.close()
+        try:
+            # Only remove the socket if it is still ours.
+            if self.socket_path.stat().st_ino == self._socket_ino:
+                self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def _merge(pending: Optional[Set[Path]], changed: Optional[Set[Path]]) -> Optional[Set[Path]]:
+    if pending is None or changed is None:
+        return None
+    return pending | changed
+
+
+def _read_line(conn: socket.socket, limit: int) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        data = conn.recv(65536)
+        if not data:
+            break
+        chunks.append(data)
+        size += len(data)
+        if b"\n" in data:
+            break
+        if size > limit:
+            raise ValueError("request too large")
+    return b"".join(chunks).split(b"\n", 1)[0]
+
+
+def request(socket_path: Path, payload: dict, timeout: float = 30.0) -> Optional[dict]:
+    """Send one request; returns the reply, or None when no daemon answers."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout)
+            conn.connect(str(socket_path))
+            conn.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            return json.loads(_read_line(conn, 1 << 30))
+    except (OSError, ValueError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Keep workspace memory, pitfall and skill indexes warm behind a Unix socket.")
+    p.add_argument("--workspace", default=None, help="Workspace root (default: auto)")
+    p.add_argument("--socket", default=None, help=f"Socket path (default: ${SOCKET_ENV} or <workspace>/{SOCKET_NAME})")
+    sub = p.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Run the daemon in the foreground")
+    serve.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, help=f"Seconds between polls without inotify (default: {DEFAULT_POLL_INTERVAL})")
+    serve.add_argument("--no-inotify", action="store_true", help="Poll file mtimes/sizes instead of using inotify")
+    sub.add_parser("status", help="Show whether a daemon is running and what it has indexed")
+    sub.add_parser("stop", help="Ask a running daemon to exit")
+    query = sub.add_parser("query", help="Search a warm index and print JSON")
+    query.add_argument("index", choices=("memory", "pitfalls"))
+    query.add_argument("terms", nargs="+", help="Query text")
+    query.add_argument("--top", type=int, default=8)
+    query.add_argument("--context", type=int, default=1, help="memory: lines of context")
+    query.add_argument("--rank", choices=("lexical", "bm25"), default="lexical", help="memory: ranking")
+    for flag in ("category", "taskType", "severity", "tag"):
+        query.add_argument(f"--{flag}", default=None, help=f"pitfalls: {flag} filter")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workspace = Path(args.workspace).resolve() if args.workspace else DEFAULT_WORKSPACE
+    socket_path = Path(args.socket) if args.socket else default_socket(workspace)
+
+    if args.command == "serve":
+        try:
+            server = IndexServer(workspace, socket_path, args.poll_interval, inotify=not args.no_inotify)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        print(f"Serving {workspace} on {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == "query":
+        payload = {"op": f"{args.index}.search", "query": " ".join(args.terms), "top": args.top}
+        if args.index == "memory":
+            payload.update(context=args.context, rank=args.rank)
+        else:
+            payload.update({flag: getattr(args, flag) for flag in ("category", "taskType", "severity", "tag")})
+    else:
+        payload = {"op": args.command}
+
+    reply = request(socket_path, payload)
+    if reply is None:
+        print(f"No daemon is listening on {socket_path}", file=sys.stderr)
+        return 1
+    if not reply.get("ok"):
+        print(f"[ERROR] {reply.get('error')}", file=sys.stderr)
+        return 1
+    print(json.dumps(reply["result"], ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())